@@ -1,19 +1,33 @@
 # Módulo de models
 from .user import User
 from .temporada import Temporada
-from .episodio import Episodio
-from .prova import Prova, Pergunta, OpcaoResposta, ResultadoProva
-from .progresso import UsuarioEpisodio
+from .episodio import Episodio, TrechoTranscricao
+from .prova import Prova, Pergunta, OpcaoResposta, ResultadoProva, TentativaProva, SessaoProva
+from .progresso import UsuarioEpisodio, RetomadaUsuario
 from .anexo import AnexoEpisodio
+from .idempotencia import ChaveIdempotencia
+from .exportacao import MarcaExportacao
+from .estatistica import EstatisticaEpisodio, EstatisticaTemporada, EstatisticaProva, ResumoDiario, ResumoDiarioTemporada
 
 __all__ = [
     "User",
     "Temporada", 
     "Episodio",
+    "TrechoTranscricao",
     "Prova",
     "Pergunta",
     "OpcaoResposta",
     "ResultadoProva",
+    "TentativaProva",
+    "SessaoProva",
     "UsuarioEpisodio",
-    "AnexoEpisodio"
+    "RetomadaUsuario",
+    "AnexoEpisodio",
+    "ChaveIdempotencia",
+    "MarcaExportacao",
+    "EstatisticaEpisodio",
+    "EstatisticaTemporada",
+    "EstatisticaProva",
+    "ResumoDiario",
+    "ResumoDiarioTemporada"
 ]
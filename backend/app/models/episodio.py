@@ -1,13 +1,14 @@
 """
 Model de Episódio
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Index, and_, event
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property, defer
 from sqlalchemy.sql import func
 import uuid
 
 from app.database.connection import Base
+from app.models.temporada import esta_liberado
 
 class Episodio(Base):
     __tablename__ = "episodios"
@@ -25,7 +26,13 @@ class Episodio(Base):
     status = Column(String(20), default="rascunho")  # 'rascunho', 'publicado', 'arquivado'
     data_lancamento = Column(DateTime(timezone=True))  # Data/hora de lançamento agendado
     conteudo_texto = Column(Text)  # Texto completo/rico do episódio
+    conteudo_html = Column(Text)  # conteudo_texto renderizado e sanitizado ao salvar
     visivel = Column(Boolean, default=True)  # Controle de visibilidade
+    liberado = Column(Boolean, default=False, nullable=False, index=True)  # ver Temporada.liberado
+    
+    # Indicadores baratos para as listagens (não leem o texto completo)
+    tem_transcricao = column_property(and_(transcricao != None, transcricao != ""))
+    tem_conteudo_texto = column_property(and_(conteudo_texto != None, conteudo_texto != ""))
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -34,6 +41,34 @@ class Episodio(Base):
     temporada = relationship("Temporada", back_populates="episodios")
     progresso_usuarios = relationship("UsuarioEpisodio", back_populates="episodio", cascade="all, delete-orphan")
     anexos = relationship("AnexoEpisodio", back_populates="episodio", cascade="all, delete-orphan")
+    trechos = relationship("TrechoTranscricao", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Episodio {self.titulo}>"
+
+@event.listens_for(Episodio, "before_insert")
+@event.listens_for(Episodio, "before_update")
+def _atualizar_liberado(mapper, connection, episodio):
+    episodio.liberado = esta_liberado(episodio)
+
+
+class TrechoTranscricao(Base):
+    """Parágrafo da transcrição, gerado ao salvar o episódio (paginação)"""
+    __tablename__ = "trechos_transcricao"
+    
+    episodio_id = Column(UUID(as_uuid=True), ForeignKey("episodios.id", ondelete="CASCADE"), primary_key=True)
+    indice = Column(Integer, primary_key=True)
+    inicio = Column(Integer)  # segundos, quando o parágrafo tem marca de tempo
+    texto = Column(Text, nullable=False)
+    
+    # Busca por intervalo de tempo (?inicio=&fim=)
+    __table_args__ = (
+        Index('ix_trechos_transcricao_inicio', 'episodio_id', 'inicio'),
+    )
+    
+    def __repr__(self):
+        return f"<Trecho {self.episodio_id}#{self.indice}>"
+
+def resumo_episodio():
+    """Opções de carga das listagens (EpisodioSummary): texto completo só no detalhe"""
+    return defer(Episodio.transcricao), defer(Episodio.conteudo_texto), defer(Episodio.conteudo_html)
@@ -0,0 +1,92 @@
+"""
+Models de contadores de audiência e de provas e resumos diários
+Os contadores são mantidos incrementalmente pelas escritas de progresso e de
+tentativas (app/services/estatisticas.py) e recalculados periodicamente a partir
+de usuario_episodios e resultados_prova para corrigir desvios. Os resumos diários são gravados uma vez
+por dia fechado (app/services/resumos.py) e servem as séries dos relatórios.
+"""
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, Numeric, LargeBinary, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+class EstatisticaEpisodio(Base):
+    __tablename__ = "estatisticas_episodio"
+    
+    episodio_id = Column(UUID(as_uuid=True), ForeignKey("episodios.id", ondelete="CASCADE"), primary_key=True)
+    visualizacoes = Column(Integer, nullable=False, default=0, index=True)  # usuários que iniciaram
+    concluidos = Column(Integer, nullable=False, default=0)
+    segundos_ouvidos = Column(BigInteger, nullable=False, default=0)  # soma de tempo_atual
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<EstatisticaEpisodio {self.episodio_id} views={self.visualizacoes}>"
+
+
+class EstatisticaTemporada(Base):
+    __tablename__ = "estatisticas_temporada"
+    
+    temporada_id = Column(UUID(as_uuid=True), ForeignKey("temporadas.id", ondelete="CASCADE"), primary_key=True)
+    visualizacoes = Column(Integer, nullable=False, default=0, index=True)
+    concluidos = Column(Integer, nullable=False, default=0)
+    segundos_ouvidos = Column(BigInteger, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<EstatisticaTemporada {self.temporada_id} views={self.visualizacoes}>"
+
+
+class EstatisticaProva(Base):
+    __tablename__ = "estatisticas_prova"
+    
+    prova_id = Column(UUID(as_uuid=True), ForeignKey("provas.id", ondelete="CASCADE"), primary_key=True)
+    tentativas = Column(Integer, nullable=False, default=0)
+    aprovadas = Column(Integer, nullable=False, default=0)
+    soma_pontuacao = Column(Numeric(12, 2), nullable=False, default=0)  # média = soma / tentativas
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<EstatisticaProva {self.prova_id} tentativas={self.tentativas}>"
+
+
+class ResumoDiario(Base):
+    __tablename__ = "resumos_diarios"
+    
+    data = Column(Date, primary_key=True)  # dia UTC
+    novos_usuarios = Column(Integer, nullable=False, default=0)
+    conclusoes = Column(Integer, nullable=False, default=0)  # episódios concluídos no dia
+    tentativas = Column(Integer, nullable=False, default=0)  # provas realizadas no dia
+    aprovadas = Column(Integer, nullable=False, default=0)
+    soma_pontuacao = Column(Numeric(12, 2), nullable=False, default=0)  # média = soma / tentativas
+    # Total ouvido acumulado no fim do dia (os segundos do dia são a diferença para o
+    # dia anterior); nulo nos dias preenchidos retroativamente
+    segundos_ouvidos_total = Column(BigInteger)
+    # Esboço HyperLogLog dos usuários com progresso no dia (ver app/utils/hll.py):
+    # a união dos esboços estima os ouvintes distintos de qualquer período
+    ouvintes_hll = Column(LargeBinary)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ResumoDiario {self.data}>"
+
+
+class ResumoDiarioTemporada(Base):
+    __tablename__ = "resumos_diarios_temporada"
+    
+    data = Column(Date, primary_key=True)
+    temporada_id = Column(UUID(as_uuid=True), ForeignKey("temporadas.id", ondelete="CASCADE"), primary_key=True, index=True)
+    conclusoes = Column(Integer, nullable=False, default=0)
+    tentativas = Column(Integer, nullable=False, default=0)
+    aprovadas = Column(Integer, nullable=False, default=0)
+    soma_pontuacao = Column(Numeric(12, 2), nullable=False, default=0)
+    segundos_ouvidos_total = Column(BigInteger)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ResumoDiarioTemporada {self.data} {self.temporada_id}>"
@@ -0,0 +1,21 @@
+"""
+Model de Marca d'água da exportação para BI
+Guarda, por tabela exportada, até onde (updated_at / data_realizacao) os dados já
+foram gravados em Parquet (ver app/services/exportacao_bi.py).
+"""
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+class MarcaExportacao(Base):
+    __tablename__ = "marcas_exportacao"
+    
+    tabela = Column(String(50), primary_key=True)
+    marca = Column(DateTime(timezone=True), nullable=False)  # exportado até (inclusive)
+    linhas = Column(Integer, nullable=False, default=0)  # total exportado até hoje
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<MarcaExportacao {self.tabela} até {self.marca}>"
@@ -0,0 +1,23 @@
+"""
+Model de Chave de Idempotência
+Guarda a resposta de POSTs caros para que retentativas não refaçam o trabalho.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, JSON
+
+from app.database.connection import Base
+
+class ChaveIdempotencia(Base):
+    __tablename__ = "idempotency_keys"
+    
+    chave = Column(String(64), primary_key=True)  # sha256(usuário + rota + Idempotency-Key)
+    hash_corpo = Column(String(64))  # sha256 do corpo da requisição (mesma chave exige o mesmo corpo)
+    status = Column(String(20), nullable=False, default="processando")  # 'processando', 'concluido'
+    status_code = Column(Integer)
+    headers = Column(JSON)
+    corpo = Column(LargeBinary)
+    
+    criado_em = Column(DateTime(timezone=True), nullable=False)
+    expira_em = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<Idempotencia {self.chave[:12]} ({self.status})>"
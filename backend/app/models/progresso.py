@@ -20,7 +20,7 @@ class UsuarioEpisodio(Base):
     data_conclusao = Column(DateTime(timezone=True))
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)  # marca d'água da exportação para BI
     
     # Constraint de unicidade
     __table_args__ = (
@@ -32,3 +32,21 @@ class UsuarioEpisodio(Base):
     
     def __repr__(self):
         return f"<Progresso user={self.usuario_id} ep={self.episodio_id}>"
+
+
+class RetomadaUsuario(Base):
+    """
+    Índice "continuar ouvindo" (uma linha por usuário), mantido nas escritas de progresso:
+    o último episódio em andamento e o próximo não assistido na ordem do catálogo.
+    """
+    __tablename__ = "retomadas_usuario"
+    
+    usuario_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    episodio_id = Column(UUID(as_uuid=True), ForeignKey("episodios.id", ondelete="SET NULL"))  # último em andamento
+    tempo_atual = Column(Integer, default=0)
+    proximo_episodio_id = Column(UUID(as_uuid=True), ForeignKey("episodios.id", ondelete="SET NULL"))
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<Retomada user={self.usuario_id} ep={self.episodio_id}>"
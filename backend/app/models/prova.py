@@ -1,7 +1,7 @@
 """
 Models de Prova, Perguntas e Respostas
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, Numeric
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, Numeric, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -81,11 +81,57 @@ class ResultadoProva(Base):
     tentativa_numero = Column(Integer, default=1)
     tempo_gasto = Column(Integer)  # em segundos
     certificado_url = Column(Text)
+    codigo_certificado = Column(String(20), unique=True, index=True)  # Código de validação (aprovados)
     
-    data_realizacao = Column(DateTime(timezone=True), server_default=func.now())
+    data_realizacao = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    # Um número de tentativa por usuário/prova
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'prova_id', 'tentativa_numero', name='uq_resultado_tentativa'),
+    )
     
     # Relacionamentos
     prova = relationship("Prova", back_populates="resultados")
     
     def __repr__(self):
         return f"<Resultado {self.pontuacao}% - {'Aprovado' if self.aprovado else 'Reprovado'}>"
+
+
+class TentativaProva(Base):
+    """Contador de tentativas por usuário/prova (admissão atômica de envios)"""
+    __tablename__ = "tentativas_prova"
+    
+    usuario_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    prova_id = Column(UUID(as_uuid=True), ForeignKey("provas.id", ondelete="CASCADE"), primary_key=True)
+    tentativas = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<Tentativas user={self.usuario_id} prova={self.prova_id}: {self.tentativas}>"
+
+
+class SessaoProva(Base):
+    """Sessão de prova em andamento: prazo no servidor e respostas salvas a cada clique"""
+    __tablename__ = "sessoes_prova"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    usuario_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    prova_id = Column(UUID(as_uuid=True), ForeignKey("provas.id", ondelete="CASCADE"), nullable=False)
+    respostas = Column(JSONB)  # {pergunta_id: opcao_id}, uma linha por sessão
+    status = Column(String(20), nullable=False, default="em_andamento")  # 'em_andamento', 'finalizada'
+    prazo = Column(DateTime(timezone=True))  # NULL = sem limite de tempo
+    resultado_id = Column(UUID(as_uuid=True), ForeignKey("resultados_prova.id", ondelete="SET NULL"))
+    
+    iniciada_em = Column(DateTime(timezone=True), nullable=False)
+    atualizada_em = Column(DateTime(timezone=True))
+    
+    # No máximo uma sessão em andamento por usuário/prova
+    __table_args__ = (
+        Index(
+            'uq_sessao_prova_ativa', 'usuario_id', 'prova_id', unique=True,
+            postgresql_where=text("status = 'em_andamento'"),
+            sqlite_where=text("status = 'em_andamento'")
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<SessaoProva user={self.usuario_id} prova={self.prova_id} ({self.status})>"
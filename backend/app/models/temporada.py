@@ -1,11 +1,13 @@
 """
 Model de Temporada
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
+from datetime import datetime, timezone
+from typing import Optional
 
 from app.database.connection import Base
 
@@ -21,6 +23,9 @@ class Temporada(Base):
     status = Column(String(20), default="rascunho", index=True)  # 'rascunho', 'publicado', 'arquivado'
     data_lancamento = Column(DateTime(timezone=True))  # Data/hora de lançamento agendado
     visivel = Column(Boolean, default=True)  # Controle de visibilidade
+    # Publicado, visível e com data_lancamento alcançada; gravado ao salvar e
+    # ligado no horário do lançamento por app/services/lancamentos.py
+    liberado = Column(Boolean, default=False, nullable=False, index=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -31,3 +36,19 @@ class Temporada(Base):
     
     def __repr__(self):
         return f"<Temporada {self.nome}>"
+
+
+def esta_liberado(item, agora: Optional[datetime] = None) -> bool:
+    """Regra de liberação para alunos (temporadas e episódios)"""
+    lancamento = item.data_lancamento
+    if lancamento is not None and lancamento.tzinfo is None:
+        lancamento = lancamento.replace(tzinfo=timezone.utc)  # SQLite devolve sem fuso
+    agora = agora or datetime.now(timezone.utc)
+    # visivel None (default ainda não aplicado no before_insert, ou linha antiga) vale
+    # como visível: mesma regra de _pendentes (lancamentos.py) e das migrações
+    return item.status == "publicado" and item.visivel is not False and (lancamento is None or lancamento <= agora)
+
+@event.listens_for(Temporada, "before_insert")
+@event.listens_for(Temporada, "before_update")
+def _atualizar_liberado(mapper, connection, temporada):
+    temporada.liberado = esta_liberado(temporada)
@@ -1,7 +1,7 @@
 """
 Model de Usuário
 """
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text, Index, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -22,8 +22,36 @@ class User(Base):
     status = Column(String(20), default="pendente", index=True)  # 'pendente', 'ativo', 'inativo'
     avatar_url = Column(Text)
     
+    # Nome, email e matrícula normalizados (sem acentos, minúsculas) para a busca do admin;
+    # no PostgreSQL tem índice GIN de trigramas (ver app/services/busca.py)
+    busca_normalizada = Column(Text)
+    
+    # Episódios concluídos (ranking do dashboard); incrementado pelas escritas de
+    # progresso e reconciliado com usuario_episodios (ver app/services/estatisticas.py)
+    episodios_concluidos = Column(Integer, nullable=False, default=0)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)  # marca d'água da exportação para BI
+    
+    # Paginação por cursor (created_at, id)
+    __table_args__ = (
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+        # Ranking: top-N e posição são leituras de faixa nestes índices
+        Index('ix_users_ranking', 'status', 'episodios_concluidos', 'id'),
+        Index('ix_users_ranking_area', 'area', 'status', 'episodios_concluidos'),
+        Index('ix_users_ranking_cargo', 'cargo', 'status', 'episodios_concluidos'),
+        # Recortes do cubo de análise por área/cargo (app/services/cubo.py)
+        Index('ix_users_area_cargo', 'area', 'cargo'),
+    )
     
     def __repr__(self):
         return f"<User {self.email}>"
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _atualizar_busca_normalizada(mapper, connection, user):
+    from app.utils.texto import normalizar_texto
+    
+    user.busca_normalizada = normalizar_texto(
+        " ".join(filter(None, [user.nome_completo, user.email, user.matricula_aec]))
+    )
@@ -1,2 +1,2 @@
 # Módulo de rotas
-from . import auth, users, temporadas, episodios, provas, progresso, storage, dashboard
+from . import auth, users, temporadas, episodios, provas, progresso, storage, dashboard, certificados, busca
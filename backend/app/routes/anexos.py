@@ -2,6 +2,7 @@
 Rotas de Anexos de Episódios
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -13,6 +14,8 @@ from app.models.episodio import Episodio
 from app.models.user import User
 from app.schemas.anexo import AnexoCreate, AnexoOut, AnexoList
 from app.utils.jwt import get_current_admin, get_current_user
+from app.services.catalogo import get_catalogo, invalidar_catalogo
+from app.utils.ordenacao import reordenar
 
 # Importar serviço de storage se existir
 try:
@@ -47,6 +50,18 @@ async def list_anexos(
     """
     Lista todos os anexos de um episódio.
     """
+    # Usuários comuns só veem anexos de episódios liberados (snapshot do catálogo)
+    if current_user.perfil != "admin":
+        catalogo = get_catalogo()
+        conteudo = catalogo.anexos.get(episodio_id)
+        if conteudo is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Episódio não encontrado"
+            )
+        return Response(content=conteudo, media_type="application/json",
+                        headers={"Cache-Control": catalogo.cache_control()})
+    
     # Verificar se episódio existe
     episodio = db.query(Episodio).filter(Episodio.id == episodio_id).first()
     if not episodio:
@@ -55,13 +70,6 @@ async def list_anexos(
             detail="Episódio não encontrado"
         )
     
-    # Usuários comuns só veem anexos de episódios publicados
-    if current_user.perfil != "admin" and episodio.status != "publicado":
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Episódio não encontrado"
-        )
-    
     anexos = db.query(AnexoEpisodio)\
         .filter(AnexoEpisodio.episodio_id == episodio_id)\
         .order_by(AnexoEpisodio.ordem)\
@@ -112,9 +120,26 @@ async def create_anexo(
     db.add(anexo)
     db.commit()
     db.refresh(anexo)
+    invalidar_catalogo()
     
     return AnexoOut.model_validate(anexo)
 
+@router.put("/{episodio_id}/anexos/reorder")
+async def reorder_anexos(
+    episodio_id: UUID,
+    ordem: List[UUID],  # Lista de IDs na nova ordem
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Reordena os anexos de um episódio (ordem 0, 1, ...) num único UPDATE.
+    """
+    reordenar(db, AnexoEpisodio, ordem, AnexoEpisodio.episodio_id == episodio_id)
+    db.commit()
+    invalidar_catalogo()
+    
+    return {"message": "Anexos reordenados com sucesso"}
+
 @router.put("/{episodio_id}/anexos/{anexo_id}", response_model=AnexoOut)
 async def update_anexo(
     episodio_id: UUID,
@@ -145,6 +170,7 @@ async def update_anexo(
     
     db.commit()
     db.refresh(anexo)
+    invalidar_catalogo()
     
     return AnexoOut.model_validate(anexo)
 
@@ -169,8 +195,14 @@ async def delete_anexo(
             detail="Anexo não encontrado"
         )
     
+    # Cópias de temporada compartilham o arquivo: só apaga se ninguém mais usa a URL
+    compartilhado = db.query(AnexoEpisodio.id).filter(
+        AnexoEpisodio.url == anexo.url,
+        AnexoEpisodio.id != anexo.id
+    ).first()
+    
     # Tentar deletar arquivo do storage (opcional)
-    if HAS_STORAGE:
+    if HAS_STORAGE and not compartilhado:
         try:
             delete_file_from_r2(anexo.url)
         except Exception as e:
@@ -178,28 +210,6 @@ async def delete_anexo(
     
     db.delete(anexo)
     db.commit()
+    invalidar_catalogo()
     
     return {"message": "Anexo deletado com sucesso"}
-
-@router.put("/{episodio_id}/anexos/reorder")
-async def reorder_anexos(
-    episodio_id: UUID,
-    ordem: List[UUID],  # Lista de IDs na nova ordem
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
-):
-    """
-    Reordena os anexos de um episódio.
-    """
-    for i, anexo_id in enumerate(ordem):
-        anexo = db.query(AnexoEpisodio).filter(
-            AnexoEpisodio.id == anexo_id,
-            AnexoEpisodio.episodio_id == episodio_id
-        ).first()
-        
-        if anexo:
-            anexo.ordem = i
-    
-    db.commit()
-    
-    return {"message": "Anexos reordenados com sucesso"}
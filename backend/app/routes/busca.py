@@ -0,0 +1,28 @@
+"""
+Rotas de Busca
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database.connection import get_db
+from app.models.user import User
+from app.schemas.busca import BuscaOut
+from app.services.busca import buscar
+from app.utils.jwt import get_current_user
+
+router = APIRouter()
+
+@router.get("", response_model=BuscaOut)
+async def buscar_conteudo(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Busca em transcrições, descrições e conteúdo dos episódios e nas temporadas.
+    Usuários comuns só encontram o que já veem nas listagens.
+    """
+    resultados = buscar(db, q, admin=current_user.perfil == "admin", limite=limit)
+    
+    return BuscaOut(q=q, total=len(resultados), resultados=resultados)
@@ -0,0 +1,177 @@
+"""
+Rotas de Certificados
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+
+from app.database.connection import get_db
+from app.models.prova import Prova, ResultadoProva
+from app.models.temporada import Temporada
+from app.models.user import User
+from app.schemas.prova import CertificadoValidacao
+from app.utils.jwt import get_current_admin
+from app.utils.codigo_certificado import gerar_codigo_certificado, normalizar_codigo_certificado
+from app.utils.rate_limit import RateLimiter
+from app.services.certificados import gerar_zip_certificados, nome_arquivo_certificado
+
+router = APIRouter()
+
+# Consulta pública: limite por IP para que varreduras não cheguem ao banco
+limitar_validacao = RateLimiter(requisicoes=30, por_segundos=60)
+
+# Certificado emitido não muda: CDN/navegador podem guardar a resposta
+CACHE_VALIDO = "public, max-age=3600, s-maxage=86400"
+CACHE_INVALIDO = "public, max-age=300"
+
+@router.get("/lote")
+async def download_certificados_lote(
+    prova_id: Optional[UUID] = Query(None),
+    temporada_id: Optional[UUID] = Query(None),
+    area: Optional[str] = None,
+    cargo: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Gera um ZIP com os certificados dos aprovados (streaming).
+    Um certificado por aluno e prova (melhor nota).
+    Apenas admins.
+    """
+    query = db.query(
+        ResultadoProva.id,
+        ResultadoProva.usuario_id,
+        ResultadoProva.prova_id,
+        ResultadoProva.pontuacao,
+        ResultadoProva.data_realizacao,
+        ResultadoProva.codigo_certificado,
+        User.nome_completo,
+        Prova.titulo.label("titulo_prova"),
+        Temporada.nome.label("titulo_temporada")
+    ).join(
+        User, User.id == ResultadoProva.usuario_id
+    ).join(
+        Prova, Prova.id == ResultadoProva.prova_id
+    ).join(
+        Temporada, Temporada.id == Prova.temporada_id
+    ).filter(
+        ResultadoProva.aprovado == True
+    )
+    
+    if prova_id:
+        query = query.filter(ResultadoProva.prova_id == prova_id)
+    if temporada_id:
+        query = query.filter(Prova.temporada_id == temporada_id)
+    if area:
+        query = query.filter(User.area == area)
+    if cargo:
+        query = query.filter(User.cargo == cargo)
+    
+    rows = query.order_by(
+        User.nome_completo,
+        ResultadoProva.usuario_id,
+        ResultadoProva.prova_id,
+        ResultadoProva.pontuacao.desc()
+    ).all()
+    
+    # Melhor resultado por (usuário, prova)
+    itens = []
+    vistos = set()
+    sem_codigo = {}
+    for r in rows:
+        if (r.usuario_id, r.prova_id) in vistos:
+            continue
+        vistos.add((r.usuario_id, r.prova_id))
+        
+        codigo = r.codigo_certificado
+        if not codigo:
+            codigo = sem_codigo[r.id] = gerar_codigo_certificado()
+        
+        itens.append({
+            "arquivo": nome_arquivo_certificado(r.nome_completo, r.id.hex[:8]),
+            "dados": dict(
+                nome_aluno=r.nome_completo,
+                titulo_prova=r.titulo_prova,
+                titulo_temporada=r.titulo_temporada,
+                pontuacao=float(r.pontuacao),
+                data_realizacao=r.data_realizacao,
+                codigo=codigo
+            )
+        })
+    
+    # Resultados antigos, aprovados antes da existência do código
+    if sem_codigo:
+        db.bulk_update_mappings(ResultadoProva, [
+            {"id": resultado_id, "codigo_certificado": codigo}
+            for resultado_id, codigo in sem_codigo.items()
+        ])
+        db.commit()
+    
+    if not itens:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum certificado encontrado para os filtros informados"
+        )
+    
+    filename = f"certificados-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.zip"
+    
+    return StreamingResponse(
+        gerar_zip_certificados(itens),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/{codigo}", response_model=CertificadoValidacao)
+async def validar_certificado(
+    codigo: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    _: None = Depends(limitar_validacao)
+):
+    """
+    Valida um certificado pelo código impresso no PDF.
+    Rota pública (sem login), com rate limit por IP.
+    """
+    codigo_normalizado = normalizar_codigo_certificado(codigo)
+    
+    # Dígito verificador inválido: nem consulta o banco
+    resultado = None
+    if codigo_normalizado:
+        resultado = db.query(
+            ResultadoProva.codigo_certificado,
+            ResultadoProva.pontuacao,
+            ResultadoProva.data_realizacao,
+            User.nome_completo,
+            Prova.titulo.label("titulo_prova"),
+            Temporada.nome.label("titulo_temporada")
+        ).join(
+            User, User.id == ResultadoProva.usuario_id
+        ).join(
+            Prova, Prova.id == ResultadoProva.prova_id
+        ).join(
+            Temporada, Temporada.id == Prova.temporada_id
+        ).filter(
+            ResultadoProva.codigo_certificado == codigo_normalizado,
+            ResultadoProva.aprovado == True
+        ).first()
+    
+    if not resultado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificado não encontrado",
+            headers={"Cache-Control": CACHE_INVALIDO}
+        )
+    
+    response.headers["Cache-Control"] = CACHE_VALIDO
+    
+    return CertificadoValidacao(
+        codigo=resultado.codigo_certificado,
+        nome_aluno=resultado.nome_completo,
+        titulo_prova=resultado.titulo_prova,
+        titulo_temporada=resultado.titulo_temporada,
+        pontuacao=resultado.pontuacao,
+        data_realizacao=resultado.data_realizacao
+    )
@@ -1,11 +1,13 @@
 """
 Rotas do Dashboard Admin
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from uuid import UUID
 
 from app.database.connection import get_db
 from app.models.user import User
@@ -13,21 +15,31 @@ from app.models.temporada import Temporada
 from app.models.episodio import Episodio
 from app.models.prova import Prova, ResultadoProva, Pergunta, OpcaoResposta
 from app.models.progresso import UsuarioEpisodio
+from app.models.estatistica import EstatisticaEpisodio, EstatisticaTemporada, EstatisticaProva
 from app.utils.jwt import get_current_admin
+from app.services.ranking import ranking_usuarios, com_posicoes, posicoes_usuario
+from app.services.cubo import montar_cubo
+from app.services.resumos import serie_diaria, ouvintes_distintos, hoje_utc
+from app.services.exportacao import RELATORIOS, FORMATOS, exportar
+from app.services.cache_dashboard import cache_dashboard, Calculo
 import boto3
 from botocore.client import Config
 import os
 
 router = APIRouter()
 
-@router.get("/stats")
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
-):
-    """
-    Obtém estatísticas gerais para o dashboard admin.
-    """
+# As rotas de leitura passam pelo cache do dashboard (app/services/cache_dashboard.py):
+# respostas de até alguns minutos servidas na hora e recalculadas em segundo plano.
+# ?fresh=1 devolve os números ao vivo.
+
+def _responder(response: Response, chave: tuple, calcular: Calculo, db: Session, fresh: bool):
+    """Resposta da chave pelo cache; X-Cache e Age dizem de quando são os números"""
+    valor, estado, idade = cache_dashboard.obter(chave, calcular, db, fresco=fresh)
+    response.headers["X-Cache"] = estado
+    response.headers["Age"] = str(int(idade))
+    return valor
+
+def _stats(db: Session, contagem: str) -> dict:
     # 1. Armazenamento DB (PostgreSQL Size)
     try:
         db_name = db.bind.url.database
@@ -64,11 +76,12 @@ def get_dashboard_stats(
     size_mb = total_size_mb # Compatibilidade com variável existente
 
 
-    # Usuários
-    total_usuarios = db.query(User).count()
-    usuarios_ativos = db.query(User).filter(User.status == "ativo").count()
-    usuarios_pendentes = db.query(User).filter(User.status == "pendente").count()
-    usuarios_inativos = db.query(User).filter(User.status == "inativo").count()
+    # Usuários (um GROUP BY pelo índice de status)
+    por_status = dict(db.query(User.status, func.count(User.id)).group_by(User.status).all())
+    total_usuarios = sum(por_status.values())
+    usuarios_ativos = por_status.get("ativo", 0)
+    usuarios_pendentes = por_status.get("pendente", 0)
+    usuarios_inativos = por_status.get("inativo", 0)
     
     # Conteúdo
     total_temporadas = db.query(Temporada).count()
@@ -78,13 +91,38 @@ def get_dashboard_stats(
     
     # Provas
     total_provas = db.query(Prova).count()
-    total_tentativas = db.query(ResultadoProva).count()
-    tentativas_aprovadas = db.query(ResultadoProva).filter(ResultadoProva.aprovado == True).count()
+    if contagem == "exata":
+        total_tentativas = db.query(ResultadoProva).count()
+        tentativas_aprovadas = db.query(ResultadoProva).filter(ResultadoProva.aprovado == True).count()
+    else:
+        # Contadores mantidos por prova: numerador e denominador da mesma fonte
+        total_tentativas, tentativas_aprovadas = db.query(
+            func.coalesce(func.sum(EstatisticaProva.tentativas), 0),
+            func.coalesce(func.sum(EstatisticaProva.aprovadas), 0)
+        ).one()
     taxa_aprovacao = (tentativas_aprovadas / total_tentativas * 100) if total_tentativas > 0 else 0
     
     # Progresso geral
-    total_visualizacoes = db.query(UsuarioEpisodio).count()
-    episodios_concluidos = db.query(UsuarioEpisodio).filter(UsuarioEpisodio.assistido == True).count()
+    if contagem == "exata":
+        total_visualizacoes = db.query(UsuarioEpisodio).count()
+        episodios_concluidos = db.query(UsuarioEpisodio).filter(UsuarioEpisodio.assistido == True).count()
+    else:
+        # Contadores de audiência por temporada (todo episódio tem temporada)
+        total_visualizacoes, episodios_concluidos = db.query(
+            func.coalesce(func.sum(EstatisticaTemporada.visualizacoes), 0),
+            func.coalesce(func.sum(EstatisticaTemporada.concluidos), 0)
+        ).one()
+    
+    # Ouvintes distintos (usuários com progresso no período)
+    ouvintes = {}
+    for dias in (1, 7, 30):
+        if contagem == "exata":
+            ouvintes[f"ultimos_{dias}_dias"] = db.query(func.count(func.distinct(UsuarioEpisodio.usuario_id)))\
+                .filter(UsuarioEpisodio.updated_at >= datetime.combine(hoje_utc() - timedelta(days=dias - 1), time.min))\
+                .scalar()
+        else:
+            ouvintes[f"ultimos_{dias}_dias"] = ouvintes_distintos(db, dias)
+    precisao_ouvintes = contagem
     
     return {
         "usuarios": {
@@ -109,78 +147,140 @@ def get_dashboard_stats(
             "aprovadas": tentativas_aprovadas,
             "taxa_aprovacao": round(taxa_aprovacao, 1)
         },
+        "ouvintes": ouvintes,
         "storage": {
             "used_mb": size_mb,
             "total_mb": 10240, # 10GB
             "percent": round((size_mb / 10240) * 100, 2) if size_mb else 0
+        },
+        # Contadores não listados são exatos
+        "precisao": {
+            **{chave: contagem for chave in (
+                "episodios.visualizacoes", "episodios.concluidos",
+                "provas.tentativas", "provas.aprovadas", "provas.taxa_aprovacao"
+            )},
+            **{f"ouvintes.{chave}": precisao_ouvintes for chave in ouvintes}
         }
     }
 
-@router.get("/users-progress")
-def get_users_progress(
-    limit: int = Query(10, ge=1, le=100),
+@router.get("/stats")
+def get_dashboard_stats(
+    response: Response,
+    contagem: str = Query("aproximada", pattern="^(exata|aproximada)$"),
+    fresh: bool = Query(False),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Obtém os usuários mais ativos com seu progresso.
+    Obtém estatísticas gerais para o dashboard admin.
+    contagem=aproximada (padrão) lê progresso e resultados dos contadores mantidos
+    (estatisticas_temporada e estatisticas_prova, corrigidos pela reconciliação) e
+    estima os ouvintes distintos por HyperLogLog; contagem=exata conta tudo.
+    "precisao" informa, por contador, se o valor é exato ou aproximado.
     """
+    return _responder(response, ("stats", contagem), lambda sessao: _stats(sessao, contagem), db, fresh)
+
+def _users_progress(db: Session, limit: int, area: Optional[str], cargo: Optional[str]) -> dict:
     # Total de episódios publicados
     total_episodios = db.query(Episodio).filter(Episodio.status == "publicado").count()
     
-    # Usuários com mais episódios concluídos
-    users_progress = db.query(
-        User.id,
-        User.nome_completo,
-        User.email,
-        func.count(UsuarioEpisodio.id).label('episodios_assistidos')
-    ).outerjoin(
-        UsuarioEpisodio, 
-        (User.id == UsuarioEpisodio.usuario_id) & (UsuarioEpisodio.assistido == True)
-    ).filter(
-        User.status == "ativo"
-    ).group_by(
-        User.id
-    ).order_by(
-        func.count(UsuarioEpisodio.id).desc()
-    ).limit(limit).all()
+    # Usuários com mais episódios concluídos (contador users.episodios_concluidos)
+    users_progress = ranking_usuarios(db, limit, area=area, cargo=cargo)
     
     result = []
-    for u in users_progress:
-        progresso = (u.episodios_assistidos / total_episodios * 100) if total_episodios > 0 else 0
+    for posicao, u in com_posicoes(users_progress):
+        progresso = (u.episodios_concluidos / total_episodios * 100) if total_episodios > 0 else 0
         result.append({
             "id": str(u.id),
             "nome": u.nome_completo,
             "email": u.email,
-            "episodios_assistidos": u.episodios_assistidos,
+            "area": u.area,
+            "cargo": u.cargo,
+            "posicao": posicao,
+            "episodios_assistidos": u.episodios_concluidos,
             "total_episodios": total_episodios,
             "progresso": round(progresso, 1)
         })
     
     return {"users": result}
 
-@router.get("/provas-performance")
-def get_provas_performance(
+@router.get("/users-progress")
+def get_users_progress(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    area: Optional[str] = None,
+    cargo: Optional[str] = None,
+    fresh: bool = Query(False),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Obtém performance das provas e questões mais erradas.
+    Obtém os usuários mais ativos com seu progresso (opcionalmente por área/cargo).
+    """
+    return _responder(
+        response, ("users-progress", limit, area, cargo),
+        lambda sessao: _users_progress(sessao, limit, area, cargo), db, fresh
+    )
+
+@router.get("/users-progress/{user_id}/posicao")
+def get_user_posicao(
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
     """
-    provas = db.query(Prova).all()
+    Obtém a posição de um usuário no ranking geral, da sua área e do seu cargo.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não encontrado"
+        )
+    
+    return {
+        "id": str(user.id),
+        "nome": user.nome_completo,
+        "area": user.area,
+        "cargo": user.cargo,
+        "episodios_assistidos": user.episodios_concluidos,
+        "posicao": posicoes_usuario(db, user)
+    }
+
+@router.get("/cubo")
+def get_cubo(
+    response: Response,
+    temporada_id: Optional[UUID] = None,
+    fresh: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Obtém conclusão, aprovação e média das provas por área × cargo × temporada,
+    com todos os subtotais (colunas + linhas para pivotar no cliente).
+    """
+    return _responder(response, ("cubo", temporada_id), lambda sessao: montar_cubo(sessao, temporada_id), db, fresh)
+
+def _provas_performance(db: Session) -> dict:
+    provas = db.query(
+        Prova.id,
+        Prova.titulo,
+        EstatisticaProva.tentativas,
+        EstatisticaProva.aprovadas,
+        EstatisticaProva.soma_pontuacao
+    ).outerjoin(
+        EstatisticaProva,
+        EstatisticaProva.prova_id == Prova.id
+    ).all()
     
     provas_stats = []
     for prova in provas:
-        total_tentativas = db.query(ResultadoProva).filter(ResultadoProva.prova_id == prova.id).count()
-        aprovadas = db.query(ResultadoProva).filter(
-            ResultadoProva.prova_id == prova.id,
-            ResultadoProva.aprovado == True
-        ).count()
+        total_tentativas = prova.tentativas or 0
+        aprovadas = prova.aprovadas or 0
         
         # Média de pontuação
-        avg_query = db.query(func.avg(ResultadoProva.pontuacao)).filter(
-            ResultadoProva.prova_id == prova.id
-        ).scalar()
+        avg_query = (prova.soma_pontuacao / total_tentativas) if total_tentativas > 0 else 0
         
         provas_stats.append({
             "prova_id": str(prova.id),
@@ -193,70 +293,157 @@ def get_provas_performance(
     
     return {"provas": provas_stats}
 
-@router.get("/episodios-ranking")
-def get_episodios_ranking(
-    limit: int = Query(10, ge=1, le=50),
+@router.get("/provas-performance")
+def get_provas_performance(
+    response: Response,
+    fresh: bool = Query(False),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Obtém os episódios mais assistidos.
+    Obtém tentativas, aprovação e nota média de cada prova.
+    Lê os contadores de estatisticas_prova (uma linha por prova).
     """
+    return _responder(response, ("provas-performance",), _provas_performance, db, fresh)
+
+def _episodios_ranking(db: Session, limit: int) -> dict:
     ranking = db.query(
         Episodio.id,
         Episodio.titulo,
-        func.count(UsuarioEpisodio.id).label('visualizacoes'),
-        func.sum(
-            func.cast(UsuarioEpisodio.assistido, db.bind.dialect.type_descriptor(db.bind.dialect.type_descriptor.__class__))
-        ).label('concluidos')
-    ).outerjoin(
-        UsuarioEpisodio,
-        Episodio.id == UsuarioEpisodio.episodio_id
-    ).group_by(
-        Episodio.id
+        EstatisticaEpisodio.visualizacoes,
+        EstatisticaEpisodio.concluidos,
+        EstatisticaEpisodio.segundos_ouvidos
+    ).join(
+        Episodio,
+        Episodio.id == EstatisticaEpisodio.episodio_id
     ).order_by(
-        func.count(UsuarioEpisodio.id).desc()
+        EstatisticaEpisodio.visualizacoes.desc()
     ).limit(limit).all()
     
     result = []
     for ep in ranking:
-        concluidos = ep.concluidos or 0
-        taxa = (concluidos / ep.visualizacoes * 100) if ep.visualizacoes > 0 else 0
+        taxa = (ep.concluidos / ep.visualizacoes * 100) if ep.visualizacoes > 0 else 0
         result.append({
             "id": str(ep.id),
             "titulo": ep.titulo,
             "visualizacoes": ep.visualizacoes,
-            "concluidos": concluidos,
+            "concluidos": ep.concluidos,
+            "segundos_ouvidos": ep.segundos_ouvidos,
             "taxa_conclusao": round(taxa, 1)
         })
     
     return {"episodios": result}
 
-@router.get("/novos-usuarios")
-def get_novos_usuarios(
-    dias: int = Query(30, ge=1, le=365),
+@router.get("/episodios-ranking")
+def get_episodios_ranking(
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
+    fresh: bool = Query(False),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Obtém contagem de novos usuários por dia nos últimos X dias.
+    Obtém os episódios mais assistidos (contadores de estatisticas_episodio).
     """
-    data_inicio = datetime.utcnow() - timedelta(days=dias)
-    
-    usuarios_por_dia = db.query(
-        func.date(User.created_at).label('data'),
-        func.count(User.id).label('quantidade')
-    ).filter(
-        User.created_at >= data_inicio
-    ).group_by(
-        func.date(User.created_at)
+    return _responder(response, ("episodios-ranking", limit), lambda sessao: _episodios_ranking(sessao, limit), db, fresh)
+
+def _temporadas_ranking(db: Session, limit: int) -> dict:
+    ranking = db.query(
+        Temporada.id,
+        Temporada.nome,
+        EstatisticaTemporada.visualizacoes,
+        EstatisticaTemporada.concluidos,
+        EstatisticaTemporada.segundos_ouvidos
+    ).join(
+        Temporada,
+        Temporada.id == EstatisticaTemporada.temporada_id
     ).order_by(
-        func.date(User.created_at)
-    ).all()
+        EstatisticaTemporada.visualizacoes.desc()
+    ).limit(limit).all()
+    
+    result = []
+    for temp in ranking:
+        taxa = (temp.concluidos / temp.visualizacoes * 100) if temp.visualizacoes > 0 else 0
+        result.append({
+            "id": str(temp.id),
+            "nome": temp.nome,
+            "visualizacoes": temp.visualizacoes,
+            "concluidos": temp.concluidos,
+            "segundos_ouvidos": temp.segundos_ouvidos,
+            "taxa_conclusao": round(taxa, 1)
+        })
     
+    return {"temporadas": result}
+
+@router.get("/temporadas-ranking")
+def get_temporadas_ranking(
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
+    fresh: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Obtém as temporadas mais assistidas (contadores de estatisticas_temporada).
+    """
+    return _responder(response, ("temporadas-ranking", limit), lambda sessao: _temporadas_ranking(sessao, limit), db, fresh)
+
+def _novos_usuarios(db: Session, dias: int) -> dict:
     result = [
-        {"data": str(u.data), "quantidade": u.quantidade}
-        for u in usuarios_por_dia
+        {"data": dia["data"], "quantidade": dia["novos_usuarios"]}
+        for dia in serie_diaria(db, dias)
     ]
     
     return {"dados": result}
+
+@router.get("/novos-usuarios")
+def get_novos_usuarios(
+    response: Response,
+    dias: int = Query(30, ge=1, le=365),
+    fresh: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Obtém contagem de novos usuários por dia nos últimos X dias (dias sem cadastro = 0).
+    """
+    return _responder(response, ("novos-usuarios", dias), lambda sessao: _novos_usuarios(sessao, dias), db, fresh)
+
+@router.get("/serie-diaria")
+def get_serie_diaria(
+    response: Response,
+    dias: int = Query(30, ge=1, le=365),
+    temporada_id: Optional[UUID] = None,
+    fresh: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Obtém a série diária de cadastros, conclusões, tentativas, aprovação e segundos
+    ouvidos (geral ou de uma temporada), a partir dos resumos diários.
+    """
+    return _responder(response, ("serie-diaria", dias, temporada_id), lambda sessao: {"dados": serie_diaria(sessao, dias, temporada_id)}, db, fresh)
+
+@router.get("/export/{relatorio}")
+def export_relatorio(
+    relatorio: str,
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Exporta o relatório completo (usuarios, progresso ou resultados) em CSV ou NDJSON,
+    em streaming e sem limite de linhas.
+    """
+    if relatorio not in RELATORIOS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Relatório não encontrado. Disponíveis: {', '.join(RELATORIOS)}"
+        )
+    
+    filename = f"{relatorio}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{formato}"
+    
+    return StreamingResponse(
+        exportar(relatorio, formato),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
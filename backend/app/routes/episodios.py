@@ -2,53 +2,65 @@
 Rotas de Episódios
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi.responses import Response
+from sqlalchemy.orm import Session, defer
 from typing import Optional, List
 from uuid import UUID
 import os
 
 from app.database.connection import get_db
-from app.models.episodio import Episodio
+from app.models.episodio import Episodio, TrechoTranscricao, resumo_episodio
 from app.models.temporada import Temporada
 from app.models.user import User
-from app.schemas.temporada import EpisodioCreate, EpisodioUpdate, EpisodioOut
+from app.schemas.temporada import EpisodioCreate, EpisodioUpdate, EpisodioSummary, EpisodioOut, TranscricaoPagina
 from app.utils.jwt import get_current_user, get_current_admin
+from app.services.catalogo import get_catalogo, invalidar_catalogo, pagina_json
+from app.utils.paginacao import paginar, definir_headers, LIMITE_PADRAO
+from app.services.conteudo_episodio import atualizar_conteudo_derivado
 
 router = APIRouter()
 
 from sqlalchemy import or_, and_, func
 
-@router.get("", response_model=List[EpisodioOut])
+@router.get("", response_model=List[EpisodioSummary])
 async def list_episodios(
+    response: Response,
     temporada_id: Optional[UUID] = Query(None),
     status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lista episódios, opcionalmente filtrados por temporada.
+    Com limit/cursor, pagina por (ordem, id); o próximo cursor vem no header X-Next-Cursor.
     """
-    query = db.query(Episodio)
+    # Usuário comum só vê liberados: publicados, visíveis e com data de lançamento alcançada (snapshot do catálogo)
+    if current_user.perfil != "admin":
+        catalogo = get_catalogo()
+        itens = catalogo.episodios_por_temporada.get(temporada_id, []) if temporada_id else catalogo.episodios
+        conteudo, proximo = pagina_json(itens, limit, cursor)
+        resposta = Response(content=conteudo, media_type="application/json",
+                            headers={"Cache-Control": catalogo.cache_control()})
+        definir_headers(resposta, proximo)
+        return resposta
+    
+    query = db.query(Episodio).options(*resumo_episodio())
     
     if temporada_id:
         query = query.filter(Episodio.temporada_id == temporada_id)
     
-    # Usuário comum só vê publicados, visíveis e com data de lançamento alcançada
-    if current_user.perfil != "admin":
-        query = query.filter(
-            Episodio.status == "publicado",
-            Episodio.visivel == True,
-            or_(
-                Episodio.data_lancamento == None,
-                Episodio.data_lancamento <= func.now()
-            )
-        )
-    elif status_filter:
+    if status_filter:
         query = query.filter(Episodio.status == status_filter)
     
-    episodios = query.order_by(Episodio.ordem).all()
+    if limit is None and cursor is None:
+        episodios = query.order_by(Episodio.ordem, Episodio.id).all()
+    else:
+        episodios, proximo = paginar(query, (Episodio.ordem, Episodio.id), limit or LIMITE_PADRAO, cursor)
+        definir_headers(response, proximo)
     
-    return [EpisodioOut.model_validate(ep) for ep in episodios]
+    return [EpisodioSummary.model_validate(ep) for ep in episodios]
 
 
 
@@ -60,8 +72,13 @@ async def get_episodio(
 ):
     """
     Obtém detalhes de um episódio.
+    Usuários comuns recebem o conteúdo em HTML; a transcrição vem paginada em /transcricao.
     """
-    episodio = db.query(Episodio).filter(Episodio.id == episodio_id).first()
+    query = db.query(Episodio)
+    if current_user.perfil != "admin":
+        query = query.options(defer(Episodio.transcricao), defer(Episodio.conteudo_texto))
+    
+    episodio = query.filter(Episodio.id == episodio_id).first()
     
     if not episodio:
         raise HTTPException(
@@ -69,14 +86,67 @@ async def get_episodio(
             detail="Episódio não encontrado"
         )
     
-    # Usuário comum só vê publicados
-    if current_user.perfil != "admin" and episodio.status != "publicado":
+    if current_user.perfil == "admin":
+        return EpisodioOut.model_validate(episodio)
+    
+    # Usuário comum só vê liberados
+    if not episodio.liberado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Episódio não encontrado"
         )
     
-    return EpisodioOut.model_validate(episodio)
+    return EpisodioOut(
+        **EpisodioSummary.model_validate(episodio).model_dump(),
+        conteudo_html=episodio.conteudo_html
+    )
+
+@router.get("/{episodio_id}/transcricao", response_model=TranscricaoPagina)
+async def get_transcricao(
+    episodio_id: UUID,
+    pagina: int = Query(1, ge=1),
+    por_pagina: int = Query(20, ge=1, le=100),
+    inicio: Optional[int] = Query(None, ge=0, description="Segundos (inclusivo)"),
+    fim: Optional[int] = Query(None, ge=0, description="Segundos (exclusivo)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Transcrição paginada por parágrafos.
+    Com inicio/fim, só os parágrafos com marca de tempo nesse intervalo.
+    """
+    episodio = db.query(Episodio)\
+        .options(*resumo_episodio())\
+        .filter(Episodio.id == episodio_id)\
+        .first()
+    
+    if not episodio or (current_user.perfil != "admin" and not episodio.liberado):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Episódio não encontrado"
+        )
+    
+    query = db.query(TrechoTranscricao).filter(TrechoTranscricao.episodio_id == episodio_id)
+    if inicio is not None:
+        query = query.filter(TrechoTranscricao.inicio >= inicio)
+    if fim is not None:
+        query = query.filter(TrechoTranscricao.inicio < fim)
+    
+    total = query.count()
+    trechos = query\
+        .order_by(TrechoTranscricao.indice)\
+        .offset((pagina - 1) * por_pagina)\
+        .limit(por_pagina)\
+        .all()
+    
+    return TranscricaoPagina(
+        episodio_id=episodio_id,
+        pagina=pagina,
+        por_pagina=por_pagina,
+        total_trechos=total,
+        total_paginas=(total + por_pagina - 1) // por_pagina,
+        trechos=trechos
+    )
 
 @router.post("", response_model=EpisodioOut, status_code=status.HTTP_201_CREATED)
 async def create_episodio(
@@ -111,8 +181,10 @@ async def create_episodio(
     )
     
     db.add(episodio)
+    atualizar_conteudo_derivado(db, episodio)
     db.commit()
     db.refresh(episodio)
+    invalidar_catalogo()
     
     return EpisodioOut.model_validate(episodio)
 
@@ -149,8 +221,17 @@ async def update_episodio(
     for field, value in update_data.items():
         setattr(episodio, field, value)
     
+    # Trechos da transcrição e HTML do conteúdo são gerados aqui, não a cada leitura
+    if "transcricao" in update_data or "conteudo_texto" in update_data:
+        atualizar_conteudo_derivado(
+            db, episodio,
+            transcricao="transcricao" in update_data,
+            conteudo="conteudo_texto" in update_data
+        )
+    
     db.commit()
     db.refresh(episodio)
+    invalidar_catalogo()
     
     return EpisodioOut.model_validate(episodio)
 
@@ -174,6 +255,7 @@ async def delete_episodio(
     
     db.delete(episodio)
     db.commit()
+    invalidar_catalogo()
     
     return {"message": "Episódio deletado com sucesso"}
 
@@ -187,9 +269,9 @@ async def get_episodio_stats(
     Obtém estatísticas de um episódio.
     Apenas admins.
     """
-    from app.models.progresso import UsuarioEpisodio
+    from app.models.estatistica import EstatisticaEpisodio
     
-    episodio = db.query(Episodio).filter(Episodio.id == episodio_id).first()
+    episodio = db.query(Episodio.id, Episodio.titulo).filter(Episodio.id == episodio_id).first()
     
     if not episodio:
         raise HTTPException(
@@ -197,14 +279,10 @@ async def get_episodio_stats(
             detail="Episódio não encontrado"
         )
     
-    # Estatísticas
-    total_views = db.query(UsuarioEpisodio)\
-        .filter(UsuarioEpisodio.episodio_id == episodio_id)\
-        .count()
-    
-    completed = db.query(UsuarioEpisodio)\
-        .filter(UsuarioEpisodio.episodio_id == episodio_id, UsuarioEpisodio.assistido == True)\
-        .count()
+    # Estatísticas (contadores mantidos pelas escritas de progresso)
+    estatistica = db.get(EstatisticaEpisodio, episodio_id)
+    total_views = estatistica.visualizacoes if estatistica else 0
+    completed = estatistica.concluidos if estatistica else 0
     
     avg_completion = (completed / total_views * 100) if total_views > 0 else 0
     
@@ -213,5 +291,6 @@ async def get_episodio_stats(
         "titulo": episodio.titulo,
         "total_views": total_views,
         "completed": completed,
+        "seconds_listened": estatistica.segundos_ouvidos if estatistica else 0,
         "avg_completion": round(avg_completion, 1)
     }
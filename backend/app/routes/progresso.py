@@ -8,16 +8,40 @@ from uuid import UUID
 from datetime import datetime
 
 from app.database.connection import get_db
-from app.models.episodio import Episodio
+from app.models.episodio import Episodio, resumo_episodio
 from app.models.temporada import Temporada
 from app.models.progresso import UsuarioEpisodio
 from app.models.prova import Prova, ResultadoProva
 from app.models.user import User
-from app.schemas.progresso import ProgressoUpdate, ProgressoEpisodio, ProgressoTemporada, ProgressoGeral
+from app.schemas.progresso import ProgressoUpdate, ProgressoEpisodio, ProgressoTemporada, ProgressoGeral, FeedUsuario, ContinuarUsuario
 from app.utils.jwt import get_current_user
+from app.services.feed import montar_feed
+from app.services.retomada import obter_continuar, registrar_progresso
+from app.services.estatisticas import contabilizar_progresso
 
 router = APIRouter()
 
+@router.get("/feed", response_model=FeedUsuario)
+async def get_feed(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Tela inicial do aluno numa resposta: temporadas liberadas com episódios,
+    progresso por episódio, situação da prova e o episódio para continuar.
+    """
+    return montar_feed(db, current_user.id)
+
+@router.get("/continuar", response_model=ContinuarUsuario)
+async def get_continuar(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Onde o usuário parou (último episódio em andamento) e o próximo não assistido.
+    """
+    return obter_continuar(db, current_user.id)
+
 @router.get("/progresso", response_model=ProgressoGeral)
 async def get_progresso_geral(
     db: Session = Depends(get_db),
@@ -39,6 +63,7 @@ async def get_progresso_geral(
     for temp in temporadas:
         # Episódios da temporada
         episodios = db.query(Episodio)\
+            .options(*resumo_episodio())\
             .filter(Episodio.temporada_id == temp.id, Episodio.status == "publicado")\
             .all()
         
@@ -124,6 +149,7 @@ async def get_progresso_temporada(
         )
     
     episodios = db.query(Episodio)\
+        .options(*resumo_episodio())\
         .filter(Episodio.temporada_id == temporada_id, Episodio.status == "publicado")\
         .order_by(Episodio.ordem)\
         .all()
@@ -200,6 +226,7 @@ async def update_progresso(
         )\
         .first()
     
+    nova_visualizacao = progresso is None
     if not progresso:
         progresso = UsuarioEpisodio(
             usuario_id=current_user.id,
@@ -207,14 +234,19 @@ async def update_progresso(
         )
         db.add(progresso)
     
+    tempo_anterior = progresso.tempo_atual or 0
     progresso.tempo_atual = data.tempo_atual
+    concluiu = False
     
     # Marcar como assistido se chegou a 90% (se soubermos a duração)
     if episodio.duracao and data.tempo_atual >= (episodio.duracao * 0.9):
         if not progresso.assistido:
             progresso.assistido = True
             progresso.data_conclusao = datetime.utcnow()
+            concluiu = True
     
+    registrar_progresso(db, current_user.id, episodio, progresso, concluiu)
+    contabilizar_progresso(db, current_user.id, episodio, nova_visualizacao, concluiu, data.tempo_atual - tempo_anterior)
     db.commit()
     
     return {"message": "Progresso salvo", "tempo_atual": data.tempo_atual}
@@ -244,6 +276,7 @@ async def marcar_assistido(
         )\
         .first()
     
+    nova_visualizacao = progresso is None
     if not progresso:
         progresso = UsuarioEpisodio(
             usuario_id=current_user.id,
@@ -251,12 +284,16 @@ async def marcar_assistido(
         )
         db.add(progresso)
     
-    if not progresso.assistido:
+    tempo_anterior = progresso.tempo_atual or 0
+    concluiu = not progresso.assistido
+    if concluiu:
         progresso.assistido = True
         progresso.data_conclusao = datetime.utcnow()
         if episodio.duracao:
             progresso.tempo_atual = episodio.duracao
     
+    registrar_progresso(db, current_user.id, episodio, progresso, concluiu)
+    contabilizar_progresso(db, current_user.id, episodio, nova_visualizacao, concluiu, (progresso.tempo_atual or 0) - tempo_anterior)
     db.commit()
     
     return {"message": "Episódio marcado como assistido"}
@@ -1,16 +1,16 @@
 """
 Rotas de Provas
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Query
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from decimal import Decimal
 from datetime import datetime
 
 from app.database.connection import get_db
-from app.models.prova import Prova, Pergunta, OpcaoResposta, ResultadoProva
+from app.models.prova import Prova, Pergunta, OpcaoResposta, ResultadoProva, SessaoProva
 from app.models.temporada import Temporada
 from app.models.episodio import Episodio
 from app.models.progresso import UsuarioEpisodio
@@ -18,10 +18,15 @@ from app.models.user import User
 from app.schemas.prova import (
     ProvaCreate, ProvaUpdate, ProvaOut, ProvaWithPerguntas,
     PerguntaCreate, PerguntaOut, OpcaoOut,
-    ResponderProva, ResultadoOut, ResultadoDetalhado, PerguntaWithAnswer, OpcaoWithAnswer
+    ResponderProva, ResultadoOut, ResultadoDetalhado, SessaoProvaOut, AutosaveRespostas
 )
 from app.utils.jwt import get_current_user, get_current_admin
-from app.services.certificados import gerar_certificado
+from app.services.certificados import emitir_certificado, emitir_certificado_em_background
+from app.services.storage_service import stream_file_from_r2, key_from_url
+from app.services.tentativas import registrar_tentativa
+from app.utils.paginacao import paginar, definir_headers, LIMITE_PADRAO
+from app.services.sessoes_prova import iniciar_sessao, finalizar_sessao, salvar_respostas, sessao_out
+from app.services.catalogo import invalidar_catalogo
 
 router = APIRouter()
 
@@ -51,22 +56,27 @@ def verificar_prova_liberada(db: Session, temporada_id: UUID, usuario_id: UUID)
 
 @router.get("", response_model=List[ProvaOut])
 async def list_provas(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lista todas as provas.
     Admins veem todas; usuários veem apenas provas de temporadas disponíveis.
+    Com limit/cursor, pagina por (created_at, id) decrescente; o próximo cursor vem no header X-Next-Cursor.
     """
-    if current_user.perfil == "admin":
-        provas = db.query(Prova).order_by(Prova.created_at.desc()).all()
-    else:
+    query = db.query(Prova)
+    if current_user.perfil != "admin":
         # Usuários comuns veem apenas provas de temporadas publicadas
-        provas = db.query(Prova)\
-            .join(Temporada)\
-            .filter(Temporada.status == "publicado")\
-            .order_by(Prova.created_at.desc())\
-            .all()
+        query = query.join(Temporada).filter(Temporada.status == "publicado")
+    
+    if limit is None and cursor is None:
+        provas = query.order_by(Prova.created_at.desc(), Prova.id.desc()).all()
+    else:
+        provas, proximo = paginar(query, (Prova.created_at, Prova.id), limit or LIMITE_PADRAO, cursor, desc=True)
+        definir_headers(response, proximo)
     
     return [ProvaOut.model_validate(p) for p in provas]
 
@@ -142,15 +152,15 @@ async def get_prova(
         bloqueado=bloqueado
     )
 
-@router.post("/{prova_id}/responder", response_model=ResultadoDetalhado)
-async def responder_prova(
+@router.post("/{prova_id}/sessao", response_model=SessaoProvaOut)
+async def iniciar_sessao_prova(
     prova_id: UUID,
-    respostas: ResponderProva,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Envia respostas da prova e recebe o resultado.
+    Inicia (ou retoma) a sessão da prova.
+    O prazo é controlado pelo servidor; as respostas salvas voltam junto.
     """
     prova = db.query(Prova).filter(Prova.id == prova_id).first()
     
@@ -160,110 +170,140 @@ async def responder_prova(
             detail="Prova não encontrada"
         )
     
-    # Verificar se está liberada
     if not verificar_prova_liberada(db, prova.temporada_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Complete todos os episódios antes de fazer a prova"
         )
     
-    # Verificar tentativas
-    tentativas_feitas = db.query(ResultadoProva)\
-        .filter(ResultadoProva.prova_id == prova_id, ResultadoProva.usuario_id == current_user.id)\
-        .count()
-    
-    if tentativas_feitas >= prova.tentativas_permitidas:
+    sessao = iniciar_sessao(db, prova, current_user.id)
+    if sessao is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você já esgotou todas as tentativas"
         )
     
-    # Calcular pontuação
-    perguntas = db.query(Pergunta).filter(Pergunta.prova_id == prova_id).all()
+    return sessao_out(sessao)
+
+@router.patch("/sessoes/{sessao_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def autosave_sessao_prova(
+    sessao_id: UUID,
+    data: AutosaveRespostas,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Salva respostas parciais da sessão (autosave).
+    Chamado a cada resposta: carrega o usuário (bloqueia inativos) e faz um UPDATE.
+    """
+    if not salvar_respostas(db, sessao_id, current_user.id, data.respostas):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Sessão de prova finalizada ou tempo esgotado"
+        )
     
-    total_pontos = sum(p.peso for p in perguntas)
-    pontos_obtidos = 0
-    acertos = 0
-    erros = 0
-    feedback_perguntas = []
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/{prova_id}/responder", response_model=ResultadoDetalhado)
+async def responder_prova(
+    prova_id: UUID,
+    respostas: ResponderProva,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Envia respostas da prova e recebe o resultado.
+    """
+    prova = db.query(Prova).filter(Prova.id == prova_id).first()
     
-    for pergunta in perguntas:
-        resposta_usuario_id = respostas.respostas.get(str(pergunta.id))
-        
-        # Buscar opções
-        opcoes = db.query(OpcaoResposta).filter(OpcaoResposta.pergunta_id == pergunta.id).all()
-        opcao_correta = next((o for o in opcoes if o.correta), None)
+    if not prova:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prova não encontrada"
+        )
+    
+    # Verificar se está liberada
+    if not verificar_prova_liberada(db, prova.temporada_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Complete todos os episódios antes de fazer a prova"
+        )
+    
+    if respostas.sessao_id:
+        # Prova cronometrada: respostas salvas na sessão + as enviadas agora (se dentro do prazo)
+        sessao = db.query(SessaoProva).filter(
+            SessaoProva.id == respostas.sessao_id,
+            SessaoProva.usuario_id == current_user.id,
+            SessaoProva.prova_id == prova_id
+        ).first()
         
-        acertou = False
-        if resposta_usuario_id and opcao_correta:
-            acertou = str(opcao_correta.id) == resposta_usuario_id
-            if acertou:
-                pontos_obtidos += pergunta.peso
-                acertos += 1
-            else:
-                erros += 1
-        else:
-            erros += 1
+        if not sessao or sessao.status != "em_andamento":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Sessão de prova inexistente ou já finalizada"
+            )
         
-        # Montar feedback se configurado para mostrar
-        if prova.mostrar_respostas:
-            feedback_perguntas.append(PerguntaWithAnswer(
-                id=pergunta.id,
-                enunciado=pergunta.enunciado,
-                ordem=pergunta.ordem,
-                peso=pergunta.peso,
-                opcoes=[OpcaoWithAnswer(
-                    id=o.id,
-                    texto=o.texto,
-                    ordem=o.ordem,
-                    correta=o.correta,
-                    feedback=o.feedback
-                ) for o in opcoes],
-                resposta_usuario=UUID(resposta_usuario_id) if resposta_usuario_id else None,
-                acertou=acertou
-            ))
-    
-    # Calcular porcentagem
-    pontuacao = (pontos_obtidos / total_pontos * 100) if total_pontos > 0 else 0
-    aprovado = pontuacao >= float(prova.nota_minima_aprovacao)
-    
-    # Salvar resultado
-    resultado = ResultadoProva(
-        usuario_id=current_user.id,
-        prova_id=prova_id,
-        respostas=respostas.respostas,
-        pontuacao=Decimal(str(round(pontuacao, 2))),
-        aprovado=aprovado,
-        tentativa_numero=tentativas_feitas + 1
-    )
+        registro = finalizar_sessao(db, sessao, prova, respostas.respostas)
+        if registro is None:
+            # A sessão se encerra mesmo sem tentativa disponível
+            db.commit()
+    else:
+        if prova.tempo_limite:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Prova com tempo limite: inicie uma sessão antes de responder"
+            )
+        registro = registrar_tentativa(db, prova, current_user.id, respostas.respostas)
+    
+    if registro is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você já esgotou todas as tentativas"
+        )
     
-    db.add(resultado)
+    resultado, correcao = registro
     db.commit()
     db.refresh(resultado)
     
+    # Certificado é renderizado uma única vez, fora da requisição
+    if resultado.aprovado:
+        background_tasks.add_task(emitir_certificado_em_background, resultado.id)
+    
     return ResultadoDetalhado(
         **ResultadoOut.model_validate(resultado).model_dump(),
-        perguntas=feedback_perguntas if prova.mostrar_respostas else [],
-        acertos=acertos,
-        erros=erros
+        perguntas=correcao["perguntas"],
+        acertos=correcao["acertos"],
+        erros=correcao["erros"]
     )
 
 @router.get("/{prova_id}/resultado", response_model=List[ResultadoOut])
 async def get_resultados(
     prova_id: UUID,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Obtém histórico de tentativas do usuário na prova.
+    Obtém histórico de tentativas do usuário na prova (mais recente primeiro).
+    Com limit/cursor, pagina por tentativa; o próximo cursor vem no header X-Next-Cursor.
     """
-    resultados = db.query(ResultadoProva)\
+    query = db.query(ResultadoProva)\
         .filter(
             ResultadoProva.prova_id == prova_id,
             ResultadoProva.usuario_id == current_user.id
-        )\
-        .order_by(ResultadoProva.tentativa_numero.desc())\
-        .all()
+        )
+    
+    if limit is None and cursor is None:
+        resultados = query.order_by(ResultadoProva.tentativa_numero.desc(), ResultadoProva.id.desc()).all()
+    else:
+        resultados, proximo = paginar(
+            query, (ResultadoProva.tentativa_numero, ResultadoProva.id),
+            limit or LIMITE_PADRAO, cursor, desc=True
+        )
+        definir_headers(response, proximo)
     
     return [ResultadoOut.model_validate(r) for r in resultados]
 
@@ -307,6 +347,7 @@ async def create_prova(
     
     db.add(prova)
     db.commit()
+    invalidar_catalogo()
     db.refresh(prova)
     
     return ProvaOut.model_validate(prova)
@@ -336,6 +377,7 @@ async def update_prova(
         setattr(prova, field, value)
     
     db.commit()
+    invalidar_catalogo()
     db.refresh(prova)
     
     return ProvaOut.model_validate(prova)
@@ -437,19 +479,26 @@ async def delete_prova(
     
     db.delete(prova)
     db.commit()
+    invalidar_catalogo()
     
     return {"message": "Prova deletada com sucesso"}
 
 
+def _etag_certificado(resultado: ResultadoProva) -> str:
+    return f'"{resultado.id.hex}-{resultado.codigo_certificado or ""}"'
+
 @router.get("/{prova_id}/certificado/{resultado_id}")
 async def download_certificado(
     prova_id: UUID,
     resultado_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Gera e retorna o certificado PDF para download.
+    Retorna o certificado PDF para download.
+    O PDF é gerado uma única vez (na aprovação ou no primeiro download)
+    e depois servido a partir do storage.
     Apenas para resultados aprovados do próprio usuário.
     """
     # Buscar resultado
@@ -478,27 +527,33 @@ async def download_certificado(
             detail="Certificado disponível apenas para aprovados"
         )
     
-    # Buscar prova e temporada
-    prova = db.query(Prova).filter(Prova.id == prova_id).first()
-    temporada = db.query(Temporada).filter(Temporada.id == prova.temporada_id).first()
-    
-    # Gerar PDF
-    pdf_bytes = gerar_certificado(
-        nome_aluno=current_user.nome_completo,
-        titulo_prova=prova.titulo,
-        titulo_temporada=temporada.nome if temporada else "N/A",
-        pontuacao=float(resultado.pontuacao),
-        data_realizacao=resultado.data_realizacao
-    )
-    
-    # Retornar como download
-    filename = f"certificado-{prova.titulo.replace(' ', '_')}.pdf"
+    # O PDF muda quando o certificado é emitido de novo (ex. novo código de validação):
+    # o ETag inclui o código e o navegador revalida a cada download (304 se igual)
+    filename = f"certificado-{resultado.prova.titulo.replace(' ', '_')}.pdf"
+    headers = {
+        "ETag": _etag_certificado(resultado),
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+    
+    if resultado.certificado_url:
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        try:
+            # PDF já emitido: repassado do storage em pedaços
+            pedacos = await run_in_threadpool(
+                stream_file_from_r2, key_from_url(resultado.certificado_url)
+            )
+            return StreamingResponse(pedacos, media_type="application/pdf", headers=headers)
+        except Exception as e:
+            print(f"Aviso: certificado não encontrado no storage, gerando novamente: {e}")
+    
+    # Primeiro download (ou objeto perdido): gerar e salvar
+    pdf_bytes = await emitir_certificado(db, resultado)
+    headers["ETag"] = _etag_certificado(resultado)
     
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        }
+        headers=headers
     )
-
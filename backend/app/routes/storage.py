@@ -5,42 +5,17 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID, uuid4
-import boto3
-from botocore.client import Config
-import os
 
 from app.database.connection import get_db
 from app.models.episodio import Episodio
 from app.models.temporada import Temporada
 from app.models.user import User
 from app.utils.jwt import get_current_admin
+from app.services.storage_service import get_s3_client, upload_file_to_r2, R2_BUCKET_NAME
+from app.services.catalogo import invalidar_catalogo
 
 router = APIRouter()
 
-# Configuração do Cloudflare R2 (S3-compatible)
-R2_ACCOUNT_ID = os.getenv("R2_ACCOUNT_ID", "")
-R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID", "")
-R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY", "")
-R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "podcast-aec")
-R2_ENDPOINT = os.getenv("R2_ENDPOINT", f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com")
-
-def get_s3_client():
-    """Retorna cliente S3 configurado para Cloudflare R2"""
-    return boto3.client(
-        's3',
-        endpoint_url=R2_ENDPOINT,
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version='s3v4'),
-        region_name='auto'
-    )
-
-def get_public_url(key: str) -> str:
-    """Gera URL pública do arquivo"""
-    # Para R2, você pode configurar um domínio público ou usar presigned URLs
-    # Por enquanto, vamos usar a estrutura básica
-    return f"https://{R2_BUCKET_NAME}.{R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{key}"
-
 ALLOWED_AUDIO_TYPES = ["audio/mpeg", "audio/mp3", "audio/wav", "audio/ogg", "audio/x-m4a"]
 ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/webp", "image/gif"]
 ALLOWED_VIDEO_TYPES = ["video/mp4", "video/webm", "video/ogg", "video/quicktime"]
@@ -87,21 +62,16 @@ async def upload_audio(
     key = f"episodios/{episodio.temporada_id}/{episodio_id}/audio.{ext}"
     
     try:
-        s3 = get_s3_client()
-        s3.put_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=key,
-            Body=contents,
-            ContentType=file.content_type
-        )
+        url = upload_file_to_r2(contents, key, file.content_type)
         
         # Atualizar episódio com URL
-        episodio.audio_url = get_public_url(key)
+        episodio.audio_url = url
         
         # Tentar detectar duração (se possível)
         # TODO: Implementar detecção de duração com mutagen
         
         db.commit()
+        invalidar_catalogo()
         
         return {
             "message": "Áudio enviado com sucesso",
@@ -154,22 +124,17 @@ async def upload_video(
     key = f"episodios/{episodio.temporada_id}/{episodio_id}/video.{ext}"
     
     try:
-        s3 = get_s3_client()
-        s3.put_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=key,
-            Body=contents,
-            ContentType=file.content_type
-        )
+        url = upload_file_to_r2(contents, key, file.content_type)
         
         # Atualizar episódio com URL
-        episodio.video_url = get_public_url(key)
+        episodio.video_url = url
         
         # Se não tiver áudio, vídeo serve como principal
         if not episodio.audio_url:
              episodio.audio_url = "" # Manter consistente
         
         db.commit()
+        invalidar_catalogo()
         
         return {
             "message": "Vídeo enviado com sucesso",
@@ -235,15 +200,7 @@ async def upload_image(
         )
     
     try:
-        s3 = get_s3_client()
-        s3.put_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=key,
-            Body=contents,
-            ContentType=file.content_type
-        )
-        
-        url = get_public_url(key)
+        url = upload_file_to_r2(contents, key, file.content_type)
         
         # Atualizar entidade com URL
         if tipo == "temporada_capa":
@@ -253,6 +210,7 @@ async def upload_image(
         # Avatar é atualizado separadamente
         
         db.commit()
+        invalidar_catalogo()
         
         return {
             "message": "Imagem enviada com sucesso",
@@ -303,15 +261,7 @@ async def upload_attachment(
     key = f"episodios/{episodio.temporada_id}/{episodio_id}/anexos/{file_uuid}.{ext}"
     
     try:
-        s3 = get_s3_client()
-        s3.put_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=key,
-            Body=contents,
-            ContentType=file.content_type or 'application/octet-stream'
-        )
-        
-        url = get_public_url(key)
+        url = upload_file_to_r2(contents, key, file.content_type or 'application/octet-stream')
         
         return {
             "message": "Arquivo enviado com sucesso",
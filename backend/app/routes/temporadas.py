@@ -2,19 +2,24 @@
 Rotas de Temporadas
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from uuid import UUID
 
 from app.database.connection import get_db
 from app.models.temporada import Temporada
-from app.models.episodio import Episodio
+from app.models.episodio import Episodio, resumo_episodio
 from app.models.user import User
 from app.schemas.temporada import (
     TemporadaCreate, TemporadaUpdate, TemporadaOut, 
-    TemporadaWithEpisodios, EpisodioOut
+    TemporadaWithEpisodios, EpisodioSummary
 )
 from app.utils.jwt import get_current_user, get_current_admin
+from app.services.catalogo import get_catalogo, invalidar_catalogo, pagina_json
+from app.utils.paginacao import paginar, definir_headers, LIMITE_PADRAO
+from app.utils.ordenacao import reordenar
+from app.services.duplicacao import duplicar_temporada
 
 router = APIRouter()
 
@@ -22,7 +27,10 @@ from sqlalchemy import or_, and_, func
 
 @router.get("", response_model=List[TemporadaOut])
 async def list_temporadas(
+    response: Response,
     status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -30,23 +38,28 @@ async def list_temporadas(
     Lista todas as temporadas.
     Usuários comuns veem apenas as publicadas.
     Admins veem todas.
+    Com limit/cursor, pagina por (ordem, id); o próximo cursor vem no header X-Next-Cursor.
     """
+    # Usuário comum só vê publicadas, visíveis e liberadas (snapshot do catálogo)
+    if current_user.perfil != "admin":
+        catalogo = get_catalogo()
+        conteudo, proximo = pagina_json(catalogo.temporadas, limit, cursor)
+        resposta = Response(content=conteudo, media_type="application/json",
+                            headers={"Cache-Control": catalogo.cache_control()})
+        definir_headers(resposta, proximo)
+        return resposta
+    
     query = db.query(Temporada)
     
-    # Usuário comum só vê publicadas, visíveis e liberadas
-    if current_user.perfil != "admin":
-        query = query.filter(
-            Temporada.status == "publicado",
-            Temporada.visivel == True,
-            or_(
-                Temporada.data_lancamento == None,
-                Temporada.data_lancamento <= func.now()
-            )
-        )
-    elif status_filter:
+    if status_filter:
         query = query.filter(Temporada.status == status_filter)
     
-    temporadas = query.order_by(Temporada.ordem).all()
+    if limit is None and cursor is None:
+        temporadas = query.order_by(Temporada.ordem, Temporada.id).all()
+    else:
+        temporadas, proximo = paginar(query, (Temporada.ordem, Temporada.id), limit or LIMITE_PADRAO, cursor)
+        definir_headers(response, proximo)
+    
     return [TemporadaOut.model_validate(t) for t in temporadas]
 
 @router.get("/{temporada_id}", response_model=TemporadaWithEpisodios)
@@ -58,6 +71,18 @@ async def get_temporada(
     """
     Obtém detalhes de uma temporada com seus episódios.
     """
+    # Usuário comum só vê liberadas, com os episódios liberados (snapshot do catálogo)
+    if current_user.perfil != "admin":
+        catalogo = get_catalogo()
+        conteudo = catalogo.temporada.get(temporada_id)
+        if conteudo is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Temporada não encontrada"
+            )
+        return Response(content=conteudo, media_type="application/json",
+                        headers={"Cache-Control": catalogo.cache_control()})
+    
     temporada = db.query(Temporada).filter(Temporada.id == temporada_id).first()
     
     if not temporada:
@@ -66,25 +91,15 @@ async def get_temporada(
             detail="Temporada não encontrada"
         )
     
-    # Usuário comum só vê publicadas
-    if current_user.perfil != "admin" and temporada.status != "publicado":
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Temporada não encontrada"
-        )
-    
-    # Buscar episódios
-    episodios_query = db.query(Episodio).filter(Episodio.temporada_id == temporada_id)
-    
-    # Usuário comum só vê episódios publicados
-    if current_user.perfil != "admin":
-        episodios_query = episodios_query.filter(Episodio.status == "publicado")
-    
-    episodios = episodios_query.order_by(Episodio.ordem).all()
+    episodios = db.query(Episodio)\
+        .options(*resumo_episodio())\
+        .filter(Episodio.temporada_id == temporada_id)\
+        .order_by(Episodio.ordem)\
+        .all()
     
     return TemporadaWithEpisodios(
         **TemporadaOut.model_validate(temporada).model_dump(),
-        episodios=[EpisodioOut.model_validate(e) for e in episodios],
+        episodios=[EpisodioSummary.model_validate(e) for e in episodios],
         total_episodios=len(episodios)
     )
 
@@ -111,9 +126,43 @@ async def create_temporada(
     db.add(temporada)
     db.commit()
     db.refresh(temporada)
+    invalidar_catalogo()
     
     return TemporadaOut.model_validate(temporada)
 
+@router.put("/reorder")
+async def reorder_temporadas(
+    ordem: List[UUID],  # Lista de IDs na nova ordem (todas as temporadas)
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Reordena todas as temporadas de uma vez (ordem 1, 2, ...).
+    Apenas admins.
+    """
+    reordenar(db, Temporada, ordem, inicio=1)
+    db.commit()
+    invalidar_catalogo()
+    
+    return {"message": "Temporadas reordenadas com sucesso"}
+
+@router.put("/{temporada_id}/episodios/reorder")
+async def reorder_episodios(
+    temporada_id: UUID,
+    ordem: List[UUID],  # Lista de IDs na nova ordem (todos os episódios da temporada)
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Reordena os episódios de uma temporada de uma vez (ordem 1, 2, ...).
+    Apenas admins.
+    """
+    reordenar(db, Episodio, ordem, Episodio.temporada_id == temporada_id, inicio=1)
+    db.commit()
+    invalidar_catalogo()
+    
+    return {"message": "Episódios reordenados com sucesso"}
+
 @router.put("/{temporada_id}", response_model=TemporadaOut)
 async def update_temporada(
     temporada_id: UUID,
@@ -139,6 +188,7 @@ async def update_temporada(
     
     db.commit()
     db.refresh(temporada)
+    invalidar_catalogo()
     
     return TemporadaOut.model_validate(temporada)
 
@@ -162,6 +212,7 @@ async def reorder_temporada(
     
     temporada.ordem = nova_ordem
     db.commit()
+    invalidar_catalogo()
     
     return {"message": f"Temporada reordenada para posição {nova_ordem}"}
 
@@ -185,6 +236,7 @@ async def delete_temporada(
     
     db.delete(temporada)
     db.commit()
+    invalidar_catalogo()
     
     return {"message": "Temporada deletada com sucesso"}
 
@@ -195,7 +247,8 @@ async def duplicate_temporada(
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Duplica uma temporada (sem os episódios).
+    Duplica uma temporada com episódios, anexos e prova (tudo como rascunho).
+    Os arquivos do storage são compartilhados com a original.
     """
     original = db.query(Temporada).filter(Temporada.id == temporada_id).first()
     
@@ -205,17 +258,8 @@ async def duplicate_temporada(
             detail="Temporada não encontrada"
         )
     
-    # Criar cópia
-    nova_temporada = Temporada(
-        nome=f"{original.nome} (Cópia)",
-        descricao=original.descricao,
-        ordem=original.ordem + 1,
-        mantra=original.mantra,
-        capa_url=original.capa_url,
-        status="rascunho"
-    )
-    
-    db.add(nova_temporada)
+    # Criar cópia (INSERT ... SELECT por tabela, numa transação)
+    nova_temporada = duplicar_temporada(db, original)
     db.commit()
     db.refresh(nova_temporada)
     
@@ -3,17 +3,18 @@ Rotas de Usuários (Admin)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from app.database.connection import get_db
 from app.models.user import User
-from app.models.progresso import UsuarioEpisodio
 from app.models.prova import ResultadoProva
-from app.schemas.user import UserUpdate, UserOut, UserList, UserApprove, UserWithProgress
+from app.schemas.user import UserUpdate, UserOut, UserList, UserApprove, UserWithProgress, UserSugestao
 from app.utils.jwt import get_current_admin
 from app.services.email_service import send_approval_email, send_rejection_email
+from app.utils.paginacao import paginar, contar
+from app.services.busca import filtrar_usuarios, sugerir_usuarios
+from app.services.estatisticas import descontar_tentativas_usuario
 
 router = APIRouter()
 
@@ -25,11 +26,16 @@ async def list_users(
     search: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    contagem: str = Query("exata", pattern="^(exata|aproximada|nenhuma)$"),
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Lista todos os usuários (paginado).
+    Lista todos os usuários (paginado, mais recentes primeiro).
+    search busca em nome, email e matrícula, sem diferenciar acentos.
+    Com cursor (next_cursor da página anterior) não usa OFFSET.
+    contagem=aproximada usa a estimativa do banco; contagem=nenhuma não conta.
     Apenas admins podem acessar.
     """
     query = db.query(User)
@@ -42,29 +48,39 @@ async def list_users(
     if cargo:
         query = query.filter(User.cargo == cargo)
     if search:
-        query = query.filter(
-            or_(
-                User.nome_completo.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%")
-            )
-        )
+        query = filtrar_usuarios(query, search)
     
     # Contagem total
-    total = query.count()
+    total = contar(query, contagem)
     
-    # Paginação
-    offset = (page - 1) * limit
-    users = query.order_by(User.created_at.desc()).offset(offset).limit(limit).all()
+    # Paginação: por cursor (keyset) ou pela página (OFFSET)
+    users, next_cursor = paginar(
+        query, (User.created_at, User.id), limit, cursor, desc=True,
+        offset=0 if cursor else (page - 1) * limit
+    )
     
-    pages = (total + limit - 1) // limit  # Arredonda para cima
+    pages = (total + limit - 1) // limit if total is not None else None  # Arredonda para cima
     
     return UserList(
         users=[UserOut.model_validate(u) for u in users],
         total=total,
         page=page,
-        pages=pages
+        pages=pages,
+        next_cursor=next_cursor
     )
 
+@router.get("/sugestoes", response_model=List[UserSugestao])
+async def sugerir(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Typeahead de usuários: os mais parecidos com q, sem contagem total.
+    """
+    return sugerir_usuarios(db, q, limit)
+
 @router.get("/{user_id}", response_model=UserWithProgress)
 async def get_user(
     user_id: UUID,
@@ -81,10 +97,8 @@ async def get_user(
             detail="Usuário não encontrado"
         )
     
-    # Calcular progresso
-    episodios_concluidos = db.query(UsuarioEpisodio)\
-        .filter(UsuarioEpisodio.usuario_id == user_id, UsuarioEpisodio.assistido == True)\
-        .count()
+    # Calcular progresso (contador mantido pelas escritas de progresso)
+    episodios_concluidos = user.episodios_concluidos or 0
     
     # Total de episódios publicados
     from app.models.episodio import Episodio
@@ -192,6 +206,8 @@ async def delete_user(
             detail="Você não pode deletar sua própria conta"
         )
     
+    # Os resultados somem em cascata: tira-os antes dos totais das provas
+    descontar_tentativas_usuario(db, user.id)
     db.delete(user)
     db.commit()
     
@@ -3,16 +3,22 @@ from .auth import (
     UserRegister, UserLogin, Token, TokenRefresh,
     ForgotPassword, ResetPassword, UserBase, UserResponse, LoginResponse
 )
-from .user import UserUpdate, UserOut, UserWithProgress, UserList, UserApprove
+from .user import UserUpdate, UserOut, UserWithProgress, UserList, UserApprove, UserSugestao
 from .temporada import (
     TemporadaCreate, TemporadaUpdate, TemporadaOut, TemporadaWithEpisodios, TemporadaWithProgress,
-    EpisodioCreate, EpisodioUpdate, EpisodioOut, EpisodioWithProgress
+    EpisodioCreate, EpisodioUpdate, EpisodioSummary, EpisodioOut, EpisodioWithProgress,
+    TrechoTranscricaoOut, TranscricaoPagina
 )
 from .prova import (
     ProvaCreate, ProvaUpdate, ProvaOut, ProvaWithPerguntas,
     PerguntaCreate, PerguntaOut, PerguntaWithAnswer,
     OpcaoCreate, OpcaoOut, OpcaoWithAnswer,
-    ResponderProva, ResultadoOut, ResultadoDetalhado
+    ResponderProva, ResultadoOut, ResultadoDetalhado, CertificadoValidacao,
+    SessaoProvaOut, AutosaveRespostas
+)
+from .progresso import (
+    ProgressoUpdate, ProgressoEpisodio, ProgressoTemporada, ProgressoGeral,
+    FeedEpisodio, FeedProva, FeedTemporada, ContinuarOuvindo, ContinuarUsuario, FeedUsuario
 )
-from .progresso import ProgressoUpdate, ProgressoEpisodio, ProgressoTemporada, ProgressoGeral
 from .anexo import AnexoCreate, AnexoOut, AnexoList
+from .busca import ResultadoBusca, BuscaOut
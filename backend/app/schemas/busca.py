@@ -0,0 +1,21 @@
+"""
+Schemas de Busca
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from uuid import UUID
+
+class ResultadoBusca(BaseModel):
+    """Episódio ou temporada encontrado"""
+    tipo: str  # 'episodio', 'temporada'
+    id: UUID
+    titulo: str
+    temporada_id: Optional[UUID] = None  # episódios
+    trecho: Optional[str] = None  # HTML escapado, termos em <mark>
+    relevancia: float
+
+class BuscaOut(BaseModel):
+    """Resultados da busca, do mais relevante ao menos"""
+    q: str
+    total: int
+    resultados: List[ResultadoBusca]
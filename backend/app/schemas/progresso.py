@@ -5,6 +5,9 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
+from decimal import Decimal
+
+from app.schemas.temporada import TemporadaOut, EpisodioSummary
 
 class ProgressoUpdate(BaseModel):
     """Schema para atualizar progresso do episódio"""
@@ -40,3 +43,49 @@ class ProgressoGeral(BaseModel):
     tempo_total_assistido: int  # em segundos
     provas_aprovadas: int
     temporadas: List[ProgressoTemporada]
+
+# === FEED DO ALUNO ===
+class FeedEpisodio(EpisodioSummary):
+    """Episódio do catálogo com o progresso do usuário"""
+    assistido: bool = False
+    tempo_atual: int = 0
+    percentual: float = 0.0
+
+class FeedProva(BaseModel):
+    """Prova da temporada com a situação do usuário"""
+    id: UUID
+    titulo: str
+    tentativas_permitidas: int
+    nota_minima_aprovacao: Decimal
+    tempo_limite: Optional[int] = None
+    liberada: bool
+    aprovada: bool = False
+    melhor_nota: Optional[float] = None
+    tentativas_realizadas: int = 0
+
+class FeedTemporada(TemporadaOut):
+    """Temporada com episódios, progresso e prova"""
+    episodios: List[FeedEpisodio]
+    total_episodios: int
+    episodios_concluidos: int
+    progresso_percentual: float
+    prova: Optional[FeedProva] = None
+
+class ContinuarOuvindo(BaseModel):
+    """Episódio para retomar (ou o próximo não assistido)"""
+    episodio_id: UUID
+    temporada_id: UUID
+    titulo: str
+    tempo_atual: int = 0
+    duracao: Optional[int] = None
+    percentual: float = 0.0
+
+class ContinuarUsuario(BaseModel):
+    """Onde o usuário parou e o próximo episódio não assistido"""
+    retomar: Optional[ContinuarOuvindo] = None
+    proximo: Optional[ContinuarOuvindo] = None
+
+class FeedUsuario(BaseModel):
+    """Tela inicial do aluno numa resposta só"""
+    temporadas: List[FeedTemporada]
+    continuar: Optional[ContinuarOuvindo] = None
@@ -104,7 +104,22 @@ class ProvaWithPerguntas(ProvaOut):
 # === RESPONDER PROVA ===
 class ResponderProva(BaseModel):
     """Schema para enviar respostas da prova"""
-    respostas: Dict[str, str]  # {pergunta_id: opcao_id}
+    respostas: Dict[str, str] = {}  # {pergunta_id: opcao_id}
+    sessao_id: Optional[UUID] = None  # Finaliza a sessão iniciada em POST /provas/{id}/sessao
+
+# === SESSÃO DE PROVA ===
+class SessaoProvaOut(BaseModel):
+    """Sessão de prova em andamento"""
+    id: UUID
+    prova_id: UUID
+    iniciada_em: datetime
+    prazo: Optional[datetime] = None
+    segundos_restantes: Optional[int] = None
+    respostas: Dict[str, str] = {}
+
+class AutosaveRespostas(BaseModel):
+    """Respostas parciais (só as que mudaram)"""
+    respostas: Dict[str, str] = Field(..., max_length=200)
 
 class ResultadoOut(BaseModel):
     """Schema de resultado da prova"""
@@ -114,6 +129,7 @@ class ResultadoOut(BaseModel):
     tentativa_numero: int
     tempo_gasto: Optional[int] = None
     certificado_url: Optional[str] = None
+    codigo_certificado: Optional[str] = None
     data_realizacao: datetime
     
     class Config:
@@ -124,3 +140,13 @@ class ResultadoDetalhado(ResultadoOut):
     perguntas: List[PerguntaWithAnswer] = []
     acertos: int = 0
     erros: int = 0
+
+# === VALIDAÇÃO DE CERTIFICADO ===
+class CertificadoValidacao(BaseModel):
+    """Dados públicos de um certificado válido"""
+    codigo: str
+    nome_aluno: str
+    titulo_prova: str
+    titulo_temporada: str
+    pontuacao: Decimal
+    data_realizacao: datetime
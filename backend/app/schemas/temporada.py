@@ -74,8 +74,8 @@ class EpisodioUpdate(BaseModel):
     data_lancamento: Optional[datetime] = None
     visivel: Optional[bool] = None
 
-class EpisodioOut(BaseModel):
-    """Schema de saída de episódio"""
+class EpisodioSummary(BaseModel):
+    """Schema de episódio para listagens (sem transcrição e texto completo)"""
     id: UUID
     temporada_id: UUID
     titulo: str
@@ -85,8 +85,8 @@ class EpisodioOut(BaseModel):
     audio_url: Optional[str] = None
     video_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
-    transcricao: Optional[str] = None
-    conteudo_texto: Optional[str] = None
+    tem_transcricao: bool = False
+    tem_conteudo_texto: bool = False
     status: str
     data_lancamento: Optional[datetime] = None
     visivel: bool = True
@@ -96,7 +96,31 @@ class EpisodioOut(BaseModel):
     class Config:
         from_attributes = True
 
-class EpisodioWithProgress(EpisodioOut):
+class EpisodioOut(EpisodioSummary):
+    """Schema de saída de episódio (detalhe)"""
+    transcricao: Optional[str] = None  # Alunos recebem a transcrição paginada em /transcricao
+    conteudo_texto: Optional[str] = None
+    conteudo_html: Optional[str] = None  # conteudo_texto já renderizado e sanitizado
+
+class TrechoTranscricaoOut(BaseModel):
+    """Parágrafo da transcrição"""
+    indice: int
+    inicio: Optional[int] = None  # segundos
+    texto: str
+    
+    class Config:
+        from_attributes = True
+
+class TranscricaoPagina(BaseModel):
+    """Página da transcrição de um episódio"""
+    episodio_id: UUID
+    pagina: int
+    por_pagina: int
+    total_trechos: int
+    total_paginas: int
+    trechos: List[TrechoTranscricaoOut] = []
+
+class EpisodioWithProgress(EpisodioSummary):
     """Episódio com dados de progresso do usuário"""
     assistido: bool = False
     tempo_atual: int = 0
@@ -104,7 +128,7 @@ class EpisodioWithProgress(EpisodioOut):
 # === TEMPORADA COM EPISÓDIOS ===
 class TemporadaWithEpisodios(TemporadaOut):
     """Temporada com lista de episódios"""
-    episodios: List[EpisodioOut] = []
+    episodios: List[EpisodioSummary] = []
     total_episodios: int = 0
     
 class TemporadaWithProgress(TemporadaOut):
@@ -32,6 +32,17 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True
 
+class UserSugestao(BaseModel):
+    """Usuário resumido para o typeahead do admin"""
+    id: UUID
+    nome_completo: str
+    email: EmailStr
+    matricula_aec: Optional[str] = None
+    avatar_url: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
 class UserWithProgress(UserOut):
     """Usuário com dados de progresso"""
     episodios_concluidos: int = 0
@@ -43,9 +54,10 @@ class UserWithProgress(UserOut):
 class UserList(BaseModel):
     """Lista paginada de usuários"""
     users: List[UserOut]
-    total: int
+    total: Optional[int] = None  # None com contagem=nenhuma
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Próxima página por cursor (created_at, id)
 
 class UserApprove(BaseModel):
     """Schema para aprovar/recusar usuário"""
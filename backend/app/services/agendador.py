@@ -0,0 +1,82 @@
+"""
+Agendador de tarefas em segundo plano (uma thread por processo)
+Cada tarefa devolve quando quer rodar de novo; a thread dorme até a mais próxima
+e pode ser acordada antes com acordar(). Uma tarefa que devolve None roda de novo
+em INTERVALO_PADRAO_SEGUNDOS.
+"""
+import os
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+INTERVALO_PADRAO_SEGUNDOS = int(os.getenv("AGENDADOR_INTERVALO_PADRAO", "60"))
+
+# Tarefa: função sem argumentos que devolve a próxima execução desejada (None = intervalo padrão)
+Tarefa = Callable[[], Optional[datetime]]
+
+
+class Agendador:
+    def __init__(self):
+        self._tarefas: Dict[str, Tarefa] = {}
+        self._proximas: Dict[str, datetime] = {}
+        self._forcadas = set()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def registrar(self, nome: str, tarefa: Tarefa) -> None:
+        """Registra a tarefa para rodar assim que o agendador iniciar (ou acordar)"""
+        self._tarefas[nome] = tarefa
+        self.acordar(nome)
+
+    def acordar(self, nome: Optional[str] = None) -> None:
+        """Roda a tarefa (ou todas) de novo agora, ex. depois de uma escrita que muda a agenda"""
+        self._forcadas.update([nome] if nome else self._tarefas)
+        self._acordar.set()
+
+    def iniciar(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="agendador", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _executar_vencidas(self) -> None:
+        agora = datetime.now(timezone.utc)
+        padrao = agora + timedelta(seconds=INTERVALO_PADRAO_SEGUNDOS)
+        for nome, tarefa in list(self._tarefas.items()):
+            if self._proximas.get(nome, agora) > agora:
+                continue
+            try:
+                proxima = tarefa()
+            except Exception:
+                print(f"[AGENDADOR] Erro na tarefa {nome}:")
+                traceback.print_exc()
+                proxima = None
+            self._proximas[nome] = proxima if proxima is not None else padrao
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            if self._acordar.is_set():
+                # Acordada (inclusive durante a última rodada): a tarefa vence agora
+                self._acordar.clear()
+                agora = datetime.now(timezone.utc)
+                while self._forcadas:
+                    self._proximas[self._forcadas.pop()] = agora
+            self._executar_vencidas()
+            if not self._proximas:
+                espera = INTERVALO_PADRAO_SEGUNDOS
+            else:
+                espera = (min(self._proximas.values()) - datetime.now(timezone.utc)).total_seconds()
+            self._acordar.wait(timeout=max(0.0, espera))
+
+
+agendador = Agendador()
@@ -0,0 +1,247 @@
+"""
+Busca textual em episódios (título, descrição, conteúdo, transcrição)
+e temporadas (nome, mantra, descrição)
+- PostgreSQL: coluna tsvector gerada (config 'portuguese') com índice GIN;
+  o próprio banco a mantém em dia a cada escrita
+- SQLite (desenvolvimento): tabelas FTS5 ligadas pelo id e sincronizadas por triggers
+
+Busca de usuários (admin) em users.busca_normalizada
+- PostgreSQL: índice GIN de trigramas (pg_trgm), usado por LIKE '%termo%'
+  e pelo operador de similaridade <%
+- SQLite: LIKE sobre a mesma coluna (varredura, suficiente em desenvolvimento)
+"""
+import html
+import re
+from typing import List
+from sqlalchemy import case, func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from app.models.user import User
+from app.schemas.busca import ResultadoBusca
+from app.utils.texto import normalizar_texto, escapar_like
+
+# Marcadores do trecho destacado (trocados por <mark> depois do escape)
+_INICIO_DESTAQUE = "\x02"
+_FIM_DESTAQUE = "\x03"
+
+# === ESTRUTURA ===
+
+_DDL_POSTGRES = [
+    """
+    ALTER TABLE episodios ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'B') ||
+        setweight(to_tsvector('portuguese', coalesce(conteudo_texto, '')), 'C') ||
+        setweight(to_tsvector('portuguese', coalesce(transcricao, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_episodios_busca ON episodios USING GIN (busca)",
+    """
+    ALTER TABLE temporadas ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese', coalesce(nome, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(mantra, '')), 'B') ||
+        setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_temporadas_busca ON temporadas USING GIN (busca)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS busca_normalizada text",
+    "CREATE INDEX IF NOT EXISTS ix_users_busca_trgm ON users USING GIN (busca_normalizada gin_trgm_ops)",
+]
+
+# Tabela FTS5 com cópia do texto, ligada pelo id (UUID) da linha + triggers de
+# sincronização. O rowid implícito das tabelas com chave UUID pode mudar num
+# VACUUM, por isso não serve de ligação (content_rowid)
+_FTS_SQLITE = {
+    "episodios": ["titulo", "descricao", "conteudo_texto", "transcricao"],
+    "temporadas": ["nome", "mantra", "descricao"],
+}
+
+def _ddl_sqlite(tabela: str, colunas: List[str]) -> List[str]:
+    fts = f"busca_{tabela}"
+    lista = ", ".join(colunas)
+    novos = ", ".join(f"new.{c}" for c in colunas)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {lista}, id UNINDEXED, tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN
+            INSERT INTO {fts}({lista}, id) VALUES ({novos}, new.id);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN
+            DELETE FROM {fts} WHERE id = old.id;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabela} BEGIN
+            DELETE FROM {fts} WHERE id = old.id;
+            INSERT INTO {fts}({lista}, id) VALUES ({novos}, new.id);
+        END""",
+    ]
+
+def preparar_busca(engine: Engine) -> None:
+    """Cria colunas/índices de busca se ainda não existirem (idempotente)"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for ddl in _DDL_POSTGRES:
+                conn.execute(text(ddl))
+            return
+
+        for tabela, colunas in _FTS_SQLITE.items():
+            fts = f"busca_{tabela}"
+            existente = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = :nome"), {"nome": fts}
+            ).scalar()
+            if existente is not None and "content_rowid" in existente:
+                # Versão antiga, ligada pelo rowid: recria
+                for gatilho in ("ai", "ad", "au"):
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{gatilho}"))
+                conn.execute(text(f"DROP TABLE {fts}"))
+                existente = None
+            for ddl in _ddl_sqlite(tabela, colunas):
+                conn.execute(text(ddl))
+            if existente is None:
+                # Indexa as linhas que já existiam
+                lista = ", ".join(colunas)
+                conn.execute(text(f"INSERT INTO {fts}({lista}, id) SELECT {lista}, id FROM {tabela}"))
+
+# === CONSULTA ===
+
+def _trecho_html(trecho: str) -> str:
+    """Escapa o trecho e troca os marcadores por <mark>"""
+    trecho = re.sub(r"\s+", " ", trecho or "").strip()
+    return html.escape(trecho).replace(_INICIO_DESTAQUE, "<mark>").replace(_FIM_DESTAQUE, "</mark>")
+
+def _consulta_fts5(termo: str) -> str:
+    """Termos do usuário como frases FTS5 (sem operadores); o último vira prefixo"""
+    palavras = re.findall(r"\w+", termo)
+    if not palavras:
+        return ""
+    frases = [f'"{p}"' for p in palavras]
+    frases[-1] += "*"
+    return " ".join(frases)
+
+# Mesmas regras de list_episodios / list_temporadas para usuários comuns
+_VISIVEL = "(:admin OR {t}.liberado = :verdadeiro)"
+
+_SQL_POSTGRES = f"""
+WITH consulta AS (SELECT websearch_to_tsquery('portuguese', :termo) AS q),
+episodios_encontrados AS (
+    SELECT 'episodio' AS tipo, e.id, e.titulo, e.temporada_id,
+           ts_rank(e.busca, consulta.q) AS relevancia,
+           coalesce(e.descricao, '') || ' ' || coalesce(e.conteudo_texto, '') || ' ' || coalesce(e.transcricao, '') AS texto
+    FROM episodios e, consulta
+    WHERE e.busca @@ consulta.q AND {_VISIVEL.format(t='e')}
+    ORDER BY relevancia DESC
+    LIMIT :limite
+),
+temporadas_encontradas AS (
+    SELECT 'temporada' AS tipo, t.id, t.nome AS titulo, CAST(NULL AS uuid) AS temporada_id,
+           ts_rank(t.busca, consulta.q) AS relevancia,
+           coalesce(t.mantra, '') || ' ' || coalesce(t.descricao, '') AS texto
+    FROM temporadas t, consulta
+    WHERE t.busca @@ consulta.q AND {_VISIVEL.format(t='t')}
+    ORDER BY relevancia DESC
+    LIMIT :limite
+),
+melhores AS (
+    SELECT * FROM episodios_encontrados
+    UNION ALL
+    SELECT * FROM temporadas_encontradas
+    ORDER BY relevancia DESC
+    LIMIT :limite
+)
+-- ts_headline é caro: só nas linhas que serão devolvidas
+SELECT m.tipo, m.id, m.titulo, m.temporada_id, m.relevancia,
+       ts_headline('portuguese', m.texto, consulta.q,
+                   'StartSel={_INICIO_DESTAQUE}, StopSel={_FIM_DESTAQUE}, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "') AS trecho
+FROM melhores m, consulta
+ORDER BY m.relevancia DESC
+"""
+
+_SQL_SQLITE = f"""
+SELECT * FROM (
+    SELECT 'episodio' AS tipo, e.id, e.titulo, e.temporada_id,
+           -bm25(busca_episodios, 10.0, 5.0, 2.0, 1.0) AS relevancia,
+           coalesce(
+               nullif(snippet(busca_episodios, -1, '{_INICIO_DESTAQUE}', '{_FIM_DESTAQUE}', ' … ', 30), ''),
+               e.descricao
+           ) AS trecho
+    FROM busca_episodios
+    JOIN episodios e ON e.id = busca_episodios.id
+    WHERE busca_episodios MATCH :termo AND {_VISIVEL.format(t='e')}
+    UNION ALL
+    SELECT 'temporada' AS tipo, t.id, t.nome AS titulo, NULL AS temporada_id,
+           -bm25(busca_temporadas, 10.0, 5.0, 2.0) AS relevancia,
+           snippet(busca_temporadas, -1, '{_INICIO_DESTAQUE}', '{_FIM_DESTAQUE}', ' … ', 30) AS trecho
+    FROM busca_temporadas
+    JOIN temporadas t ON t.id = busca_temporadas.id
+    WHERE busca_temporadas MATCH :termo AND {_VISIVEL.format(t='t')}
+)
+ORDER BY relevancia DESC
+LIMIT :limite
+"""
+
+def buscar(db: Session, termo: str, admin: bool = False, limite: int = 20) -> List[ResultadoBusca]:
+    """Episódios e temporadas que casam com o termo, por relevância, com trecho destacado"""
+    postgres = db.bind.dialect.name == "postgresql"
+    if not postgres:
+        termo = _consulta_fts5(termo)
+        if not termo:
+            return []
+
+    linhas = db.execute(text(_SQL_POSTGRES if postgres else _SQL_SQLITE), {
+        "termo": termo,
+        "admin": admin,
+        "verdadeiro": True,
+        "limite": limite
+    }).mappings().all()
+
+    return [
+        ResultadoBusca(
+            tipo=linha["tipo"],
+            id=linha["id"],
+            titulo=linha["titulo"],
+            temporada_id=linha["temporada_id"],
+            trecho=_trecho_html(linha["trecho"]),
+            relevancia=round(float(linha["relevancia"]), 4)
+        )
+        for linha in linhas
+    ]
+
+# === USUÁRIOS ===
+
+def filtrar_usuarios(query: Query, termo: str) -> Query:
+    """Filtra por nome, email ou matrícula contendo o termo (sem diferenciar acentos/caixa)"""
+    normalizado = normalizar_texto(termo)
+    if not normalizado:
+        return query
+    return query.filter(User.busca_normalizada.like(f"%{escapar_like(normalizado)}%", escape="\\"))
+
+def sugerir_usuarios(db: Session, termo: str, limite: int = 10) -> List[User]:
+    """
+    Typeahead: os usuários mais parecidos com o termo, sem contagem.
+    PostgreSQL ordena por word_similarity (tolera erros de digitação);
+    o SQLite ordena por prefixo do nome e posição do termo.
+    """
+    normalizado = normalizar_texto(termo)
+    if not normalizado:
+        return []
+
+    contem = User.busca_normalizada.like(f"%{escapar_like(normalizado)}%", escape="\\")
+    query = db.query(User)
+
+    if db.bind.dialect.name == "postgresql":
+        semelhanca = func.word_similarity(normalizado, User.busca_normalizada)
+        query = query\
+            .filter(or_(contem, User.busca_normalizada.op("%>")(normalizado)))\
+            .order_by(semelhanca.desc(), User.nome_completo)
+    else:
+        query = query\
+            .filter(contem)\
+            .order_by(
+                case((User.busca_normalizada.like(f"{escapar_like(normalizado)}%", escape="\\"), 0), else_=1),
+                func.instr(User.busca_normalizada, normalizado),
+                User.nome_completo
+            )
+
+    return query.limit(limite).all()
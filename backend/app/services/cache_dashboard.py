@@ -0,0 +1,137 @@
+"""
+Cache das respostas do dashboard admin (TTL + stale-while-revalidate)
+Cada chave (rota + parâmetros) guarda a última resposta calculada:
+- até DASHBOARD_CACHE_TTL_SEGUNDOS ela é servida direto (fresca);
+- depois disso, até DASHBOARD_CACHE_STALE_SEGUNDOS, ela ainda é servida na hora
+  (velha) enquanto uma única thread recalcula em segundo plano;
+- sem valor utilizável, quem chega primeiro calcula e as requisições simultâneas
+  da mesma chave esperam por esse cálculo em vez de repeti-lo.
+fresco=True (?fresh=1 nas rotas) ignora o cache, calcula na hora e atualiza a chave.
+O cache é por processo, como o snapshot do catálogo.
+"""
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+
+DASHBOARD_CACHE_TTL_SEGUNDOS = float(os.getenv("DASHBOARD_CACHE_TTL_SEGUNDOS", "30"))
+DASHBOARD_CACHE_STALE_SEGUNDOS = float(os.getenv("DASHBOARD_CACHE_STALE_SEGUNDOS", "300"))
+DASHBOARD_CACHE_MAX_CHAVES = int(os.getenv("DASHBOARD_CACHE_MAX_CHAVES", "256"))
+
+# Estado da resposta servida (header X-Cache)
+FRESCO, VELHO, CALCULADO, IGNORADO = "HIT", "STALE", "MISS", "BYPASS"
+
+# Calcula a resposta com a sessão recebida (a da requisição ou uma própria, em segundo plano)
+Calculo = Callable[[Session], Any]
+
+
+class _Entrada:
+    def __init__(self, valor: Any):
+        self.valor = valor
+        self.criado_em = time.monotonic()
+
+    def idade(self) -> float:
+        return time.monotonic() - self.criado_em
+
+
+class _EmAndamento:
+    """Cálculo em curso de uma chave: quem chega depois espera o resultado dele"""
+
+    def __init__(self):
+        self.pronto = threading.Event()
+        self.valor: Any = None
+        self.erro: Optional[BaseException] = None
+
+
+class CacheDashboard:
+    def __init__(self, ttl: float, stale: float, max_chaves: int):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_chaves = max_chaves
+        self._entradas: Dict[Hashable, _Entrada] = {}
+        self._em_andamento: Dict[Hashable, _EmAndamento] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable, calcular: Calculo, db: Session, fresco: bool = False) -> Tuple[Any, str, float]:
+        """Resposta da chave; retorna (valor, estado, idade em segundos)"""
+        if fresco:
+            valor = calcular(db)
+            self._guardar(chave, valor)
+            return valor, IGNORADO, 0.0
+
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                idade = entrada.idade()
+                if idade < self.ttl:
+                    return entrada.valor, FRESCO, idade
+                if idade < self.ttl + self.stale:
+                    if chave not in self._em_andamento:
+                        self._em_andamento[chave] = _EmAndamento()
+                        threading.Thread(
+                            target=self._revalidar, args=(chave, calcular),
+                            name="cache-dashboard", daemon=True
+                        ).start()
+                    return entrada.valor, VELHO, idade
+
+            andamento = self._em_andamento.get(chave)
+            lider = andamento is None
+            if lider:
+                andamento = self._em_andamento[chave] = _EmAndamento()
+
+        if not lider:
+            andamento.pronto.wait()
+            if andamento.erro is not None:
+                raise andamento.erro
+            return andamento.valor, CALCULADO, 0.0
+
+        try:
+            andamento.valor = calcular(db)
+        except BaseException as e:
+            andamento.erro = e
+            raise
+        else:
+            self._guardar(chave, andamento.valor)
+        finally:
+            self._concluir(chave, andamento)
+        return andamento.valor, CALCULADO, 0.0
+
+    def _revalidar(self, chave: Hashable, calcular: Calculo) -> None:
+        """Recalcula em segundo plano; em caso de erro o valor velho continua valendo"""
+        andamento = self._em_andamento[chave]
+        db = SessionLocal()
+        try:
+            andamento.valor = calcular(db)
+            self._guardar(chave, andamento.valor)
+        except Exception as e:
+            andamento.erro = e
+            print(f"[CACHE] Erro ao revalidar {chave}:")
+            traceback.print_exc()
+        finally:
+            db.close()
+            self._concluir(chave, andamento)
+
+    def _concluir(self, chave: Hashable, andamento: _EmAndamento) -> None:
+        with self._lock:
+            if self._em_andamento.get(chave) is andamento:
+                del self._em_andamento[chave]
+        andamento.pronto.set()
+
+    def _guardar(self, chave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._entradas.pop(chave, None)
+            if len(self._entradas) >= self.max_chaves:
+                # Dicionário em ordem de inserção: a primeira é a gravada há mais tempo
+                del self._entradas[next(iter(self._entradas))]
+            self._entradas[chave] = _Entrada(valor)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_dashboard = CacheDashboard(DASHBOARD_CACHE_TTL_SEGUNDOS, DASHBOARD_CACHE_STALE_SEGUNDOS, DASHBOARD_CACHE_MAX_CHAVES)
@@ -0,0 +1,195 @@
+"""
+Snapshot do catálogo publicado (temporadas → episódios → anexos)
+Montado uma vez e já serializado em JSON; as rotas dos alunos só devolvem os bytes.
+Só entra o que está liberado (ver app/services/lancamentos.py). As rotas admin de
+escrita chamam invalidar_catalogo() após o commit, e a tarefa de lançamentos o
+invalida no horário de cada lançamento. O TTL cobre escritas feitas em outro worker.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from uuid import UUID
+from pydantic import TypeAdapter
+
+from app.database.connection import SessionLocal
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio, resumo_episodio
+from app.models.anexo import AnexoEpisodio
+from app.models.prova import Prova
+from app.schemas.temporada import TemporadaOut, TemporadaWithEpisodios, EpisodioSummary
+from app.schemas.anexo import AnexoOut
+from app.schemas.prova import ProvaOut
+from app.utils.paginacao import codificar_cursor, decodificar_cursor
+from app.services.lancamentos import proximo_lancamento, reagendar_lancamentos
+
+CATALOGO_TTL_SEGUNDOS = int(os.getenv("CATALOGO_TTL_SEGUNDOS", "60"))
+
+_anexos_json = TypeAdapter(List[AnexoOut])
+
+# Item de lista pré-serializado: ((ordem, id), json)
+ItemLista = Tuple[Tuple[int, UUID], bytes]
+
+
+def _item(modelo) -> ItemLista:
+    return (modelo.ordem, modelo.id), modelo.model_dump_json().encode()
+
+
+def pagina_json(itens: List[ItemLista], limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+    """Monta o array JSON (inteiro ou uma página por cursor (ordem, id))"""
+    if cursor:
+        chave = decodificar_cursor(cursor, (Episodio.ordem, Episodio.id))
+        itens = [item for item in itens if item[0] > chave]
+
+    proximo = None
+    if limit is not None and len(itens) > limit:
+        itens = itens[:limit]
+        proximo = codificar_cursor(itens[-1][0])
+
+    return b"[" + b",".join(json for _, json in itens) + b"]", proximo
+
+
+class SnapshotCatalogo:
+    """Catálogo visto pelos alunos, pré-serializado"""
+
+    def __init__(self, temporadas: List[ItemLista], temporada: Dict[UUID, bytes], episodios: List[ItemLista],
+                 episodios_por_temporada: Dict[UUID, List[ItemLista]], anexos: Dict[UUID, bytes],
+                 estrutura: List[Tuple[TemporadaOut, List[EpisodioSummary]]], provas: Dict[UUID, ProvaOut],
+                 publicados: Dict[UUID, int], valido_ate: Optional[datetime], criado_em: float):
+        self.temporadas = temporadas  # GET /temporadas
+        self.temporada = temporada  # GET /temporadas/{id}
+        self.episodios = episodios  # GET /episodios
+        self.episodios_por_temporada = episodios_por_temporada  # GET /episodios?temporada_id=
+        self.anexos = anexos  # GET /episodios/{id}/anexos
+        # Modelos para respostas que combinam o catálogo com dados do usuário (/usuario/feed)
+        self.estrutura = estrutura  # [(temporada, episódios liberados)] em ordem
+        self.provas = provas  # temporada_id -> prova
+        self.publicados = publicados  # temporada_id -> episódios publicados (regra de liberação da prova)
+        self.posicao = {  # episodio_id -> (temporada, episódio)
+            episodio.id: (temporada, episodio) for temporada, episodios in estrutura for episodio in episodios
+        }
+        self.valido_ate = valido_ate  # próximo lançamento agendado
+        self.criado_em = criado_em
+
+    def expirado(self) -> bool:
+        if time.monotonic() - self.criado_em > CATALOGO_TTL_SEGUNDOS:
+            return True
+        return self.valido_ate is not None and datetime.now(timezone.utc) >= self.valido_ate
+
+    def cache_control(self) -> str:
+        """Header Cache-Control das respostas dos alunos: vale até o TTL ou o próximo lançamento"""
+        segundos = CATALOGO_TTL_SEGUNDOS - (time.monotonic() - self.criado_em)
+        if self.valido_ate is not None:
+            segundos = min(segundos, (self.valido_ate - datetime.now(timezone.utc)).total_seconds())
+        return f"private, max-age={max(0, int(segundos))}"
+
+
+def montar_catalogo() -> SnapshotCatalogo:
+    """Lê o catálogo liberado (6 consultas) e serializa as respostas dos alunos"""
+    db = SessionLocal()
+    try:
+        temporadas = db.query(Temporada)\
+            .filter(Temporada.liberado == True)\
+            .order_by(Temporada.ordem, Temporada.id)\
+            .all()
+        episodios = db.query(Episodio)\
+            .options(*resumo_episodio())\
+            .filter(Episodio.liberado == True)\
+            .order_by(Episodio.ordem, Episodio.id)\
+            .all()
+        anexos = db.query(AnexoEpisodio)\
+            .join(Episodio)\
+            .filter(Episodio.liberado == True)\
+            .order_by(AnexoEpisodio.ordem)\
+            .all()
+        provas = db.query(Prova)\
+            .join(Temporada)\
+            .filter(Temporada.liberado == True)\
+            .all()
+        publicados = dict(
+            db.query(Episodio.temporada_id, func.count(Episodio.id))
+            .filter(Episodio.status == "publicado")
+            .group_by(Episodio.temporada_id)
+            .all()
+        )
+        # O próximo lançamento agendado invalida o snapshot
+        valido_ate = proximo_lancamento(db)
+    finally:
+        db.close()
+
+    episodios_out: Dict[UUID, List[EpisodioSummary]] = {}
+    liberados_por_temporada: Dict[UUID, List[ItemLista]] = {}
+    liberados: List[ItemLista] = []
+    for episodio in episodios:
+        out = EpisodioSummary.model_validate(episodio)
+        item = _item(out)
+        episodios_out.setdefault(episodio.temporada_id, []).append(out)
+        liberados_por_temporada.setdefault(episodio.temporada_id, []).append(item)
+        liberados.append(item)
+
+    anexos_por_episodio: Dict[UUID, List[AnexoOut]] = {e.id: [] for e in episodios}
+    for anexo in anexos:
+        anexos_por_episodio[anexo.episodio_id].append(AnexoOut.model_validate(anexo))
+
+    temporadas_out = [TemporadaOut.model_validate(t) for t in temporadas]
+    temporada_json = {}
+    for t in temporadas_out:
+        eps = episodios_out.get(t.id, [])
+        temporada_json[t.id] = TemporadaWithEpisodios(
+            **t.model_dump(),
+            episodios=eps,
+            total_episodios=len(eps)
+        ).model_dump_json().encode()
+
+    return SnapshotCatalogo(
+        temporadas=[_item(t) for t in temporadas_out],
+        temporada=temporada_json,
+        episodios=liberados,
+        episodios_por_temporada=liberados_por_temporada,
+        anexos={
+            episodio_id: _anexos_json.dump_json(lista)
+            for episodio_id, lista in anexos_por_episodio.items()
+        },
+        estrutura=[(t, episodios_out.get(t.id, [])) for t in temporadas_out],
+        provas={p.temporada_id: ProvaOut.model_validate(p) for p in provas},
+        publicados=publicados,
+        valido_ate=valido_ate,
+        criado_em=time.monotonic()
+    )
+
+
+_snapshot: Optional[SnapshotCatalogo] = None
+_versao = 0  # incrementada a cada invalidação
+_lock = threading.Lock()
+
+
+def get_catalogo() -> SnapshotCatalogo:
+    """Snapshot atual, remontado se invalidado ou expirado"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and not snapshot.expirado():
+        return snapshot
+
+    with _lock:
+        if _snapshot is not None and _snapshot is not snapshot and not _snapshot.expirado():
+            return _snapshot
+        versao = _versao
+        novo = montar_catalogo()
+        # Uma invalidação durante a montagem descarta o resultado para as próximas leituras
+        if versao == _versao:
+            _snapshot = novo
+        return novo
+
+
+def invalidar_catalogo(reagendar: bool = True) -> None:
+    """
+    Descarta o snapshot (chamar após o commit de qualquer escrita no catálogo).
+    reagendar=True também reavalia a agenda de lançamentos.
+    """
+    global _snapshot, _versao
+    _versao += 1
+    _snapshot = None
+    if reagendar:
+        reagendar_lancamentos()
@@ -1,138 +1,338 @@
 """
 Serviço de Geração de Certificados PDF
 """
+import asyncio
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from io import BytesIO
 from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from fastapi.concurrency import run_in_threadpool
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.colors import HexColor
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+from sqlalchemy.orm import Session
 
+from app.database.connection import SessionLocal
+from app.models.prova import ResultadoProva
+from app.models.user import User
+from app.services.storage_service import upload_file_to_r2
+from app.utils.codigo_certificado import gerar_codigo_certificado
+
+# Página e cores
+PAGINA = landscape(A4)
+COR_PRIMARIA = HexColor('#E91E63')  # Rosa AEC
+COR_SECUNDARIA = HexColor('#9C27B0')  # Roxo
+COR_TEXTO = HexColor('#1E293B')  # Slate escuro
+COR_TEXTO_CLARO = HexColor('#64748B')  # Slate médio
+
+# Nome do form XObject com o layout fixo dentro de cada PDF
+FORM_LAYOUT = "layout_certificado"
+
+MESES = {
+    1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
+    5: 'maio', 6: 'junho', 7: 'julho', 8: 'agosto',
+    9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
+}
+
+# Pool de processos para renderização (CPU-bound)
+CERTIFICADOS_WORKERS = int(os.getenv("CERTIFICADOS_WORKERS", "2"))
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _desenhar_layout(c: canvas.Canvas) -> None:
+    """Desenha a parte fixa do certificado (bordas, cabeçalho e textos padrão)"""
+    width, height = PAGINA
 
-def gerar_certificado(
-    nome_aluno: str,
-    titulo_prova: str,
-    titulo_temporada: str,
-    pontuacao: float,
-    data_realizacao: datetime
-) -> bytes:
-    """
-    Gera um certificado PDF de conclusão.
-    
-    Args:
-        nome_aluno: Nome completo do aluno
-        titulo_prova: Título da prova realizada
-        titulo_temporada: Título da temporada
-        pontuacao: Nota obtida (0-100)
-        data_realizacao: Data que realizou a prova
-    
-    Returns:
-        bytes do PDF gerado
-    """
-    buffer = BytesIO()
-    
-    # Criar canvas em paisagem
-    width, height = landscape(A4)
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-    
-    # Cores
-    cor_primaria = HexColor('#E91E63')  # Rosa AEC
-    cor_secundaria = HexColor('#9C27B0')  # Roxo
-    cor_texto = HexColor('#1E293B')  # Slate escuro
-    cor_texto_claro = HexColor('#64748B')  # Slate médio
-    
     # === FUNDO E BORDAS ===
     # Borda decorativa
-    c.setStrokeColor(cor_primaria)
+    c.setStrokeColor(COR_PRIMARIA)
     c.setLineWidth(3)
     c.rect(1.5*cm, 1.5*cm, width - 3*cm, height - 3*cm)
-    
+
     # Borda interna decorativa
-    c.setStrokeColor(cor_secundaria)
+    c.setStrokeColor(COR_SECUNDARIA)
     c.setLineWidth(1)
     c.rect(2*cm, 2*cm, width - 4*cm, height - 4*cm)
-    
+
     # === CABEÇALHO ===
     # Logo/título
     c.setFont("Helvetica-Bold", 14)
-    c.setFillColor(cor_primaria)
+    c.setFillColor(COR_PRIMARIA)
     c.drawCentredString(width/2, height - 3*cm, "NEXT LEVEL PODCAST")
-    
+
     c.setFont("Helvetica", 10)
-    c.setFillColor(cor_texto_claro)
+    c.setFillColor(COR_TEXTO_CLARO)
     c.drawCentredString(width/2, height - 3.6*cm, "Plataforma de Educação Corporativa")
-    
+
     # === TÍTULO CERTIFICADO ===
     c.setFont("Helvetica-Bold", 36)
-    c.setFillColor(cor_texto)
+    c.setFillColor(COR_TEXTO)
     c.drawCentredString(width/2, height - 6*cm, "CERTIFICADO")
-    
+
     # Linha decorativa
-    c.setStrokeColor(cor_primaria)
+    c.setStrokeColor(COR_PRIMARIA)
     c.setLineWidth(2)
     c.line(width/2 - 4*cm, height - 6.5*cm, width/2 + 4*cm, height - 6.5*cm)
-    
+
     # === TEXTO PRINCIPAL ===
     c.setFont("Helvetica", 14)
-    c.setFillColor(cor_texto)
+    c.setFillColor(COR_TEXTO)
     c.drawCentredString(width/2, height - 8*cm, "Certificamos que")
-    
-    # Nome do aluno
-    c.setFont("Helvetica-Bold", 28)
-    c.setFillColor(cor_primaria)
-    c.drawCentredString(width/2, height - 9.5*cm, nome_aluno.upper())
-    
+
     # Linha sob o nome
-    c.setStrokeColor(cor_secundaria)
+    c.setStrokeColor(COR_SECUNDARIA)
     c.setLineWidth(1)
     c.line(width/2 - 7*cm, height - 10*cm, width/2 + 7*cm, height - 10*cm)
-    
+
     # Texto de conclusão
     c.setFont("Helvetica", 14)
-    c.setFillColor(cor_texto)
+    c.setFillColor(COR_TEXTO)
     c.drawCentredString(width/2, height - 11.5*cm, "concluiu com sucesso a avaliação")
-    
+
+
+def _layout_estatico(c: canvas.Canvas) -> None:
+    """
+    Registra o layout fixo como form XObject do documento: desenhado uma vez,
+    reutilizado com doForm (o conteúdo fica num stream próprio do PDF).
+    """
+    c.beginForm(FORM_LAYOUT, lowerx=0, lowery=0, upperx=PAGINA[0], uppery=PAGINA[1])
+    _desenhar_layout(c)
+    c.endForm()
+
+
+def gerar_certificado(
+    nome_aluno: str,
+    titulo_prova: str,
+    titulo_temporada: str,
+    pontuacao: float,
+    data_realizacao: datetime,
+    codigo: str
+) -> bytes:
+    """
+    Gera um certificado PDF de conclusão.
+    O layout fixo é um form XObject; sobre ele só os dados do aluno são desenhados.
+
+    Args:
+        nome_aluno: Nome completo do aluno
+        titulo_prova: Título da prova realizada
+        titulo_temporada: Título da temporada
+        pontuacao: Nota obtida (0-100)
+        data_realizacao: Data que realizou a prova
+        codigo: Código de validação (ResultadoProva.codigo_certificado)
+
+    Returns:
+        bytes do PDF gerado
+    """
+    buffer = BytesIO()
+
+    # Criar canvas em paisagem
+    width, height = PAGINA
+    c = canvas.Canvas(buffer, pagesize=PAGINA)
+
+    # === LAYOUT FIXO (form XObject) ===
+    _layout_estatico(c)
+    c.doForm(FORM_LAYOUT)
+
+    # === DADOS DO ALUNO ===
+    # Nome do aluno
+    c.setFont("Helvetica-Bold", 28)
+    c.setFillColor(COR_PRIMARIA)
+    c.drawCentredString(width/2, height - 9.5*cm, nome_aluno.upper())
+
     # Título da prova
     c.setFont("Helvetica-Bold", 18)
-    c.setFillColor(cor_texto)
+    c.setFillColor(COR_TEXTO)
     c.drawCentredString(width/2, height - 12.8*cm, f'"{titulo_prova}"')
-    
+
     # Temporada
     c.setFont("Helvetica", 12)
-    c.setFillColor(cor_texto_claro)
+    c.setFillColor(COR_TEXTO_CLARO)
     c.drawCentredString(width/2, height - 13.8*cm, f"Temporada: {titulo_temporada}")
-    
+
     # Nota
     c.setFont("Helvetica-Bold", 16)
-    c.setFillColor(cor_secundaria)
+    c.setFillColor(COR_SECUNDARIA)
     c.drawCentredString(width/2, height - 15.2*cm, f"Nota obtida: {pontuacao:.1f}%")
-    
+
     # === RODAPÉ ===
     # Data
-    data_formatada = data_realizacao.strftime("%d de %B de %Y")
-    # Traduzir meses para português
-    meses = {
-        'January': 'janeiro', 'February': 'fevereiro', 'March': 'março',
-        'April': 'abril', 'May': 'maio', 'June': 'junho',
-        'July': 'julho', 'August': 'agosto', 'September': 'setembro',
-        'October': 'outubro', 'November': 'novembro', 'December': 'dezembro'
-    }
-    for en, pt in meses.items():
-        data_formatada = data_formatada.replace(en, pt)
-    
+    data_formatada = f"{data_realizacao.day:02d} de {MESES[data_realizacao.month]} de {data_realizacao.year}"
+
     c.setFont("Helvetica", 11)
-    c.setFillColor(cor_texto_claro)
+    c.setFillColor(COR_TEXTO_CLARO)
     c.drawCentredString(width/2, 3.5*cm, f"Emitido em {data_formatada}")
-    
-    # ID do certificado (pode ser usado para validação)
+
+    # Código de validação (consultável em GET /certificados/{codigo})
     c.setFont("Helvetica", 8)
-    c.setFillColor(cor_texto_claro)
-    c.drawCentredString(width/2, 2.5*cm, f"Código de validação: NLP-{data_realizacao.strftime('%Y%m%d%H%M%S')}")
-    
+    c.setFillColor(COR_TEXTO_CLARO)
+    c.drawCentredString(width/2, 2.5*cm, f"Código de validação: {codigo}")
+
     # Finalizar PDF
     c.showPage()
     c.save()
-    
+
     buffer.seek(0)
     return buffer.getvalue()
+
+
+# === POOL DE RENDERIZAÇÃO ===
+
+def get_executor() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de renderização (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=CERTIFICADOS_WORKERS)
+    return _executor
+
+
+def encerrar_executor() -> None:
+    """Encerra o pool de processos (shutdown da aplicação)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def renderizar_certificado(**dados) -> bytes:
+    """Renderiza um certificado no pool de processos, sem bloquear o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(gerar_certificado, **dados))
+
+
+# === PERSISTÊNCIA ===
+
+def chave_certificado(resultado: ResultadoProva) -> str:
+    """Chave do PDF do certificado no storage"""
+    return f"certificados/{resultado.usuario_id}/{resultado.id}.pdf"
+
+
+def dados_certificado(db: Session, resultado: ResultadoProva) -> dict:
+    """Monta os argumentos de gerar_certificado para um resultado"""
+    # Resultados aprovados antes da existência do código recebem um agora
+    if not resultado.codigo_certificado:
+        resultado.codigo_certificado = gerar_codigo_certificado()
+        db.commit()
+    
+    prova = resultado.prova
+    aluno = db.query(User).filter(User.id == resultado.usuario_id).first()
+
+    return dict(
+        nome_aluno=aluno.nome_completo if aluno else "N/A",
+        titulo_prova=prova.titulo,
+        titulo_temporada=prova.temporada.nome if prova.temporada else "N/A",
+        pontuacao=float(resultado.pontuacao),
+        data_realizacao=resultado.data_realizacao,
+        codigo=resultado.codigo_certificado
+    )
+
+
+def salvar_certificado(db: Session, resultado: ResultadoProva, pdf_bytes: bytes) -> None:
+    """Envia o PDF para o storage e registra a URL em `certificado_url`"""
+    resultado.certificado_url = upload_file_to_r2(
+        pdf_bytes, chave_certificado(resultado), "application/pdf"
+    )
+    db.commit()
+
+
+async def emitir_certificado(db: Session, resultado: ResultadoProva) -> bytes:
+    """
+    Renderiza o certificado de um resultado aprovado, salva no storage
+    e registra a URL em `certificado_url`.
+
+    Returns:
+        bytes do PDF gerado
+    """
+    pdf_bytes = await renderizar_certificado(**dados_certificado(db, resultado))
+    await run_in_threadpool(salvar_certificado, db, resultado, pdf_bytes)
+    return pdf_bytes
+
+
+async def emitir_certificado_em_background(resultado_id) -> None:
+    """Emite o certificado fora da requisição (BackgroundTasks), com sessão própria"""
+    db = SessionLocal()
+    try:
+        resultado = db.query(ResultadoProva).filter(ResultadoProva.id == resultado_id).first()
+        if resultado and resultado.aprovado and not resultado.certificado_url:
+            await emitir_certificado(db, resultado)
+    except Exception as e:
+        print(f"Erro ao emitir certificado {resultado_id}: {e}")
+    finally:
+        db.close()
+
+
+# === LOTE (ZIP) ===
+
+class _ZipStream:
+    """Destino de escrita sem seek: o ZIP é entregue em pedaços à medida que é produzido"""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, data) -> int:
+        self._partes.append(bytes(data))
+        self._posicao += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def flush(self) -> None:
+        pass
+
+    def consumir(self) -> bytes:
+        data = b"".join(self._partes)
+        self._partes.clear()
+        return data
+
+
+def nome_arquivo_certificado(nome_aluno: str, sufixo: str) -> str:
+    """Nome seguro para o PDF dentro do ZIP"""
+    base = re.sub(r"[^\w\-]+", "_", nome_aluno, flags=re.UNICODE).strip("_") or "certificado"
+    return f"{base}-{sufixo}.pdf"
+
+
+async def gerar_zip_certificados(itens: List[dict]) -> AsyncIterator[bytes]:
+    """
+    Gera um ZIP com vários certificados, em streaming.
+    Cada item tem 'arquivo' (nome no ZIP) e 'dados' (argumentos de gerar_certificado).
+    Mantém uma janela limitada de renderizações em andamento no pool.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    janela = CERTIFICADOS_WORKERS * 2
+    pendentes = deque()
+    fila = iter(itens)
+    buffer = _ZipStream()
+
+    def agendar():
+        while len(pendentes) < janela:
+            item = next(fila, None)
+            if item is None:
+                break
+            futuro = loop.run_in_executor(executor, partial(gerar_certificado, **item["dados"]))
+            pendentes.append((item["arquivo"], futuro))
+
+    try:
+        # PDFs já são comprimidos: ZIP_STORED evita gastar CPU à toa
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            agendar()
+            while pendentes:
+                arquivo, futuro = pendentes.popleft()
+                pdf_bytes = await futuro
+                agendar()
+                zf.writestr(arquivo, pdf_bytes)
+                yield buffer.consumir()
+
+        yield buffer.consumir()
+    except (GeneratorExit, asyncio.CancelledError):
+        # Cliente desconectou: renderizações ainda na fila do pool não são mais necessárias
+        for _, futuro in pendentes:
+            futuro.cancel()
+        raise
@@ -0,0 +1,208 @@
+"""
+Conteúdo derivado dos episódios, gerado ao salvar
+- transcricao: dividida em trechos (parágrafos, com o tempo inicial quando houver)
+  e gravada em trechos_transcricao para ser servida em páginas
+- conteudo_texto (texto, markdown ou HTML básico): renderizado e sanitizado
+  para HTML uma única vez em Episodio.conteudo_html
+"""
+import html
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models.episodio import Episodio, TrechoTranscricao
+
+# === TRANSCRIÇÃO ===
+
+# Marca de tempo no início do parágrafo: [01:02:03], (02:03), 02:03 -
+MARCA_TEMPO = re.compile(r"^\s*[\[(]?(?:(\d{1,2}):)?(\d{1,2}):(\d{2})[\])]?(?:\s*[-–—]\s*|\s+)")
+
+def _segundos(match: re.Match) -> int:
+    horas, minutos, segundos = match.groups()
+    return int(horas or 0) * 3600 + int(minutos) * 60 + int(segundos)
+
+def dividir_transcricao(texto: Optional[str]) -> List[dict]:
+    """
+    Divide a transcrição em parágrafos (linhas em branco).
+    Um texto sem linhas em branco é dividido por linha.
+    Retorna [{indice, inicio, texto}], com inicio em segundos ou None.
+    """
+    if not texto or not texto.strip():
+        return []
+
+    texto = texto.replace("\r\n", "\n")
+    blocos = [b for b in re.split(r"\n\s*\n", texto) if b.strip()]
+    if len(blocos) == 1:
+        blocos = [linha for linha in texto.split("\n") if linha.strip()]
+
+    trechos = []
+    for indice, bloco in enumerate(blocos):
+        marca = MARCA_TEMPO.match(bloco)
+        inicio = None
+        if marca:
+            inicio = _segundos(marca)
+            bloco = bloco[marca.end():]
+        trechos.append({"indice": indice, "inicio": inicio, "texto": bloco.strip()})
+
+    return trechos
+
+# === CONTEÚDO RICO ===
+
+TAGS_PERMITIDAS = {
+    "p", "br", "hr", "strong", "b", "em", "i", "u", "s", "code", "pre", "blockquote",
+    "ul", "ol", "li", "h1", "h2", "h3", "h4", "a"
+}
+TAGS_VAZIAS = {"br", "hr"}
+TAGS_DESCARTADAS = {"script", "style", "iframe", "object", "embed", "template", "noscript"}  # com conteúdo
+ESQUEMAS_LINK = ("http://", "https://", "mailto:", "#")
+
+def _href_seguro(href: str) -> bool:
+    """Esquemas permitidos ou caminho local ("/x"; "//x" e "/\\x" apontam para outro host)"""
+    if href.lower().startswith(ESQUEMAS_LINK):
+        return True
+    return href.startswith("/") and not href.startswith(("//", "/\\"))
+
+class _Sanitizador(HTMLParser):
+    """Mantém só as tags permitidas, sem atributos (exceto href seguro em <a>)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.saida = []
+        self.abertas = []
+        self.descartando = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in TAGS_DESCARTADAS:
+            self.descartando += 1
+            return
+        if self.descartando or tag not in TAGS_PERMITIDAS:
+            return
+
+        if tag == "a":
+            # Navegadores ignoram tab/quebra de linha na URL ("/\t/x" vira "//x")
+            href = re.sub(r"[\t\n\r]", "", dict(attrs).get("href") or "").strip()
+            if not _href_seguro(href):
+                href = "#"
+            self.saida.append(f'<a href="{html.escape(href)}" rel="noopener noreferrer" target="_blank">')
+        else:
+            self.saida.append(f"<{tag}>")
+
+        if tag not in TAGS_VAZIAS:
+            self.abertas.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in self.abertas and self.abertas[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in TAGS_DESCARTADAS:
+            self.descartando = max(0, self.descartando - 1)
+            return
+        if self.descartando or tag not in self.abertas:
+            return
+        # Fecha também as tags abertas depois dela (HTML mal formado)
+        while self.abertas:
+            aberta = self.abertas.pop()
+            self.saida.append(f"</{aberta}>")
+            if aberta == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.descartando:
+            self.saida.append(html.escape(data, quote=False))
+
+    def resultado(self) -> str:
+        self.close()
+        return "".join(self.saida) + "".join(f"</{t}>" for t in reversed(self.abertas))
+
+def sanitizar_html(conteudo: str) -> str:
+    """HTML restrito às TAGS_PERMITIDAS"""
+    sanitizador = _Sanitizador()
+    sanitizador.feed(conteudo)
+    return sanitizador.resultado()
+
+# Link markdown: a URL aceita parênteses balanceados de um nível, ex. .../Foo_(bar)
+LINK_MARKDOWN = re.compile(r"\[([^\]]+)\]\(((?:[^()\s]|\([^()\s]*\))+)\)")
+CODIGO_INLINE = re.compile(r"`([^`]+)`")
+
+def _inline(texto: str) -> str:
+    """Markdown inline: **negrito**, *itálico*, `código` e [links](url)"""
+    # Código é literal: sai do texto antes das outras marcações e volta escapado
+    codigos = []
+    texto = texto.replace("\x00", "")
+
+    def guardar_codigo(match: re.Match) -> str:
+        codigos.append(f"<code>{html.escape(match.group(1), quote=False)}</code>")
+        return f"\x00{len(codigos) - 1}\x00"
+
+    texto = CODIGO_INLINE.sub(guardar_codigo, texto)
+    texto = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", texto)
+    texto = re.sub(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])", r"<em>\1</em>", texto)
+    texto = LINK_MARKDOWN.sub(lambda m: f'<a href="{html.escape(m.group(2))}">{m.group(1)}</a>', texto)
+    return re.sub(r"\x00(\d+)\x00", lambda m: codigos[int(m.group(1))], texto)
+
+ITEM_LISTA = re.compile(r"^\s*[-*+]\s+")
+ITEM_NUMERADO = re.compile(r"^\s*\d+[.)]\s+")
+
+def _bloco_markdown(bloco: str) -> str:
+    linhas = bloco.split("\n")
+
+    if bloco.lstrip().startswith("<"):
+        return bloco  # HTML básico: só passa pelo sanitizador
+
+    for marcador, tag in ((ITEM_LISTA, "ul"), (ITEM_NUMERADO, "ol")):
+        if all(marcador.match(l) for l in linhas):
+            itens = "".join(f"<li>{_inline(marcador.sub('', l).strip())}</li>" for l in linhas)
+            return f"<{tag}>{itens}</{tag}>"
+
+    if all(l.lstrip().startswith(">") for l in linhas):
+        return f"<blockquote><p>{'<br>'.join(_inline(l.lstrip()[1:].strip()) for l in linhas)}</p></blockquote>"
+
+    partes = []
+    paragrafo = []
+    for linha in linhas:
+        titulo = re.match(r"\s*(#{1,4})\s+(.*)", linha)
+        if titulo:
+            if paragrafo:
+                partes.append(f"<p>{'<br>'.join(paragrafo)}</p>")
+                paragrafo = []
+            nivel = len(titulo.group(1))
+            partes.append(f"<h{nivel}>{_inline(titulo.group(2).strip())}</h{nivel}>")
+        else:
+            paragrafo.append(_inline(linha.strip()))
+    if paragrafo:
+        partes.append(f"<p>{'<br>'.join(paragrafo)}</p>")
+
+    return "".join(partes)
+
+def renderizar_conteudo(texto: Optional[str]) -> Optional[str]:
+    """Converte texto/markdown/HTML básico em HTML sanitizado"""
+    if not texto or not texto.strip():
+        return None
+
+    blocos = [b for b in re.split(r"\n\s*\n", texto.replace("\r\n", "\n")) if b.strip()]
+    return sanitizar_html("\n".join(_bloco_markdown(b) for b in blocos))
+
+# === PERSISTÊNCIA ===
+
+def atualizar_conteudo_derivado(db: Session, episodio: Episodio, transcricao: bool = True, conteudo: bool = True) -> None:
+    """
+    Regrava os trechos da transcrição e/ou o HTML do conteúdo.
+    Chamar na criação e quando transcricao/conteudo_texto mudarem; o commit fica com quem chama.
+    """
+    if conteudo:
+        episodio.conteudo_html = renderizar_conteudo(episodio.conteudo_texto)
+
+    if transcricao:
+        if episodio.id is None:
+            db.flush()
+        db.execute(delete(TrechoTranscricao).where(TrechoTranscricao.episodio_id == episodio.id))
+        trechos = dividir_transcricao(episodio.transcricao)
+        if trechos:
+            db.execute(
+                TrechoTranscricao.__table__.insert(),
+                [{"episodio_id": episodio.id, **t} for t in trechos]
+            )
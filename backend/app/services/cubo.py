@@ -0,0 +1,128 @@
+"""
+Cubo de análise por área, cargo e temporada
+Conclusão de episódios, aprovação e média nas provas agregadas em todos os níveis
+(área × cargo × temporada, subtotais e total geral) numa única consulta:
+GROUPING SETS no PostgreSQL e UNION ALL equivalente no SQLite. A resposta é
+compacta (colunas + linhas) para o Admin pivotar no navegador.
+"""
+from itertools import combinations
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import Integer, Numeric, case, cast, distinct, func, literal, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import Prova, ResultadoProva
+
+DIMENSOES = ("area", "cargo", "temporada_id")
+
+METRICAS = (
+    "iniciados", "concluidos", "ouvintes", "taxa_conclusao",
+    "tentativas", "aprovadas", "taxa_aprovacao", "media_pontuacao"
+)
+
+# Colunas de cada linha; nivel = GROUPING(area, cargo, temporada_id): bit ligado = dimensão
+# somada (4 = área, 2 = cargo, 1 = temporada; 0 = célula detalhada, 7 = total geral)
+COLUNAS = (*DIMENSOES, "nivel", *METRICAS)
+
+
+def _fatos(temporada_id: Optional[UUID] = None):
+    """Uma linha por progresso de episódio e por tentativa de prova, já com área/cargo/temporada"""
+    progresso = select(
+        User.area, User.cargo, Episodio.temporada_id, UsuarioEpisodio.usuario_id,
+        literal(1).label("iniciado"),
+        case((UsuarioEpisodio.assistido == True, 1), else_=0).label("concluido"),
+        literal(0).label("tentativa"),
+        literal(0).label("aprovado"),
+        cast(null(), Numeric(5, 2)).label("pontuacao")
+    ).join(User, User.id == UsuarioEpisodio.usuario_id)\
+        .join(Episodio, Episodio.id == UsuarioEpisodio.episodio_id)
+
+    tentativas = select(
+        User.area, User.cargo, Prova.temporada_id, ResultadoProva.usuario_id,
+        literal(0), literal(0), literal(1),
+        case((ResultadoProva.aprovado == True, 1), else_=0),
+        ResultadoProva.pontuacao
+    ).join(User, User.id == ResultadoProva.usuario_id)\
+        .join(Prova, Prova.id == ResultadoProva.prova_id)
+
+    if temporada_id is not None:
+        progresso = progresso.where(Episodio.temporada_id == temporada_id)
+        tentativas = tentativas.where(Prova.temporada_id == temporada_id)
+
+    return union_all(progresso, tentativas).subquery("fatos")
+
+
+def _agregados(fatos):
+    return (
+        func.sum(fatos.c.iniciado),
+        func.sum(fatos.c.concluido),
+        func.count(distinct(case((fatos.c.iniciado == 1, fatos.c.usuario_id)))),
+        func.sum(fatos.c.tentativa),
+        func.sum(fatos.c.aprovado),
+        func.avg(fatos.c.pontuacao)
+    )
+
+
+def _conjuntos():
+    """Todas as combinações das dimensões, da mais detalhada ao total geral"""
+    return [grupo for n in range(len(DIMENSOES), -1, -1) for grupo in combinations(DIMENSOES, n)]
+
+
+def _consulta_grouping_sets(fatos):
+    dimensoes = [fatos.c[d] for d in DIMENSOES]
+    return select(
+        *dimensoes,
+        func.grouping(*dimensoes).label("nivel"),
+        *_agregados(fatos)
+    ).group_by(func.grouping_sets(*[tuple_(*[fatos.c[d] for d in grupo]) for grupo in _conjuntos()]))
+
+
+def _consulta_union(fatos):
+    """Sem GROUPING SETS (SQLite): um GROUP BY por conjunto, unidos"""
+    consultas = []
+    for grupo in _conjuntos():
+        nivel = sum(1 << (len(DIMENSOES) - 1 - i) for i, d in enumerate(DIMENSOES) if d not in grupo)
+        consultas.append(select(
+            *[fatos.c[d] if d in grupo else null().label(d) for d in DIMENSOES],
+            literal(nivel, Integer).label("nivel"),
+            *_agregados(fatos)
+        ).group_by(*[fatos.c[d] for d in grupo]))
+    return union_all(*consultas)
+
+
+def _taxa(parte: int, total: int) -> float:
+    return round(parte / total * 100, 1) if total else 0
+
+
+def montar_cubo(db: Session, temporada_id: Optional[UUID] = None) -> dict:
+    """Cubo completo: colunas, linhas (listas na ordem de COLUNAS) e nomes das temporadas"""
+    fatos = _fatos(temporada_id)
+    if db.bind.dialect.name == "postgresql":
+        consulta = _consulta_grouping_sets(fatos)
+    else:
+        consulta = _consulta_union(fatos)
+
+    linhas = []
+    for area, cargo, temporada, nivel, iniciados, concluidos, ouvintes, tentativas, aprovadas, media in db.execute(consulta):
+        iniciados, concluidos, tentativas, aprovadas = (int(v or 0) for v in (iniciados, concluidos, tentativas, aprovadas))
+        linhas.append([
+            area, cargo, str(temporada) if temporada else None, nivel,
+            iniciados, concluidos, ouvintes, _taxa(concluidos, iniciados),
+            tentativas, aprovadas, _taxa(aprovadas, tentativas),
+            round(float(media), 1) if media is not None else None
+        ])
+    linhas.sort(key=lambda l: (l[3], l[0] or "", l[1] or "", l[2] or ""))
+
+    temporadas = db.query(Temporada.id, Temporada.nome).order_by(Temporada.ordem)
+    if temporada_id is not None:
+        temporadas = temporadas.filter(Temporada.id == temporada_id)
+
+    return {
+        "colunas": list(COLUNAS),
+        "linhas": linhas,
+        "temporadas": {str(t.id): t.nome for t in temporadas}
+    }
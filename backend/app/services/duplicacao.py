@@ -0,0 +1,100 @@
+"""
+Duplicação completa de temporadas
+Copia episódios (com trechos da transcrição), anexos e a prova com perguntas e
+opções usando INSERT ... SELECT: o número de comandos é fixo, não importa o
+tamanho da temporada. Os arquivos do storage são compartilhados (mesmas URLs).
+"""
+import uuid
+from typing import Dict
+from uuid import UUID
+from sqlalchemy import case, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio, TrechoTranscricao
+from app.models.anexo import AnexoEpisodio
+from app.models.prova import Prova, Pergunta, OpcaoResposta
+
+# Preenchidas pelo banco na cópia
+_COLUNAS_AUTOMATICAS = {"created_at", "updated_at"}
+
+
+def _novos_ids(db: Session, coluna_id, *filtros) -> Dict[UUID, UUID]:
+    """IDs atuais -> novos IDs (uma consulta)"""
+    return {antigo: uuid.uuid4() for antigo in db.scalars(select(coluna_id).where(*filtros))}
+
+
+def _trocar(coluna, mapa: Dict[UUID, UUID]):
+    """Expressão SQL que troca cada ID antigo pelo novo"""
+    return case({antigo: literal(novo, coluna.type) for antigo, novo in mapa.items()}, value=coluna)
+
+
+def _copiar(db: Session, modelo, valores: dict, *filtros) -> None:
+    """INSERT INTO tabela SELECT ... FROM tabela WHERE filtros, substituindo as colunas em valores"""
+    tabela = modelo.__table__
+    colunas = [c for c in tabela.columns if c.name not in _COLUNAS_AUTOMATICAS]
+    origem = select(*[valores.get(c.name, c) for c in colunas]).where(*filtros)
+    db.execute(insert(tabela).from_select([c.name for c in colunas], origem))
+
+
+def duplicar_temporada(db: Session, original: Temporada) -> Temporada:
+    """
+    Cria a cópia da temporada (como rascunho) com todo o conteúdo.
+    Episódios copiados também ficam em rascunho. O commit fica com quem chama.
+    """
+    nova = Temporada(
+        nome=f"{original.nome} (Cópia)",
+        descricao=original.descricao,
+        ordem=original.ordem + 1,
+        mantra=original.mantra,
+        capa_url=original.capa_url,
+        status="rascunho"
+    )
+    db.add(nova)
+    db.flush()
+
+    # Episódios e o que pende deles
+    episodios = _novos_ids(db, Episodio.id, Episodio.temporada_id == original.id)
+    if episodios:
+        _copiar(db, Episodio, {
+            "id": _trocar(Episodio.id, episodios),
+            "temporada_id": literal(nova.id, Episodio.temporada_id.type),
+            "status": literal("rascunho"),
+            "liberado": literal(False)
+        }, Episodio.temporada_id == original.id)
+
+        _copiar(db, TrechoTranscricao, {
+            "episodio_id": _trocar(TrechoTranscricao.episodio_id, episodios)
+        }, TrechoTranscricao.episodio_id.in_(list(episodios)))
+
+        anexos = _novos_ids(db, AnexoEpisodio.id, AnexoEpisodio.episodio_id.in_(list(episodios)))
+        if anexos:
+            _copiar(db, AnexoEpisodio, {
+                "id": _trocar(AnexoEpisodio.id, anexos),
+                "episodio_id": _trocar(AnexoEpisodio.episodio_id, episodios)
+            }, AnexoEpisodio.episodio_id.in_(list(episodios)))
+
+    # Prova, perguntas e opções
+    prova_id = db.scalar(select(Prova.id).where(Prova.temporada_id == original.id))
+    if prova_id is not None:
+        nova_prova_id = uuid.uuid4()
+        _copiar(db, Prova, {
+            "id": literal(nova_prova_id, Prova.id.type),
+            "temporada_id": literal(nova.id, Prova.temporada_id.type)
+        }, Prova.id == prova_id)
+
+        perguntas = _novos_ids(db, Pergunta.id, Pergunta.prova_id == prova_id)
+        if perguntas:
+            _copiar(db, Pergunta, {
+                "id": _trocar(Pergunta.id, perguntas),
+                "prova_id": literal(nova_prova_id, Pergunta.prova_id.type)
+            }, Pergunta.prova_id == prova_id)
+
+            opcoes = _novos_ids(db, OpcaoResposta.id, OpcaoResposta.pergunta_id.in_(list(perguntas)))
+            if opcoes:
+                _copiar(db, OpcaoResposta, {
+                    "id": _trocar(OpcaoResposta.id, opcoes),
+                    "pergunta_id": _trocar(OpcaoResposta.pergunta_id, perguntas)
+                }, OpcaoResposta.pergunta_id.in_(list(perguntas)))
+
+    return nova
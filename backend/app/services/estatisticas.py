@@ -0,0 +1,166 @@
+"""
+Contadores de audiência por episódio e por temporada, de episódios concluídos
+por usuário (users.episodios_concluidos, base do ranking em app/services/ranking.py)
+e de tentativas por prova (estatisticas_prova)
+- contabilizar_progresso() / contabilizar_tentativa(): incremento atômico
+  (UPDATE x = x + delta) na mesma transação da escrita de progresso ou do resultado
+- descontar_tentativas_usuario(): desconta os resultados de um usuário que vai ser apagado
+- reconciliar_estatisticas(): recalcula tudo a partir de usuario_episodios e
+  resultados_prova (tarefa periódica do agendador), corrigindo desvios como
+  progresso apagado junto com usuários ou episódios movidos de temporada
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.user import User
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import ResultadoProva
+from app.models.estatistica import EstatisticaEpisodio, EstatisticaTemporada, EstatisticaProva
+from app.services.agendador import agendador
+
+RECONCILIACAO_HORAS = float(os.getenv("ESTATISTICAS_RECONCILIACAO_HORAS", "6"))
+
+TAREFA = "reconciliar_estatisticas"
+
+_CONTADORES = ("visualizacoes", "concluidos", "segundos_ouvidos")
+
+
+def _incrementar(db: Session, modelo, coluna_chave, chave, deltas: dict) -> None:
+    """Soma os deltas na linha do contador, criando-a se ainda não existir"""
+    somar = update(modelo)\
+        .where(coluna_chave == chave)\
+        .values({nome: getattr(modelo, nome) + delta for nome, delta in deltas.items()})\
+        .execution_options(synchronize_session=False)
+    if db.execute(somar).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(modelo).values({coluna_chave.key: chave, **deltas}))
+    except IntegrityError:
+        db.execute(somar)  # criada ao mesmo tempo por outra requisição
+
+
+def contabilizar_progresso(db: Session, usuario_id, episodio: Episodio, nova_visualizacao: bool, concluiu: bool, delta_segundos: int) -> None:
+    """Atualiza os contadores do episódio, da temporada e do usuário; o commit fica com quem chama"""
+    if concluiu:
+        db.execute(
+            update(User)
+            .where(User.id == usuario_id)
+            .values(episodios_concluidos=User.episodios_concluidos + 1, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    deltas = {
+        "visualizacoes": int(nova_visualizacao),
+        "concluidos": int(concluiu),
+        "segundos_ouvidos": delta_segundos
+    }
+    if not any(deltas.values()):
+        return
+    _incrementar(db, EstatisticaEpisodio, EstatisticaEpisodio.episodio_id, episodio.id, deltas)
+    _incrementar(db, EstatisticaTemporada, EstatisticaTemporada.temporada_id, episodio.temporada_id, deltas)
+
+
+def contabilizar_tentativa(db: Session, resultado: ResultadoProva) -> None:
+    """Soma o resultado aos contadores da prova; o commit fica com quem chama"""
+    _incrementar(db, EstatisticaProva, EstatisticaProva.prova_id, resultado.prova_id, {
+        "tentativas": 1,
+        "aprovadas": int(bool(resultado.aprovado)),
+        "soma_pontuacao": resultado.pontuacao
+    })
+
+
+def descontar_tentativas_usuario(db: Session, usuario_id) -> None:
+    """
+    Tira dos contadores das provas os resultados do usuário, que o banco apaga em
+    cascata junto com ele; o commit fica com quem chama (o mesmo do DELETE)
+    """
+    por_prova = db.execute(
+        select(*_agregados_provas())
+        .where(ResultadoProva.usuario_id == usuario_id)
+        .group_by(ResultadoProva.prova_id)
+    )
+    for prova_id, tentativas, aprovadas, soma in por_prova:
+        db.execute(
+            update(EstatisticaProva)
+            .where(EstatisticaProva.prova_id == prova_id)
+            .values(
+                tentativas=EstatisticaProva.tentativas - tentativas,
+                aprovadas=EstatisticaProva.aprovadas - aprovadas,
+                soma_pontuacao=EstatisticaProva.soma_pontuacao - soma
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _agregados_provas():
+    return (
+        ResultadoProva.prova_id,
+        func.count(ResultadoProva.id),
+        func.sum(case((ResultadoProva.aprovado == True, 1), else_=0)),
+        func.coalesce(func.sum(ResultadoProva.pontuacao), 0)
+    )
+
+
+def _agregados(chave):
+    return (
+        chave,
+        func.count(UsuarioEpisodio.id),
+        func.sum(case((UsuarioEpisodio.assistido == True, 1), else_=0)),
+        func.coalesce(func.sum(UsuarioEpisodio.tempo_atual), 0)
+    )
+
+
+def reconciliar_estatisticas(db: Session) -> None:
+    """Recalcula os contadores a partir do progresso e dos resultados (numa transação)"""
+    db.execute(delete(EstatisticaEpisodio))
+    db.execute(insert(EstatisticaEpisodio).from_select(
+        ["episodio_id", *_CONTADORES],
+        select(*_agregados(UsuarioEpisodio.episodio_id)).group_by(UsuarioEpisodio.episodio_id)
+    ))
+
+    db.execute(delete(EstatisticaTemporada))
+    db.execute(insert(EstatisticaTemporada).from_select(
+        ["temporada_id", *_CONTADORES],
+        select(*_agregados(Episodio.temporada_id))
+        .join(Episodio, Episodio.id == UsuarioEpisodio.episodio_id)
+        .group_by(Episodio.temporada_id)
+    ))
+
+    db.execute(delete(EstatisticaProva))
+    db.execute(insert(EstatisticaProva).from_select(
+        ["prova_id", "tentativas", "aprovadas", "soma_pontuacao"],
+        select(*_agregados_provas()).group_by(ResultadoProva.prova_id)
+    ))
+
+    # Só reescreve os usuários cujo contador divergiu
+    concluidos = select(func.count(UsuarioEpisodio.id))\
+        .where(UsuarioEpisodio.usuario_id == User.id, UsuarioEpisodio.assistido == True)\
+        .scalar_subquery()
+    db.execute(
+        update(User)
+        .where(User.episodios_concluidos != concluidos)
+        .values(episodios_concluidos=concluidos, updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def executar_reconciliacao() -> Optional[datetime]:
+    """Tarefa do agendador (roda também ao iniciar, preenchendo as tabelas)"""
+    db = SessionLocal()
+    try:
+        reconciliar_estatisticas(db)
+    finally:
+        db.close()
+    return datetime.now(timezone.utc) + timedelta(hours=RECONCILIACAO_HORAS)
+
+
+def registrar_tarefa() -> None:
+    agendador.registrar(TAREFA, executar_reconciliacao)
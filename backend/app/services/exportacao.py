@@ -0,0 +1,131 @@
+"""
+Exportação completa de relatórios (CSV ou NDJSON) em streaming
+As linhas saem de um cursor no servidor (yield_per) e são escritas em blocos: a
+memória fica constante, não importa quantas linhas a tabela tenha. O gerador abre
+a própria sessão porque roda depois que a rota já retornou.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterator
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.database.connection import SessionLocal
+from app.models.user import User
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import Prova, ResultadoProva
+
+# Linhas buscadas por ida ao banco (e escritas por bloco)
+LINHAS_POR_BLOCO = 1000
+
+# Células de texto que o Excel/Sheets interpretariam como fórmula (CSV injection)
+INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+
+def _usuarios() -> Select:
+    return select(
+        User.id, User.nome_completo, User.email, User.matricula_aec, User.area, User.cargo,
+        User.perfil, User.status, User.episodios_concluidos, User.created_at
+    ).order_by(User.created_at, User.id)
+
+
+def _progresso() -> Select:
+    return select(
+        UsuarioEpisodio.usuario_id, User.nome_completo, User.email, User.area, User.cargo,
+        Temporada.nome.label("temporada"), Episodio.titulo.label("episodio"),
+        UsuarioEpisodio.assistido, UsuarioEpisodio.tempo_atual, UsuarioEpisodio.data_conclusao,
+        UsuarioEpisodio.updated_at
+    ).join(User, User.id == UsuarioEpisodio.usuario_id)\
+        .join(Episodio, Episodio.id == UsuarioEpisodio.episodio_id)\
+        .join(Temporada, Temporada.id == Episodio.temporada_id)\
+        .order_by(UsuarioEpisodio.id)
+
+
+def _resultados() -> Select:
+    return select(
+        ResultadoProva.usuario_id, User.nome_completo, User.email, User.area, User.cargo,
+        Temporada.nome.label("temporada"), Prova.titulo.label("prova"),
+        ResultadoProva.tentativa_numero, ResultadoProva.pontuacao, ResultadoProva.aprovado,
+        ResultadoProva.tempo_gasto, ResultadoProva.data_realizacao
+    ).join(User, User.id == ResultadoProva.usuario_id)\
+        .join(Prova, Prova.id == ResultadoProva.prova_id)\
+        .join(Temporada, Temporada.id == Prova.temporada_id)\
+        .order_by(ResultadoProva.id)
+
+
+RELATORIOS: Dict[str, Callable[[], Select]] = {
+    "usuarios": _usuarios,
+    "progresso": _progresso,
+    "resultados": _resultados
+}
+
+
+def _valor(valor):
+    """Valores de coluna em tipos serializáveis"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def _celula_csv(valor):
+    """Valor serializável com texto iniciado por caractere de fórmula prefixado com '"""
+    valor = _valor(valor)
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _blocos(consulta: Select) -> Iterator:
+    """Primeiro os nomes das colunas, depois blocos de linhas lidos por cursor no servidor"""
+    db = SessionLocal()
+    try:
+        resultado = db.execute(consulta.execution_options(yield_per=LINHAS_POR_BLOCO))
+        yield list(resultado.keys())
+        yield from resultado.partitions()
+    finally:
+        db.close()
+
+
+def _csv(consulta: Select) -> Iterator[bytes]:
+    blocos = _blocos(consulta)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")  # BOM: acentos corretos ao abrir no Excel
+    escritor.writerow(next(blocos))
+    for bloco in blocos:
+        escritor.writerows([_celula_csv(v) for v in linha] for linha in bloco)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")  # só o cabeçalho, se não houve linhas
+
+
+def _ndjson(consulta: Select) -> Iterator[bytes]:
+    blocos = _blocos(consulta)
+    colunas = next(blocos)
+    for bloco in blocos:
+        yield "".join(
+            json.dumps({c: _valor(v) for c, v in zip(colunas, linha)}, ensure_ascii=False) + "\n"
+            for linha in bloco
+        ).encode("utf-8")
+
+
+def exportar(relatorio: str, formato: str) -> Iterator[bytes]:
+    """Gerador de bytes do relatório (relatorio em RELATORIOS, formato em FORMATOS)"""
+    consulta = RELATORIOS[relatorio]()
+    return _csv(consulta) if formato == "csv" else _ndjson(consulta)
@@ -0,0 +1,291 @@
+"""
+Exportação incremental para BI em Parquet (gravada pelo storage: R2 ou diretório local)
+Tabelas: users, usuario_episodios, resultados_prova e respostas_prova (o JSONB
+`respostas` achatado, uma linha por resposta). Cada execução grava só as linhas com
+updated_at / data_realizacao depois da marca d'água da tabela (marcas_exportacao),
+em arquivos particionados no estilo Hive:
+
+    bi/{tabela}/mes=AAAA-MM/temporada_id={uuid}/parte-{execução}-{n}.parquet
+
+Linhas alteradas depois de exportadas reaparecem numa execução seguinte: quem lê
+fica com a de maior updated_at por id. Roda como tarefa do agendador e pela linha
+de comando (python exportar_bi.py); no PostgreSQL um advisory lock garante uma
+execução por vez entre workers e processos.
+"""
+import io
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.database.connection import SessionLocal, engine
+from app.models.user import User
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import Prova, OpcaoResposta, ResultadoProva
+from app.models.exportacao import MarcaExportacao
+from app.services.agendador import agendador
+from app.services.storage_service import upload_file_to_r2
+
+BI_PREFIXO = os.getenv("BI_PREFIXO", "bi")
+BI_EXPORTACAO_HORAS = float(os.getenv("BI_EXPORTACAO_HORAS", "24"))
+
+TAREFA = "exportacao_bi"
+
+LINHAS_POR_BLOCO = 5000  # lidas por ida ao banco (cursor no servidor)
+LINHAS_POR_ARQUIVO = 100_000  # por arquivo Parquet (limita a memória por partição)
+
+# Escritas recentes podem ainda não ter feito commit: a marca fica um pouco atrás de agora
+MARGEM_MINUTOS = 5
+
+SEM_TEMPORADA = "nenhuma"
+
+# Chave do pg_try_advisory_lock da exportação (uma execução por vez no banco todo)
+TRAVA_EXPORTACAO = 0x42490001
+
+# Tipos das colunas (convertidos para tipos do Arrow na gravação)
+TEXTO, INTEIRO, DECIMAL, BOOLEANO, MOMENTO = "texto", "inteiro", "decimal", "booleano", "momento"
+
+
+class TabelaBI:
+    """Uma tabela exportada: consulta incremental, colunas e como cada linha vira linhas do Parquet"""
+
+    def __init__(self, nome: str, coluna_marca, consulta: Callable[[], Select], colunas: List[Tuple[str, str]],
+                 linhas: Optional[Callable[[dict, dict], Iterator[dict]]] = None, por_temporada: bool = True):
+        self.nome = nome
+        self.coluna_marca = coluna_marca
+        self.consulta = consulta
+        self.colunas = colunas
+        self.linhas = linhas or (lambda linha, contexto: iter([linha]))
+        self.por_temporada = por_temporada
+
+
+def _respostas(linha: dict, contexto: dict) -> Iterator[dict]:
+    """Achata {pergunta_id: opcao_id} em uma linha por resposta"""
+    respostas = linha.pop("respostas") or {}
+    for pergunta_id, opcao_id in respostas.items():
+        yield {
+            **linha,
+            "pergunta_id": pergunta_id,
+            "opcao_id": opcao_id,
+            "correta": contexto["corretas"].get(opcao_id)
+        }
+
+
+TABELAS = [
+    TabelaBI(
+        "users", User.updated_at,
+        lambda: select(
+            User.id, User.nome_completo, User.email, User.matricula_aec, User.area, User.cargo,
+            User.perfil, User.status, User.created_at, User.updated_at
+        ),
+        [("id", TEXTO), ("nome_completo", TEXTO), ("email", TEXTO), ("matricula_aec", TEXTO),
+         ("area", TEXTO), ("cargo", TEXTO), ("perfil", TEXTO), ("status", TEXTO),
+         ("created_at", MOMENTO), ("updated_at", MOMENTO)],
+        por_temporada=False
+    ),
+    TabelaBI(
+        "usuario_episodios", UsuarioEpisodio.updated_at,
+        lambda: select(
+            UsuarioEpisodio.id, UsuarioEpisodio.usuario_id, UsuarioEpisodio.episodio_id, Episodio.temporada_id,
+            UsuarioEpisodio.assistido, UsuarioEpisodio.tempo_atual, UsuarioEpisodio.data_conclusao,
+            UsuarioEpisodio.created_at, UsuarioEpisodio.updated_at
+        ).join(Episodio, Episodio.id == UsuarioEpisodio.episodio_id),
+        [("id", TEXTO), ("usuario_id", TEXTO), ("episodio_id", TEXTO), ("temporada_id", TEXTO),
+         ("assistido", BOOLEANO), ("tempo_atual", INTEIRO), ("data_conclusao", MOMENTO),
+         ("created_at", MOMENTO), ("updated_at", MOMENTO)]
+    ),
+    TabelaBI(
+        "resultados_prova", ResultadoProva.data_realizacao,
+        lambda: select(
+            ResultadoProva.id, ResultadoProva.usuario_id, ResultadoProva.prova_id, Prova.temporada_id,
+            ResultadoProva.tentativa_numero, ResultadoProva.pontuacao, ResultadoProva.aprovado,
+            ResultadoProva.tempo_gasto, ResultadoProva.data_realizacao
+        ).join(Prova, Prova.id == ResultadoProva.prova_id),
+        [("id", TEXTO), ("usuario_id", TEXTO), ("prova_id", TEXTO), ("temporada_id", TEXTO),
+         ("tentativa_numero", INTEIRO), ("pontuacao", DECIMAL), ("aprovado", BOOLEANO),
+         ("tempo_gasto", INTEIRO), ("data_realizacao", MOMENTO)]
+    ),
+    TabelaBI(
+        "respostas_prova", ResultadoProva.data_realizacao,
+        lambda: select(
+            ResultadoProva.id.label("resultado_id"), ResultadoProva.usuario_id, ResultadoProva.prova_id,
+            Prova.temporada_id, ResultadoProva.data_realizacao, ResultadoProva.respostas
+        ).join(Prova, Prova.id == ResultadoProva.prova_id),
+        [("resultado_id", TEXTO), ("usuario_id", TEXTO), ("prova_id", TEXTO), ("temporada_id", TEXTO),
+         ("data_realizacao", MOMENTO), ("pergunta_id", TEXTO), ("opcao_id", TEXTO), ("correta", BOOLEANO)],
+        linhas=_respostas
+    )
+]
+
+
+def _valor(valor):
+    if isinstance(valor, UUID):
+        return str(valor)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, datetime) and valor.tzinfo is None:
+        return valor.replace(tzinfo=timezone.utc)  # SQLite devolve sem fuso
+    return valor
+
+
+class _Gravador:
+    """
+    Acumula as linhas da partição atual e grava um arquivo Parquet quando a partição
+    muda ou chega a LINHAS_POR_ARQUIVO (a consulta vem ordenada por partição, então
+    só uma fica em memória)
+    """
+
+    def __init__(self, tabela: TabelaBI, execucao: str):
+        # Import tardio: o pyarrow só é carregado pelo processo que exporta
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tipos = {
+            TEXTO: pa.string(), INTEIRO: pa.int64(), DECIMAL: pa.float64(),
+            BOOLEANO: pa.bool_(), MOMENTO: pa.timestamp("us", tz="UTC")
+        }
+        self._pa, self._pq = pa, pq
+        self.schema = pa.schema([(nome, tipos[tipo]) for nome, tipo in tabela.colunas])
+        self.tabela = tabela
+        self.execucao = execucao
+        self.particao: Optional[str] = None
+        self.buffer: List[dict] = []
+        self.arquivos: List[str] = []
+        self.linhas = 0
+
+    def adicionar(self, particao: str, linha: dict) -> None:
+        if particao != self.particao:
+            self._gravar()
+            self.particao = particao
+        self.buffer.append(linha)
+        if len(self.buffer) >= LINHAS_POR_ARQUIVO:
+            self._gravar()
+
+    def _gravar(self) -> None:
+        if not self.buffer:
+            return
+        linhas, self.buffer = self.buffer, []
+        arquivo = io.BytesIO()
+        self._pq.write_table(self._pa.Table.from_pylist(linhas, schema=self.schema), arquivo, compression="zstd")
+        key = f"{BI_PREFIXO}/{self.tabela.nome}/{self.particao}/parte-{self.execucao}-{len(self.arquivos):04d}.parquet"
+        upload_file_to_r2(arquivo.getvalue(), key, "application/vnd.apache.parquet")
+        self.arquivos.append(key)
+        self.linhas += len(linhas)
+
+    def fechar(self) -> None:
+        self._gravar()
+
+
+def _particao(tabela: TabelaBI, linha: dict) -> str:
+    momento = linha[tabela.coluna_marca.key]
+    particao = f"mes={momento:%Y-%m}" if momento else "mes=desconhecido"
+    if tabela.por_temporada:
+        particao += f"/temporada_id={linha['temporada_id'] or SEM_TEMPORADA}"
+    return particao
+
+
+def exportar_tabela(db: Session, tabela: TabelaBI, ate: datetime, execucao: str, contexto: dict) -> int:
+    """Grava as linhas novas/alteradas da tabela desde a marca d'água; retorna quantas linhas gravou"""
+    marca = db.get(MarcaExportacao, tabela.nome)
+    consulta = tabela.consulta().where(tabela.coluna_marca <= ate)
+    if marca is not None:
+        consulta = consulta.where(tabela.coluna_marca > marca.marca)
+    # Ordenada por partição (temporada, depois mês da marca d'água): cada partição
+    # chega contígua e o _Gravador só guarda uma por vez
+    ordem = [tabela.coluna_marca]
+    if tabela.por_temporada:
+        ordem.insert(0, consulta.selected_columns.temporada_id)
+    consulta = consulta.order_by(*ordem)
+
+    gravador = _Gravador(tabela, execucao)
+    resultado = db.execute(consulta.execution_options(yield_per=LINHAS_POR_BLOCO))
+    colunas = list(resultado.keys())
+    for bloco in resultado.partitions():
+        for linha in bloco:
+            linha = {coluna: _valor(valor) for coluna, valor in zip(colunas, linha)}
+            particao = _particao(tabela, linha)
+            for saida in tabela.linhas(linha, contexto):
+                gravador.adicionar(particao, saida)
+    gravador.fechar()
+
+    # A marca só avança depois que todos os arquivos foram gravados
+    if marca is None:
+        marca = MarcaExportacao(tabela=tabela.nome, linhas=0)
+        db.add(marca)
+    marca.marca = ate
+    marca.linhas = (marca.linhas or 0) + gravador.linhas
+    db.commit()
+    return gravador.linhas
+
+
+def exportar_bi(db: Session) -> Optional[Dict[str, int]]:
+    """
+    Exporta todas as tabelas; retorna as linhas gravadas por tabela, ou None se outra
+    exportação (outro worker ou o script) está em andamento
+    """
+    if engine.dialect.name != "postgresql":
+        return _exportar_bi(db)
+
+    # Conexão própria: o lock de sessão fica preso a ela enquanto a exportação roda
+    with engine.connect() as conn:
+        if not conn.execute(select(func.pg_try_advisory_lock(TRAVA_EXPORTACAO))).scalar():
+            return None
+        try:
+            return _exportar_bi(db)
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(TRAVA_EXPORTACAO)))
+            conn.commit()
+
+
+def _ultima_exportacao(db: Session) -> Optional[datetime]:
+    """Quando a última exportação rodou (a marca fica MARGEM_MINUTOS antes), em UTC"""
+    marca = db.query(func.max(MarcaExportacao.marca)).scalar()
+    if marca is None:
+        return None
+    if marca.tzinfo is None:
+        marca = marca.replace(tzinfo=timezone.utc)  # SQLite devolve sem fuso
+    return marca + timedelta(minutes=MARGEM_MINUTOS)
+
+
+def _exportar_bi(db: Session) -> Dict[str, int]:
+    agora = datetime.utcnow()
+    ate = agora - timedelta(minutes=MARGEM_MINUTOS)
+    execucao = f"{agora:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"  # único mesmo entre processos
+    contexto = {
+        "corretas": {str(opcao_id): correta for opcao_id, correta in db.execute(select(OpcaoResposta.id, OpcaoResposta.correta))}
+    }
+    return {tabela.nome: exportar_tabela(db, tabela, ate, execucao, contexto) for tabela in TABELAS}
+
+
+def executar_exportacao_bi() -> Optional[datetime]:
+    """
+    Tarefa do agendador. Ao iniciar, cada worker só exporta se a última exportação
+    (de qualquer processo) já tem BI_EXPORTACAO_HORAS; senão agenda para quando tiver.
+    """
+    intervalo = timedelta(hours=BI_EXPORTACAO_HORAS)
+    db = SessionLocal()
+    try:
+        ultima = _ultima_exportacao(db)
+        if ultima is not None and ultima + intervalo > datetime.now(timezone.utc):
+            return ultima + intervalo
+        linhas = exportar_bi(db)
+    finally:
+        db.close()
+
+    if linhas is None:
+        print("[BI] Exportação em andamento em outro processo")
+    elif any(linhas.values()):
+        print(f"[BI] Linhas exportadas: {linhas}")
+    return datetime.now(timezone.utc) + intervalo
+
+
+def registrar_tarefa() -> None:
+    """Registra a exportação periódica (BI_EXPORTACAO_HORAS=0 desliga; fica só a linha de comando)"""
+    if BI_EXPORTACAO_HORAS > 0:
+        agendador.registrar(TAREFA, executar_exportacao_bi)
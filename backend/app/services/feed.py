@@ -0,0 +1,111 @@
+"""
+Feed do aluno (GET /usuario/feed)
+Estrutura (temporadas, episódios, provas) do snapshot do catálogo, combinada
+com o progresso e os resultados do usuário (duas consultas pequenas por índice).
+"""
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import ResultadoProva
+from app.schemas.progresso import FeedEpisodio, FeedProva, FeedTemporada, ContinuarOuvindo, FeedUsuario
+from app.services.catalogo import get_catalogo
+
+
+def _percentual(tempo_atual: int, duracao: Optional[int]) -> float:
+    if not duracao:
+        return 0.0
+    return round(min(tempo_atual / duracao * 100, 100), 1)
+
+
+def montar_feed(db: Session, usuario_id: UUID) -> FeedUsuario:
+    catalogo = get_catalogo()
+
+    progresso = {
+        linha.episodio_id: linha
+        for linha in db.query(
+            UsuarioEpisodio.episodio_id,
+            UsuarioEpisodio.assistido,
+            UsuarioEpisodio.tempo_atual,
+            UsuarioEpisodio.updated_at
+        ).filter(UsuarioEpisodio.usuario_id == usuario_id)
+    }
+
+    resultados = {
+        linha.prova_id: linha
+        for linha in db.query(
+            ResultadoProva.prova_id,
+            func.count(ResultadoProva.id).label("tentativas"),
+            func.max(ResultadoProva.pontuacao).label("melhor_nota"),
+            func.max(case((ResultadoProva.aprovado == True, 1), else_=0)).label("aprovada")
+        ).filter(ResultadoProva.usuario_id == usuario_id).group_by(ResultadoProva.prova_id)
+    }
+
+    temporadas = []
+    retomar = None  # (updated_at, ContinuarOuvindo) do episódio em andamento mais recente
+    proximo_nao_assistido: Optional[ContinuarOuvindo] = None
+
+    for temporada, episodios in catalogo.estrutura:
+        episodios_feed = []
+        concluidos = 0
+        for episodio in episodios:
+            linha = progresso.get(episodio.id)
+            assistido = bool(linha and linha.assistido)
+            tempo_atual = (linha.tempo_atual or 0) if linha else 0
+            concluidos += assistido
+            episodios_feed.append(FeedEpisodio(
+                **episodio.model_dump(),
+                assistido=assistido,
+                tempo_atual=tempo_atual,
+                percentual=_percentual(tempo_atual, episodio.duracao)
+            ))
+
+            if assistido:
+                continue
+            ponteiro = ContinuarOuvindo(
+                episodio_id=episodio.id,
+                temporada_id=temporada.id,
+                titulo=episodio.titulo,
+                tempo_atual=tempo_atual,
+                duracao=episodio.duracao,
+                percentual=_percentual(tempo_atual, episodio.duracao)
+            )
+            if tempo_atual > 0 and linha.updated_at is not None and (retomar is None or linha.updated_at > retomar[0]):
+                retomar = (linha.updated_at, ponteiro)
+            if proximo_nao_assistido is None:
+                proximo_nao_assistido = ponteiro
+
+        prova_feed = None
+        prova = catalogo.provas.get(temporada.id)
+        if prova:
+            resultado = resultados.get(prova.id)
+            # Mesma regra de verificar_prova_liberada: todos os episódios publicados assistidos
+            publicados = catalogo.publicados.get(temporada.id, 0)
+            prova_feed = FeedProva(
+                id=prova.id,
+                titulo=prova.titulo,
+                tentativas_permitidas=prova.tentativas_permitidas,
+                nota_minima_aprovacao=prova.nota_minima_aprovacao,
+                tempo_limite=prova.tempo_limite,
+                liberada=publicados > 0 and concluidos >= publicados,
+                aprovada=bool(resultado and resultado.aprovada),
+                melhor_nota=float(resultado.melhor_nota) if resultado else None,
+                tentativas_realizadas=resultado.tentativas if resultado else 0
+            )
+
+        total = len(episodios)
+        temporadas.append(FeedTemporada(
+            **temporada.model_dump(),
+            episodios=episodios_feed,
+            total_episodios=total,
+            episodios_concluidos=concluidos,
+            progresso_percentual=round(concluidos / total * 100, 1) if total else 0.0,
+            prova=prova_feed
+        ))
+
+    return FeedUsuario(
+        temporadas=temporadas,
+        continuar=retomar[1] if retomar else proximo_nao_assistido
+    )
@@ -0,0 +1,334 @@
+"""
+Idempotência de POSTs caros (header Idempotency-Key)
+Uma requisição repetida com a mesma chave (e o mesmo corpo) recebe a resposta já
+gravada; duplicatas simultâneas esperam a primeira execução terminar. A mesma chave
+com outro corpo é recusada (422). Requisições anônimas (cadastro) são separadas
+também pelo hash do corpo.
+Em produção a chave fica na tabela idempotency_keys (vale entre workers);
+com SQLite (desenvolvimento) fica em memória.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from starlette.datastructures import Headers
+
+from app.database.connection import SessionLocal, engine
+from app.models.idempotencia import ChaveIdempotencia
+from app.utils.jwt import decode_token
+
+IDEMPOTENCY_TTL_HORAS = int(os.getenv("IDEMPOTENCY_TTL_HORAS", "24"))
+ESPERA_MAXIMA_SEGUNDOS = 60  # duplicata desiste de esperar após esse tempo
+INTERVALO_CONSULTA = 0.1  # polling da tabela enquanto a 1ª execução roda
+MAX_CORPO_BYTES = 1024 * 1024  # respostas maiores não são gravadas
+CORPO_EM_MEMORIA_BYTES = 1024 * 1024  # requisições maiores (uploads) vão para arquivo temporário
+
+# POSTs que honram o header (trabalho caro: bcrypt, correção da prova, upload ao R2)
+ROTAS_IDEMPOTENTES = [
+    re.compile(r"/auth/register"),
+    re.compile(r"/provas/[^/]+/responder"),
+    re.compile(r"/storage/upload/[^/]+"),
+]
+
+# Resposta gravada: (status_code, headers, corpo)
+Resposta = Tuple[int, list, bytes]
+
+
+class CorpoDiferente(Exception):
+    """A chave já foi usada com outro corpo de requisição"""
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ArmazemMemoria:
+    """Armazém em memória (um processo só, desenvolvimento)"""
+
+    def __init__(self):
+        self._entradas = {}  # chave -> (expira_em, evento, resposta, hash_corpo)
+
+    async def reservar(self, chave: str, hash_corpo: str) -> Optional[Resposta]:
+        """Reserva a chave; se já existe, espera e retorna a resposta gravada"""
+        agora = _agora()
+        entrada = self._entradas.get(chave)
+        if entrada and entrada[0] < agora:
+            entrada = None
+
+        if entrada is None:
+            self._entradas[chave] = (agora + timedelta(hours=IDEMPOTENCY_TTL_HORAS), asyncio.Event(), None, hash_corpo)
+            self._limpar(agora)
+            return None
+
+        _, evento, _, hash_gravado = entrada
+        if hash_gravado != hash_corpo:
+            raise CorpoDiferente()
+        await asyncio.wait_for(evento.wait(), ESPERA_MAXIMA_SEGUNDOS)
+
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            # A primeira execução falhou: esta assume
+            return await self.reservar(chave, hash_corpo)
+        return entrada[2]
+
+    async def concluir(self, chave: str, resposta: Resposta) -> None:
+        expira_em, evento, _, hash_corpo = self._entradas[chave]
+        self._entradas[chave] = (expira_em, evento, resposta, hash_corpo)
+        evento.set()
+
+    async def liberar(self, chave: str) -> None:
+        entrada = self._entradas.pop(chave, None)
+        if entrada:
+            entrada[1].set()
+
+    def _limpar(self, agora: datetime) -> None:
+        expiradas = [c for c, (expira_em, evento, _, _) in self._entradas.items() if expira_em < agora and evento.is_set()]
+        for chave in expiradas:
+            del self._entradas[chave]
+
+
+class ArmazemBanco:
+    """Armazém na tabela idempotency_keys (compartilhado entre workers)"""
+
+    def _tentar_reservar(self, chave: str, hash_corpo: str) -> Optional[ChaveIdempotencia]:
+        """Insere a chave como 'processando'; se já existir, retorna o registro atual"""
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        agora = _agora()
+        db = SessionLocal()
+        try:
+            # Chave vencida é tratada como inexistente
+            db.execute(delete(ChaveIdempotencia).where(
+                ChaveIdempotencia.chave == chave,
+                ChaveIdempotencia.expira_em < agora
+            ))
+            # Limpeza ocasional das demais chaves vencidas
+            if random.random() < 0.01:
+                db.execute(delete(ChaveIdempotencia).where(ChaveIdempotencia.expira_em < agora))
+
+            inserida = db.execute(
+                insert(ChaveIdempotencia)
+                .values(
+                    chave=chave,
+                    hash_corpo=hash_corpo,
+                    status="processando",
+                    criado_em=agora,
+                    expira_em=agora + timedelta(hours=IDEMPOTENCY_TTL_HORAS)
+                )
+                .on_conflict_do_nothing(index_elements=["chave"])
+                .returning(ChaveIdempotencia.chave)
+            ).scalar()
+            db.commit()
+
+            if inserida:
+                return None
+            return db.execute(
+                select(ChaveIdempotencia).where(ChaveIdempotencia.chave == chave)
+            ).scalar() or ChaveIdempotencia(status="processando")
+        finally:
+            db.close()
+
+    async def reservar(self, chave: str, hash_corpo: str) -> Optional[Resposta]:
+        inicio = _agora()
+        while True:
+            registro = await run_in_threadpool(self._tentar_reservar, chave, hash_corpo)
+            if registro is None:
+                return None
+            if registro.hash_corpo is not None and registro.hash_corpo != hash_corpo:
+                raise CorpoDiferente()
+            if registro.status == "concluido":
+                return registro.status_code, registro.headers or [], registro.corpo or b""
+            if (_agora() - inicio).total_seconds() > ESPERA_MAXIMA_SEGUNDOS:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(INTERVALO_CONSULTA)
+
+    def _salvar(self, chave: str, resposta: Resposta) -> None:
+        db = SessionLocal()
+        try:
+            registro = db.get(ChaveIdempotencia, chave)
+            if registro:
+                registro.status = "concluido"
+                registro.status_code, registro.headers, registro.corpo = resposta
+                db.commit()
+        finally:
+            db.close()
+
+    def _remover(self, chave: str) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(delete(ChaveIdempotencia).where(ChaveIdempotencia.chave == chave))
+            db.commit()
+        finally:
+            db.close()
+
+    async def concluir(self, chave: str, resposta: Resposta) -> None:
+        await run_in_threadpool(self._salvar, chave, resposta)
+
+    async def liberar(self, chave: str) -> None:
+        await run_in_threadpool(self._remover, chave)
+
+
+armazem = ArmazemMemoria() if engine.dialect.name == "sqlite" else ArmazemBanco()
+
+
+def _usuario_da_requisicao(headers: Headers) -> Optional[str]:
+    """Identifica o usuário pelo token (a chave vale só para quem a enviou); None = anônimo"""
+    autorizacao = headers.get("authorization", "")
+    if not autorizacao.lower().startswith("bearer "):
+        return None
+    try:
+        sub = decode_token(autorizacao[7:]).get("sub")
+        return str(sub) if sub else None
+    except Exception:
+        return None
+
+
+async def _ler_corpo(receive):
+    """Lê o corpo inteiro; uploads grandes vão para arquivo temporário. None se o cliente desconectou"""
+    corpo = tempfile.SpooledTemporaryFile(max_size=CORPO_EM_MEMORIA_BYTES)
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            corpo.close()
+            return None
+        corpo.write(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    corpo.seek(0)
+    return corpo
+
+
+def _hash_corpo(corpo, headers: Headers, tamanho_pedaco: int = 64 * 1024) -> str:
+    """
+    sha256 do corpo. Em multipart o boundary é removido: o cliente sorteia um novo a
+    cada envio, e a retentativa do mesmo upload precisa dar o mesmo hash.
+    """
+    encontrado = re.search(r'boundary="?([^";]+)"?', headers.get("content-type", ""))
+    boundary = encontrado.group(1).encode("latin-1") if encontrado else b""
+    hash_corpo = hashlib.sha256()
+    resto = b""
+    while True:
+        pedaco = corpo.read(tamanho_pedaco)
+        dados = resto + pedaco
+        if boundary:
+            dados = dados.replace(boundary, b"")
+        if not pedaco:
+            hash_corpo.update(dados)
+            break
+        # Um boundary pode estar dividido entre dois pedaços: o final fica para o próximo
+        corte = max(len(dados) - len(boundary) + 1, 0) if boundary else len(dados)
+        hash_corpo.update(dados[:corte])
+        resto = dados[corte:]
+    corpo.seek(0)
+    return hash_corpo.hexdigest()
+
+
+def _reenviar_corpo(corpo, receive, tamanho_pedaco: int = 64 * 1024):
+    """receive que entrega à aplicação o corpo já lido, em pedaços"""
+    entregue = False
+
+    async def receive_do_corpo():
+        nonlocal entregue
+        if entregue:
+            # Daqui em diante só o desconectar do cliente
+            return await receive()
+        pedaco = corpo.read(tamanho_pedaco)
+        entregue = len(pedaco) < tamanho_pedaco
+        return {"type": "http.request", "body": pedaco, "more_body": not entregue}
+    return receive_do_corpo
+
+
+class IdempotenciaMiddleware:
+    """Middleware ASGI que aplica o Idempotency-Key nas ROTAS_IDEMPOTENTES"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" \
+                or not any(r.fullmatch(scope["path"]) for r in ROTAS_IDEMPOTENTES):
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        if not idempotency_key or len(idempotency_key) > 255:
+            return await self.app(scope, receive, send)
+
+        corpo = await _ler_corpo(receive)
+        if corpo is None:
+            return  # cliente desconectou antes de enviar o corpo
+        try:
+            await self._processar(scope, receive, send, headers, idempotency_key, corpo)
+        finally:
+            corpo.close()
+
+    async def _processar(self, scope, receive, send, headers: Headers, idempotency_key: str, corpo) -> None:
+        hash_corpo = await run_in_threadpool(_hash_corpo, corpo, headers)
+        # Anônimos não têm usuário para separar as chaves: o corpo entra no escopo
+        escopo = _usuario_da_requisicao(headers) or f"anonimo:{hash_corpo}"
+        chave = hashlib.sha256(f"{escopo}:{scope['path']}:{idempotency_key}".encode()).hexdigest()
+
+        try:
+            gravada = await armazem.reservar(chave, hash_corpo)
+        except CorpoDiferente:
+            return await self._enviar(send, (
+                422,
+                [["content-type", "application/json"]],
+                b'{"detail":"Idempotency-Key j\\u00e1 usada com outro corpo de requisi\\u00e7\\u00e3o"}'
+            ))
+        except asyncio.TimeoutError:
+            return await self._enviar(send, (
+                409,
+                [["content-type", "application/json"]],
+                b'{"detail":"Requisi\\u00e7\\u00e3o com esta Idempotency-Key ainda em processamento"}'
+            ))
+
+        if gravada is not None:
+            return await self._enviar(send, gravada, repetida=True)
+
+        # Primeira execução: captura a resposta enquanto ela é enviada
+        resposta = {"status": 500, "headers": [], "corpo": bytearray()}
+
+        async def send_capturando(message):
+            if message["type"] == "http.response.start":
+                resposta["status"] = message["status"]
+                resposta["headers"] = [
+                    [k.decode("latin-1"), v.decode("latin-1")] for k, v in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                resposta["corpo"].extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _reenviar_corpo(corpo, receive), send_capturando)
+        except BaseException:
+            await armazem.liberar(chave)
+            raise
+
+        # Erros de servidor e respostas enormes não são reaproveitados
+        if resposta["status"] >= 500 or len(resposta["corpo"]) > MAX_CORPO_BYTES:
+            await armazem.liberar(chave)
+        else:
+            await armazem.concluir(chave, (resposta["status"], resposta["headers"], bytes(resposta["corpo"])))
+
+    async def _enviar(self, send, resposta: Resposta, repetida: bool = False) -> None:
+        status_code, headers, corpo = resposta
+        raw_headers = [
+            (k.encode("latin-1"), v.encode("latin-1")) for k, v in headers
+            if k.lower() != "content-length"
+        ]
+        raw_headers.append((b"content-length", str(len(corpo)).encode()))
+        if repetida:
+            raw_headers.append((b"idempotent-replayed", b"true"))
+
+        await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": corpo})
@@ -0,0 +1,96 @@
+"""
+Lançamentos agendados (data_lancamento)
+O flag `liberado` de temporadas e episódios é gravado ao salvar; esta tarefa do
+agendador o liga no horário do lançamento e invalida o catálogo. Assim as
+consultas dos alunos filtram por um booleano indexado, e as respostas sabem até
+quando valem (proximo_lancamento).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio
+from app.services.agendador import agendador, INTERVALO_PADRAO_SEGUNDOS
+
+TAREFA = "lancamentos"
+
+_agendado: Optional[datetime] = None  # próximo lançamento visto na última rodada
+
+
+def _pendentes(modelo):
+    """Publicado e visível (nulo vale como visível, ver esta_liberado), mas ainda não liberado"""
+    return (
+        modelo.liberado == False,
+        modelo.status == "publicado",
+        or_(modelo.visivel == True, modelo.visivel == None),
+        modelo.data_lancamento != None
+    )
+
+
+def _utc(data: Optional[datetime]) -> Optional[datetime]:
+    if data is not None and data.tzinfo is None:
+        return data.replace(tzinfo=timezone.utc)  # SQLite devolve sem fuso
+    return data
+
+
+def proximo_lancamento(db: Session) -> Optional[datetime]:
+    """Data do próximo lançamento agendado (temporada ou episódio)"""
+    datas = [
+        _utc(db.query(func.min(modelo.data_lancamento)).filter(*_pendentes(modelo)).scalar())
+        for modelo in (Temporada, Episodio)
+    ]
+    datas = [d for d in datas if d is not None]
+    return min(datas) if datas else None
+
+
+def liberar_lancamentos(db: Session, agora: Optional[datetime] = None) -> int:
+    """Liga `liberado` em tudo cuja data de lançamento já chegou; retorna quantos"""
+    agora = agora or datetime.now(timezone.utc)
+    total = 0
+    for modelo in (Temporada, Episodio):
+        resultado = db.execute(
+            update(modelo)
+            .where(*_pendentes(modelo), modelo.data_lancamento <= agora)
+            .values(liberado=True)
+            .execution_options(synchronize_session=False)
+        )
+        total += resultado.rowcount
+    db.commit()
+    return total
+
+
+def executar_lancamentos() -> Optional[datetime]:
+    """Tarefa do agendador: libera o que venceu e agenda o próximo lançamento"""
+    from app.services.catalogo import invalidar_catalogo
+    global _agendado
+
+    db = SessionLocal()
+    try:
+        agora = datetime.now(timezone.utc)
+        liberados = liberar_lancamentos(db, agora)
+        proximo = proximo_lancamento(db)
+    finally:
+        db.close()
+
+    if liberados:
+        print(f"[LANCAMENTOS] {liberados} item(ns) liberado(s)")
+    # Invalida também quando outro worker liberou antes (o lançamento esperado venceu)
+    if liberados or (_agendado is not None and _agendado <= agora):
+        invalidar_catalogo(reagendar=False)
+    _agendado = proximo
+
+    # Revisita no intervalo padrão para enxergar agendamentos feitos em outro worker
+    limite = agora + timedelta(seconds=INTERVALO_PADRAO_SEGUNDOS)
+    return min(proximo, limite) if proximo else limite
+
+
+def reagendar_lancamentos() -> None:
+    """Chamar após escritas no catálogo (nova data_lancamento entra na agenda na hora)"""
+    agendador.acordar(TAREFA)
+
+
+def registrar_tarefa() -> None:
+    agendador.registrar(TAREFA, executar_lancamentos)
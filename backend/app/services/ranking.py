@@ -0,0 +1,62 @@
+"""
+Ranking de usuários por episódios concluídos
+Lê o contador users.episodios_concluidos pelos índices ix_users_ranking*: o top-N
+percorre só as N primeiras entradas e a posição de um usuário é uma contagem de
+faixa (quantos ativos têm mais concluídos), sem agregar usuario_episodios.
+"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+# Filtros aceitos para o ranking (coluna de users)
+FILTROS = ("area", "cargo")
+
+
+def _ativos(area: Optional[str] = None, cargo: Optional[str] = None) -> list:
+    filtros = [User.status == "ativo"]
+    if area is not None:
+        filtros.append(User.area == area)
+    if cargo is not None:
+        filtros.append(User.cargo == cargo)
+    return filtros
+
+
+def ranking_usuarios(db: Session, limite: int, area: Optional[str] = None, cargo: Optional[str] = None) -> List[User]:
+    """Top-N de usuários ativos (opcionalmente de uma área/cargo)"""
+    return db.query(User)\
+        .filter(*_ativos(area, cargo))\
+        .order_by(User.episodios_concluidos.desc(), User.id.desc())\
+        .limit(limite)\
+        .all()
+
+
+def com_posicoes(usuarios: List[User]) -> List[Tuple[int, User]]:
+    """
+    Numera um top-N (ordenado como em ranking_usuarios) com a mesma regra de
+    posicao_usuario: empatados dividem a posição e a seguinte pula (1, 2, 2, 4)
+    """
+    numerados = []
+    for indice, usuario in enumerate(usuarios, 1):
+        if numerados and numerados[-1][1].episodios_concluidos == usuario.episodios_concluidos:
+            numerados.append((numerados[-1][0], usuario))
+        else:
+            numerados.append((indice, usuario))
+    return numerados
+
+
+def posicao_usuario(db: Session, usuario: User, area: Optional[str] = None, cargo: Optional[str] = None) -> int:
+    """Posição do usuário (1 = primeiro; empatados dividem a posição)"""
+    acima = db.query(User.id)\
+        .filter(*_ativos(area, cargo), User.episodios_concluidos > usuario.episodios_concluidos)\
+        .count()
+    return acima + 1
+
+
+def posicoes_usuario(db: Session, usuario: User) -> Dict[str, Optional[int]]:
+    """Posição geral, na área e no cargo do usuário (None se ele não tiver área/cargo)"""
+    posicoes = {"geral": posicao_usuario(db, usuario)}
+    for filtro in FILTROS:
+        valor = getattr(usuario, filtro)
+        posicoes[filtro] = posicao_usuario(db, usuario, **{filtro: valor}) if valor else None
+    return posicoes
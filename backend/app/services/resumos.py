@@ -0,0 +1,262 @@
+"""
+Resumos diários dos relatórios (resumos_diarios / resumos_diarios_temporada)
+Cada dia fechado (UTC) é agregado uma única vez com INSERT ... SELECT a partir de
+users, usuario_episodios e resultados_prova; os relatórios leem os resumos e só o
+dia corrente (ou algum dia ainda não resumido) é calculado na hora.
+Roda como tarefa do agendador logo após a meia-noite e também pela linha de
+comando (python gerar_resumos.py) para quem preferir cron. Gravar é idempotente.
+Cada dia guarda também um esboço HyperLogLog dos ouvintes, para estimar ouvintes
+distintos de N dias sem reler usuario_episodios.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Integer, Numeric, BigInteger, case, cast, func, insert, literal, null, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.user import User
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio
+from app.models.prova import Prova, ResultadoProva
+from app.models.estatistica import EstatisticaTemporada, ResumoDiario, ResumoDiarioTemporada
+from app.services.agendador import agendador
+from app.utils.hll import HyperLogLog
+
+TAREFA = "resumos_diarios"
+
+# Minutos após a meia-noite UTC para fechar o dia (dá tempo às escritas em andamento)
+MARGEM_MINUTOS = 5
+
+_METRICAS = ("conclusoes", "tentativas", "aprovadas", "soma_pontuacao", "segundos_ouvidos_total")
+
+
+def hoje_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _momento(dia: date) -> datetime:
+    """Início do dia UTC (ingênuo, como o restante do dashboard)"""
+    return datetime.combine(dia, time.min)
+
+
+def _periodo(coluna, inicio: Optional[date], fim: date) -> list:
+    filtros = [coluna < _momento(fim + timedelta(days=1))]
+    if inicio is not None:
+        filtros.append(coluna >= _momento(inicio))
+    return filtros
+
+
+def _fatos(inicio: Optional[date], fim: date, acumulado: bool):
+    """
+    Uma linha por evento do período: cadastro, conclusão de episódio, tentativa de prova.
+    acumulado=True acrescenta, no dia `fim`, o total ouvido atual de cada temporada.
+    """
+    conclusoes = select(
+        func.date(UsuarioEpisodio.data_conclusao).label("dia"),
+        Episodio.temporada_id.label("temporada_id"),
+        literal(0).label("novo_usuario"),
+        literal(1).label("conclusao"),
+        literal(0).label("tentativa"),
+        literal(0).label("aprovado"),
+        cast(literal(0), Numeric(12, 2)).label("pontuacao"),
+        cast(null(), BigInteger).label("segundos")
+    ).join(Episodio, Episodio.id == UsuarioEpisodio.episodio_id)\
+        .where(UsuarioEpisodio.assistido == True, *_periodo(UsuarioEpisodio.data_conclusao, inicio, fim))
+
+    tentativas = select(
+        func.date(ResultadoProva.data_realizacao), Prova.temporada_id,
+        literal(0), literal(0), literal(1),
+        case((ResultadoProva.aprovado == True, 1), else_=0),
+        ResultadoProva.pontuacao,
+        cast(null(), BigInteger)
+    ).join(Prova, Prova.id == ResultadoProva.prova_id)\
+        .where(*_periodo(ResultadoProva.data_realizacao, inicio, fim))
+
+    cadastros = select(
+        func.date(User.created_at), null(),
+        literal(1), literal(0), literal(0), literal(0),
+        cast(literal(0), Numeric(12, 2)),
+        cast(null(), BigInteger)
+    ).where(*_periodo(User.created_at, inicio, fim))
+
+    partes = [conclusoes, tentativas, cadastros]
+    if acumulado:
+        partes.append(select(
+            literal(fim, ResumoDiario.data.type), EstatisticaTemporada.temporada_id,
+            literal(0), literal(0), literal(0), literal(0),
+            cast(literal(0), Numeric(12, 2)),
+            EstatisticaTemporada.segundos_ouvidos
+        ))
+    return union_all(*partes).subquery("fatos")
+
+
+def _resumo(fatos, por_temporada: bool, temporada_id: Optional[UUID] = None):
+    """SELECT dia[, temporada_id], métricas ... GROUP BY no formato da tabela de resumo"""
+    chaves = [fatos.c.dia, fatos.c.temporada_id] if por_temporada else [fatos.c.dia]
+    colunas = [*chaves]
+    if not por_temporada:
+        colunas.append(cast(func.sum(fatos.c.novo_usuario), Integer))
+    colunas += [
+        cast(func.sum(fatos.c.conclusao), Integer),
+        cast(func.sum(fatos.c.tentativa), Integer),
+        cast(func.sum(fatos.c.aprovado), Integer),
+        func.coalesce(func.sum(fatos.c.pontuacao), 0),
+        func.sum(fatos.c.segundos)
+    ]
+    consulta = select(*colunas).group_by(*chaves)
+    if por_temporada:
+        consulta = consulta.where(fatos.c.temporada_id != None)
+    if temporada_id is not None:
+        consulta = consulta.where(fatos.c.temporada_id == temporada_id)
+    return consulta
+
+
+def gerar_resumos(db: Session, ate: Optional[date] = None) -> Optional[Tuple[Optional[date], date]]:
+    """
+    Grava os dias fechados ainda sem resumo, até `ate` (padrão: ontem).
+    Retorna o intervalo gravado (início None = todo o histórico) ou None se já estava em dia.
+    """
+    ontem = hoje_utc() - timedelta(days=1)
+    ate = min(ate or ontem, ontem)
+    ultimo = db.scalar(select(func.max(ResumoDiario.data)))
+    if ultimo is not None and ultimo >= ate:
+        return None
+    inicio = ultimo + timedelta(days=1) if ultimo is not None else None
+
+    # O total ouvido só corresponde ao fim de `ate` se ele acabou de fechar
+    fatos = _fatos(inicio, ate, acumulado=(ate == ontem))
+    try:
+        db.execute(insert(ResumoDiario).from_select(
+            ["data", "novos_usuarios", *_METRICAS], _resumo(fatos, por_temporada=False)
+        ))
+        db.execute(insert(ResumoDiarioTemporada).from_select(
+            ["data", "temporada_id", *_METRICAS], _resumo(fatos, por_temporada=True)
+        ))
+        for dia, esboco in _esbocos_ouvintes(db, inicio, ate).items():
+            resumo = db.get(ResumoDiario, dia)
+            if resumo is None:  # dia só com progresso, sem outros eventos
+                resumo = ResumoDiario(data=dia, novos_usuarios=0, conclusoes=0, tentativas=0, aprovadas=0, soma_pontuacao=0)
+                db.add(resumo)
+            resumo.ouvintes_hll = esboco.para_bytes()
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # outro processo gravou os mesmos dias
+        return None
+    return inicio, ate
+
+
+def _esbocos_ouvintes(db: Session, inicio: Optional[date], fim: date) -> Dict[date, HyperLogLog]:
+    """
+    Esboço dos usuários com progresso em cada dia do período. Usa updated_at: um
+    progresso retomado depois sai do dia anterior, por isso o esboço é feito no fechamento.
+    """
+    esbocos: Dict[date, HyperLogLog] = {}
+    consulta = select(func.date(UsuarioEpisodio.updated_at), UsuarioEpisodio.usuario_id)\
+        .where(*_periodo(UsuarioEpisodio.updated_at, inicio, fim))\
+        .distinct()
+    for bloco in db.execute(consulta.execution_options(yield_per=5000)).partitions():
+        for dia, usuario_id in bloco:
+            esbocos.setdefault(_dia(dia), HyperLogLog()).adicionar(usuario_id.bytes)
+    return esbocos
+
+
+def ouvintes_distintos(db: Session, dias: int) -> int:
+    """Estimativa de usuários distintos com progresso nos últimos `dias` dias (inclusive hoje)"""
+    hoje = hoje_utc()
+    inicio = hoje - timedelta(days=dias - 1)
+    uniao = HyperLogLog()
+    for (registradores,) in db.execute(
+        select(ResumoDiario.ouvintes_hll).where(ResumoDiario.data >= inicio, ResumoDiario.ouvintes_hll != None)
+    ):
+        uniao.unir(HyperLogLog(registradores))
+
+    # Dias ainda não resumidos (normalmente só hoje)
+    ultimo = db.scalar(select(func.max(ResumoDiario.data)))
+    desde = max(inicio, ultimo + timedelta(days=1)) if ultimo is not None else inicio
+    for esboco in _esbocos_ouvintes(db, desde, hoje).values():
+        uniao.unir(esboco)
+    return uniao.estimar()
+
+
+def _linhas(db: Session, inicio: date, temporada_id: Optional[UUID]) -> Dict[date, tuple]:
+    """Resumos gravados a partir de `inicio` + dias ainda não resumidos calculados na hora"""
+    hoje = hoje_utc()
+    if temporada_id is None:
+        modelo, filtros = ResumoDiario, []
+        colunas = [ResumoDiario.data, ResumoDiario.novos_usuarios]
+    else:
+        modelo, filtros = ResumoDiarioTemporada, [ResumoDiarioTemporada.temporada_id == temporada_id]
+        colunas = [ResumoDiarioTemporada.data, literal(0)]
+    colunas += [getattr(modelo, m) for m in _METRICAS]
+
+    linhas = {
+        _dia(l[0]): tuple(l[1:])
+        for l in db.execute(select(*colunas).where(modelo.data >= inicio, *filtros))
+    }
+
+    # Dias depois do último resumo (normalmente só hoje) vêm das tabelas base
+    ultimo = db.scalar(select(func.max(ResumoDiario.data)))
+    desde = max(inicio, ultimo + timedelta(days=1)) if ultimo is not None else inicio
+    ao_vivo = db.execute(_resumo(_fatos(desde, hoje, acumulado=True), por_temporada=temporada_id is not None, temporada_id=temporada_id))
+    for l in ao_vivo:
+        valores = tuple(l[1:])
+        if temporada_id is not None:
+            valores = (0,) + valores[1:]  # (dia, temporada_id, ...) -> novos_usuarios = 0
+        linhas[_dia(l[0])] = valores
+    return linhas
+
+
+def _dia(valor) -> date:
+    return valor if isinstance(valor, date) else date.fromisoformat(str(valor))  # SQLite devolve texto
+
+
+def serie_diaria(db: Session, dias: int, temporada_id: Optional[UUID] = None) -> List[dict]:
+    """Série dos últimos `dias` dias (inclusive hoje), com os dias sem eventos preenchidos com zero"""
+    hoje = hoje_utc()
+    inicio = hoje - timedelta(days=dias - 1)
+    # Um dia a mais para calcular os segundos ouvidos do primeiro dia
+    linhas = _linhas(db, inicio - timedelta(days=1), temporada_id)
+
+    serie = []
+    total_anterior = linhas.get(inicio - timedelta(days=1), (None,) * 6)[5]
+    for n in range(dias):
+        dia = inicio + timedelta(days=n)
+        novos, conclusoes, tentativas, aprovadas, soma, total = linhas.get(dia, (0, 0, 0, 0, 0, None))
+        ouvidos = total - total_anterior if total is not None and total_anterior is not None else None
+        serie.append({
+            "data": dia.isoformat(),
+            "novos_usuarios": novos or 0,
+            "conclusoes": conclusoes or 0,
+            "tentativas": tentativas or 0,
+            "aprovadas": aprovadas or 0,
+            "taxa_aprovacao": round(aprovadas / tentativas * 100, 1) if tentativas else 0,
+            "media_pontuacao": round(float(Decimal(soma or 0) / tentativas), 1) if tentativas else 0,
+            "segundos_ouvidos": max(ouvidos, 0) if ouvidos is not None else None
+        })
+        if total is not None:
+            total_anterior = total
+        elif dia in linhas:
+            total_anterior = None  # dia resumido sem o total: não dá para emendar
+    return serie
+
+
+def executar_resumos() -> Optional[datetime]:
+    """Tarefa do agendador: fecha os dias pendentes e volta logo após a próxima meia-noite"""
+    db = SessionLocal()
+    try:
+        gravado = gerar_resumos(db)
+    finally:
+        db.close()
+
+    if gravado:
+        inicio, fim = gravado
+        print(f"[RESUMOS] Dias resumidos: {inicio or 'início'} a {fim}")
+    amanha = hoje_utc() + timedelta(days=1)
+    return datetime.combine(amanha, time.min, tzinfo=timezone.utc) + timedelta(minutes=MARGEM_MINUTOS)
+
+
+def registrar_tarefa() -> None:
+    agendador.registrar(TAREFA, executar_resumos)
@@ -0,0 +1,119 @@
+"""
+"Continuar ouvindo" (GET /usuario/continuar)
+RetomadaUsuario guarda, por usuário, o último episódio em andamento e o próximo
+não assistido (ordem de Temporada.ordem / Episodio.ordem). É atualizada nas
+escritas de progresso; a leitura é uma busca pela chave primária, completada
+com os dados do snapshot do catálogo.
+"""
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.episodio import Episodio
+from app.models.progresso import UsuarioEpisodio, RetomadaUsuario
+from app.schemas.progresso import ContinuarOuvindo, ContinuarUsuario
+from app.services.catalogo import get_catalogo
+
+
+def _proximo_nao_assistido(db: Session, usuario_id: UUID) -> Optional[UUID]:
+    """Primeiro episódio liberado, na ordem do catálogo, que o usuário não concluiu"""
+    assistidos = {
+        episodio_id for (episodio_id,) in db.query(UsuarioEpisodio.episodio_id)
+        .filter(UsuarioEpisodio.usuario_id == usuario_id, UsuarioEpisodio.assistido == True)
+    }
+    for _, episodios in get_catalogo().estrutura:
+        for episodio in episodios:
+            if episodio.id not in assistidos:
+                return episodio.id
+    return None
+
+
+def _ultimo_em_andamento(db: Session, usuario_id: UUID) -> Optional[UsuarioEpisodio]:
+    return db.query(UsuarioEpisodio)\
+        .filter(
+            UsuarioEpisodio.usuario_id == usuario_id,
+            UsuarioEpisodio.assistido == False,
+            UsuarioEpisodio.tempo_atual > 0
+        )\
+        .order_by(UsuarioEpisodio.updated_at.desc())\
+        .first()
+
+
+def _criar(db: Session, usuario_id: UUID) -> RetomadaUsuario:
+    """Primeira vez do usuário (ou anterior a este índice): monta a partir do progresso"""
+    ultimo = _ultimo_em_andamento(db, usuario_id)
+    retomada = RetomadaUsuario(
+        usuario_id=usuario_id,
+        episodio_id=ultimo.episodio_id if ultimo else None,
+        tempo_atual=ultimo.tempo_atual if ultimo else 0,
+        proximo_episodio_id=_proximo_nao_assistido(db, usuario_id)
+    )
+    try:
+        with db.begin_nested():
+            db.add(retomada)
+    except IntegrityError:
+        # Criada ao mesmo tempo por outra requisição
+        return db.get(RetomadaUsuario, usuario_id)
+    return retomada
+
+
+def registrar_progresso(db: Session, usuario_id: UUID, episodio: Episodio, progresso: UsuarioEpisodio, concluiu: bool) -> None:
+    """
+    Atualiza o índice na mesma transação da escrita de progresso.
+    concluiu=True quando o episódio acabou de ser marcado como assistido.
+    """
+    retomada = db.get(RetomadaUsuario, usuario_id)
+    if retomada is None:
+        db.flush()
+        _criar(db, usuario_id)
+        return
+
+    if not progresso.assistido:
+        retomada.episodio_id = episodio.id
+        retomada.tempo_atual = progresso.tempo_atual
+    elif retomada.episodio_id == episodio.id:
+        retomada.episodio_id = None
+        retomada.tempo_atual = 0
+
+    # O próximo só muda quando um episódio é concluído
+    if concluiu:
+        db.flush()
+        retomada.proximo_episodio_id = _proximo_nao_assistido(db, usuario_id)
+
+
+def _ponteiro(episodio_id: Optional[UUID], tempo_atual: int = 0) -> Optional[ContinuarOuvindo]:
+    posicao = get_catalogo().posicao.get(episodio_id) if episodio_id else None
+    if posicao is None:
+        return None  # removido ou não liberado
+    temporada, episodio = posicao
+    percentual = round(min(tempo_atual / episodio.duracao * 100, 100), 1) if episodio.duracao else 0.0
+    return ContinuarOuvindo(
+        episodio_id=episodio.id,
+        temporada_id=temporada.id,
+        titulo=episodio.titulo,
+        tempo_atual=tempo_atual,
+        duracao=episodio.duracao,
+        percentual=percentual
+    )
+
+
+def obter_continuar(db: Session, usuario_id: UUID) -> ContinuarUsuario:
+    retomada = db.get(RetomadaUsuario, usuario_id)
+    if retomada is None:
+        retomada = _criar(db, usuario_id)
+        db.commit()
+
+    proximo = _ponteiro(retomada.proximo_episodio_id)
+    if proximo is None:
+        # Tudo assistido, ou o próximo deixou de estar liberado: um episódio novo pode ter saído
+        proximo_id = _proximo_nao_assistido(db, usuario_id)
+        if proximo_id != retomada.proximo_episodio_id:
+            retomada.proximo_episodio_id = proximo_id
+            db.commit()
+        proximo = _ponteiro(proximo_id)
+
+    return ContinuarUsuario(
+        retomar=_ponteiro(retomada.episodio_id, retomada.tempo_atual or 0),
+        proximo=proximo
+    )
@@ -0,0 +1,180 @@
+"""
+Sessões de prova
+O prazo (Prova.tempo_limite) é controlado pelo servidor e as respostas
+parciais ficam numa única linha por sessão, atualizada a cada clique.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import update, func, literal, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.prova import Prova, ResultadoProva, SessaoProva, TentativaProva
+from app.schemas.prova import SessaoProvaOut
+from app.services.tentativas import registrar_tentativa
+
+# Folga para latência de rede no envio final / último autosave
+TOLERANCIA_SEGUNDOS = 30
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _utc(data: Optional[datetime]) -> Optional[datetime]:
+    """SQLite devolve datas sem fuso; todas são gravadas em UTC"""
+    if data is not None and data.tzinfo is None:
+        return data.replace(tzinfo=timezone.utc)
+    return data
+
+def sessao_expirada(sessao: SessaoProva, agora: Optional[datetime] = None) -> bool:
+    """Indica se o prazo (mais a tolerância) já passou"""
+    prazo = _utc(sessao.prazo)
+    if prazo is None:
+        return False
+    return (agora or _agora()) > prazo + timedelta(seconds=TOLERANCIA_SEGUNDOS)
+
+def calcular_tempo_gasto(sessao: SessaoProva, agora: Optional[datetime] = None) -> int:
+    """Segundos entre o início e o envio, limitado ao prazo"""
+    fim = agora or _agora()
+    prazo = _utc(sessao.prazo)
+    if prazo is not None:
+        fim = min(fim, prazo)
+    return max(0, int((fim - _utc(sessao.iniciada_em)).total_seconds()))
+
+def sessao_out(sessao: SessaoProva) -> SessaoProvaOut:
+    """Serializa a sessão com o tempo restante calculado no servidor"""
+    prazo = _utc(sessao.prazo)
+    restantes = None
+    if prazo is not None:
+        restantes = max(0, int((prazo - _agora()).total_seconds()))
+
+    return SessaoProvaOut(
+        id=sessao.id,
+        prova_id=sessao.prova_id,
+        iniciada_em=_utc(sessao.iniciada_em),
+        prazo=prazo,
+        segundos_restantes=restantes,
+        respostas=sessao.respostas or {}
+    )
+
+def obter_sessao_ativa(db: Session, usuario_id: UUID, prova_id: UUID) -> Optional[SessaoProva]:
+    """Sessão em andamento do usuário na prova (índice único parcial)"""
+    return db.query(SessaoProva).filter(
+        SessaoProva.usuario_id == usuario_id,
+        SessaoProva.prova_id == prova_id,
+        SessaoProva.status == "em_andamento"
+    ).first()
+
+def _tentativas_feitas(db: Session, usuario_id: UUID, prova_id: UUID) -> int:
+    contador = db.query(TentativaProva.tentativas).filter(
+        TentativaProva.usuario_id == usuario_id,
+        TentativaProva.prova_id == prova_id
+    ).scalar()
+    if contador is not None:
+        return contador
+    return db.query(ResultadoProva).filter(
+        ResultadoProva.usuario_id == usuario_id,
+        ResultadoProva.prova_id == prova_id
+    ).count()
+
+def finalizar_sessao(
+    db: Session,
+    sessao: SessaoProva,
+    prova: Prova,
+    respostas_enviadas: Optional[Dict[str, str]] = None
+) -> Optional[Tuple[ResultadoProva, dict]]:
+    """
+    Finaliza a sessão como uma tentativa, com as respostas salvas.
+    Respostas enviadas no final só valem dentro do prazo.
+    Retorna (resultado, correção), ou None se as tentativas se esgotaram.
+    O commit fica com quem chama.
+    """
+    agora = _agora()
+    respostas = dict(sessao.respostas or {})
+    if respostas_enviadas and not sessao_expirada(sessao, agora):
+        respostas.update(respostas_enviadas)
+
+    sessao_id = sessao.id
+    registro = registrar_tentativa(
+        db, prova, sessao.usuario_id, respostas,
+        tempo_gasto=calcular_tempo_gasto(sessao, agora)
+    )
+
+    # Com ou sem tentativa disponível, a sessão se encerra
+    sessao = db.get(SessaoProva, sessao_id)
+    sessao.status = "finalizada"
+    sessao.atualizada_em = agora
+    if registro is not None:
+        sessao.resultado_id = registro[0].id
+
+    return registro
+
+def iniciar_sessao(db: Session, prova: Prova, usuario_id: UUID) -> Optional[SessaoProva]:
+    """
+    Inicia (ou retoma) a sessão do usuário na prova.
+    Uma sessão vencida e não enviada conta como tentativa com as respostas salvas.
+    Retorna None se não houver tentativas disponíveis.
+    """
+    ativa = obter_sessao_ativa(db, usuario_id, prova.id)
+    if ativa and not sessao_expirada(ativa):
+        return ativa
+
+    if ativa:
+        finalizar_sessao(db, ativa, prova)
+        db.commit()
+
+    if _tentativas_feitas(db, usuario_id, prova.id) >= prova.tentativas_permitidas:
+        return None
+
+    agora = _agora()
+    sessao = SessaoProva(
+        usuario_id=usuario_id,
+        prova_id=prova.id,
+        respostas={},
+        status="em_andamento",
+        prazo=agora + timedelta(minutes=prova.tempo_limite) if prova.tempo_limite else None,
+        iniciada_em=agora,
+        atualizada_em=agora
+    )
+    db.add(sessao)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Outra requisição criou a sessão ao mesmo tempo
+        db.rollback()
+        return obter_sessao_ativa(db, usuario_id, prova.id)
+
+    db.refresh(sessao)
+    return sessao
+
+def salvar_respostas(db: Session, sessao_id: UUID, usuario_id: UUID, respostas: Dict[str, str]) -> bool:
+    """
+    Autosave: mescla as respostas parciais na sessão com um único UPDATE.
+    Retorna False se a sessão não existe, não é do usuário, foi encerrada ou venceu.
+    """
+    agora = _agora()
+
+    if db.bind.dialect.name == "postgresql":
+        novas = func.coalesce(SessaoProva.respostas, literal({}, JSONB)).op("||")(literal(respostas, JSONB))
+    else:
+        novas = func.json_patch(func.coalesce(SessaoProva.respostas, "{}"), json.dumps(respostas))
+
+    resultado = db.execute(
+        update(SessaoProva)
+        .where(
+            SessaoProva.id == sessao_id,
+            SessaoProva.usuario_id == usuario_id,
+            SessaoProva.status == "em_andamento",
+            or_(
+                SessaoProva.prazo == None,
+                SessaoProva.prazo >= agora - timedelta(seconds=TOLERANCIA_SEGUNDOS)
+            )
+        )
+        .values(respostas=novas, atualizada_em=agora)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return resultado.rowcount == 1
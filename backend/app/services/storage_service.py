@@ -0,0 +1,112 @@
+"""
+Serviço de Storage (Cloudflare R2 / S3-compatible)
+STORAGE_BACKEND=local grava num diretório local (só desenvolvimento: as URLs
+local:// não são servidas ao player). Com o R2 (padrão) sem credenciais, as
+operações falham em vez de cair no disco efêmero do servidor.
+"""
+import boto3
+from botocore.client import Config
+from pathlib import Path
+from typing import Iterator
+import os
+
+# Configuração do Cloudflare R2 (S3-compatible)
+R2_ACCOUNT_ID = os.getenv("R2_ACCOUNT_ID", "")
+R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID", "")
+R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY", "")
+R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "podcast-aec")
+R2_ENDPOINT = os.getenv("R2_ENDPOINT", f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com")
+
+# 'r2' (padrão) ou 'local' (diretório LOCAL_STORAGE_DIR, desenvolvimento)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "r2").lower()
+LOCAL_STORAGE_DIR = Path(os.getenv("LOCAL_STORAGE_DIR", "./storage_local"))
+LOCAL_URL_PREFIX = "local://"
+
+TAMANHO_PEDACO = 64 * 1024  # leitura em streaming
+
+def storage_local() -> bool:
+    """Indica se o storage local (desenvolvimento) foi escolhido"""
+    return STORAGE_BACKEND == "local"
+
+def get_s3_client():
+    """Retorna cliente S3 configurado para Cloudflare R2"""
+    if not (R2_ACCESS_KEY_ID and R2_SECRET_ACCESS_KEY):
+        raise RuntimeError(
+            "Storage R2 não configurado (R2_ACCESS_KEY_ID/R2_SECRET_ACCESS_KEY); "
+            "em desenvolvimento use STORAGE_BACKEND=local"
+        )
+    return boto3.client(
+        's3',
+        endpoint_url=R2_ENDPOINT,
+        aws_access_key_id=R2_ACCESS_KEY_ID,
+        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+        config=Config(signature_version='s3v4'),
+        region_name='auto'
+    )
+
+def get_public_url(key: str) -> str:
+    """Gera URL pública do arquivo"""
+    if storage_local():
+        return f"{LOCAL_URL_PREFIX}{key}"
+    # Para R2, você pode configurar um domínio público ou usar presigned URLs
+    # Por enquanto, vamos usar a estrutura básica
+    return f"https://{R2_BUCKET_NAME}.{R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{key}"
+
+def key_from_url(url: str) -> str:
+    """Extrai a chave do objeto a partir da URL gerada por get_public_url"""
+    if url.startswith(LOCAL_URL_PREFIX):
+        return url[len(LOCAL_URL_PREFIX):]
+    return url.split(".r2.cloudflarestorage.com/", 1)[-1]
+
+def _local_path(key: str) -> Path:
+    path = (LOCAL_STORAGE_DIR / key).resolve()
+    if LOCAL_STORAGE_DIR.resolve() not in path.parents:
+        raise ValueError(f"Chave inválida: {key}")
+    return path
+
+def upload_file_to_r2(contents: bytes, key: str, content_type: str) -> str:
+    """Envia o conteúdo para o storage e retorna a URL do objeto"""
+    if storage_local():
+        path = _local_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(contents)
+    else:
+        get_s3_client().put_object(
+            Bucket=R2_BUCKET_NAME,
+            Key=key,
+            Body=contents,
+            ContentType=content_type
+        )
+
+    return get_public_url(key)
+
+def stream_file_from_r2(key: str) -> Iterator[bytes]:
+    """
+    Abre um objeto do storage e devolve seus pedaços, sem carregá-lo inteiro na memória.
+    A abertura é imediata: objeto inexistente falha aqui, antes de a resposta começar.
+    """
+    if storage_local():
+        arquivo = _local_path(key).open("rb")
+
+        def pedacos_locais():
+            with arquivo:
+                while pedaco := arquivo.read(TAMANHO_PEDACO):
+                    yield pedaco
+        return pedacos_locais()
+
+    corpo = get_s3_client().get_object(Bucket=R2_BUCKET_NAME, Key=key)["Body"]
+
+    def pedacos_r2():
+        try:
+            yield from corpo.iter_chunks(TAMANHO_PEDACO)
+        finally:
+            corpo.close()
+    return pedacos_r2()
+
+def delete_file_from_r2(url: str) -> None:
+    """Remove um objeto do storage a partir da sua URL"""
+    key = key_from_url(url)
+    if storage_local():
+        _local_path(key).unlink(missing_ok=True)
+    else:
+        get_s3_client().delete_object(Bucket=R2_BUCKET_NAME, Key=key)
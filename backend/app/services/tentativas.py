@@ -0,0 +1,162 @@
+"""
+Admissão de tentativas de prova
+O número da tentativa é alocado por um único UPDATE ... RETURNING no
+contador (usuario, prova): envios simultâneos nunca passam do limite
+nem repetem o número.
+"""
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from decimal import Decimal
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from app.models.prova import Prova, Pergunta, OpcaoResposta, ResultadoProva, TentativaProva
+from app.schemas.prova import PerguntaWithAnswer, OpcaoWithAnswer
+from app.services.estatisticas import contabilizar_tentativa
+from app.utils.codigo_certificado import gerar_codigo_certificado
+
+def _insert(db: Session):
+    """INSERT com suporte a ON CONFLICT do dialeto em uso"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(TentativaProva)
+
+def _garantir_contador(db: Session, usuario_id: UUID, prova_id: UUID) -> None:
+    """Cria o contador se ainda não existir, partindo das tentativas já registradas"""
+    tentativas_registradas = select(func.count(ResultadoProva.id)).where(
+        ResultadoProva.usuario_id == usuario_id,
+        ResultadoProva.prova_id == prova_id
+    ).scalar_subquery()
+    
+    db.execute(
+        _insert(db)
+        .values(usuario_id=usuario_id, prova_id=prova_id, tentativas=tentativas_registradas)
+        .on_conflict_do_nothing(index_elements=["usuario_id", "prova_id"])
+    )
+
+def admitir_tentativa(db: Session, usuario_id: UUID, prova: Prova) -> Optional[int]:
+    """
+    Reserva a próxima tentativa do usuário na prova.
+    Retorna o número da tentativa, ou None se as tentativas se esgotaram.
+    A reserva faz parte da transação atual: só vale após o commit
+    (o INSERT do resultado deve ir no mesmo commit).
+    """
+    alocar = update(TentativaProva)\
+        .where(
+            TentativaProva.usuario_id == usuario_id,
+            TentativaProva.prova_id == prova.id,
+            TentativaProva.tentativas < prova.tentativas_permitidas
+        )\
+        .values(tentativas=TentativaProva.tentativas + 1)\
+        .returning(TentativaProva.tentativas)\
+        .execution_options(synchronize_session=False)
+    
+    numero = db.execute(alocar).scalar()
+    if numero is None:
+        # Primeiro envio (sem contador) ou tentativas esgotadas
+        _garantir_contador(db, usuario_id, prova.id)
+        numero = db.execute(alocar).scalar()
+    
+    return numero
+
+def corrigir_respostas(db: Session, prova: Prova, respostas: Dict[str, str]) -> dict:
+    """
+    Corrige as respostas da prova.
+    Retorna pontuacao, aprovado, acertos, erros e o feedback por pergunta.
+    """
+    perguntas = db.query(Pergunta).filter(Pergunta.prova_id == prova.id).all()
+    
+    # Todas as opções da prova numa única consulta
+    opcoes_por_pergunta = {}
+    for o in db.query(OpcaoResposta).join(Pergunta).filter(Pergunta.prova_id == prova.id).all():
+        opcoes_por_pergunta.setdefault(o.pergunta_id, []).append(o)
+    
+    total_pontos = sum(p.peso for p in perguntas)
+    pontos_obtidos = 0
+    acertos = 0
+    erros = 0
+    feedback_perguntas = []
+    
+    for pergunta in perguntas:
+        resposta_usuario_id = respostas.get(str(pergunta.id))
+        
+        opcoes = opcoes_por_pergunta.get(pergunta.id, [])
+        opcao_correta = next((o for o in opcoes if o.correta), None)
+        
+        acertou = False
+        if resposta_usuario_id and opcao_correta:
+            acertou = str(opcao_correta.id) == resposta_usuario_id
+            if acertou:
+                pontos_obtidos += pergunta.peso
+                acertos += 1
+            else:
+                erros += 1
+        else:
+            erros += 1
+        
+        # Montar feedback se configurado para mostrar
+        if prova.mostrar_respostas:
+            feedback_perguntas.append(PerguntaWithAnswer(
+                id=pergunta.id,
+                enunciado=pergunta.enunciado,
+                ordem=pergunta.ordem,
+                peso=pergunta.peso,
+                opcoes=[OpcaoWithAnswer(
+                    id=o.id,
+                    texto=o.texto,
+                    ordem=o.ordem,
+                    correta=o.correta,
+                    feedback=o.feedback
+                ) for o in opcoes],
+                resposta_usuario=UUID(resposta_usuario_id) if resposta_usuario_id else None,
+                acertou=acertou
+            ))
+    
+    # Calcular porcentagem
+    pontuacao = (pontos_obtidos / total_pontos * 100) if total_pontos > 0 else 0
+    
+    return {
+        "pontuacao": Decimal(str(round(pontuacao, 2))),
+        "aprovado": pontuacao >= float(prova.nota_minima_aprovacao),
+        "acertos": acertos,
+        "erros": erros,
+        "perguntas": feedback_perguntas
+    }
+
+def registrar_tentativa(
+    db: Session,
+    prova: Prova,
+    usuario_id: UUID,
+    respostas: Dict[str, str],
+    tempo_gasto: Optional[int] = None
+) -> Optional[Tuple[ResultadoProva, dict]]:
+    """
+    Corrige, reserva a tentativa e adiciona o resultado à sessão do banco.
+    Retorna (resultado, correção), ou None se as tentativas se esgotaram.
+    O commit fica com quem chama.
+    """
+    # Correção antes da reserva: o lock do contador dura só até o commit do INSERT
+    correcao = corrigir_respostas(db, prova, respostas)
+    
+    tentativa_numero = admitir_tentativa(db, usuario_id, prova)
+    if tentativa_numero is None:
+        db.rollback()
+        return None
+    
+    resultado = ResultadoProva(
+        usuario_id=usuario_id,
+        prova_id=prova.id,
+        respostas=respostas,
+        pontuacao=correcao["pontuacao"],
+        aprovado=correcao["aprovado"],
+        tentativa_numero=tentativa_numero,
+        tempo_gasto=tempo_gasto,
+        codigo_certificado=gerar_codigo_certificado() if correcao["aprovado"] else None
+    )
+    db.add(resultado)
+    db.flush()
+    contabilizar_tentativa(db, resultado)
+    
+    return resultado, correcao
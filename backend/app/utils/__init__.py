@@ -2,6 +2,12 @@
 from .jwt import (
     verify_password, get_password_hash,
     create_access_token, create_refresh_token, decode_token,
-    get_current_user, get_current_admin,
+    get_current_user, get_current_user_id, get_current_admin,
     create_password_reset_token, verify_password_reset_token
 )
+from .codigo_certificado import gerar_codigo_certificado, normalizar_codigo_certificado
+from .rate_limit import RateLimiter, ip_cliente
+from .paginacao import codificar_cursor, decodificar_cursor, paginar, contar, contar_com_precisao, definir_headers
+from .texto import normalizar_texto, escapar_like
+from .ordenacao import reordenar
+from .hll import HyperLogLog
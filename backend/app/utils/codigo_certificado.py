@@ -0,0 +1,51 @@
+"""
+Códigos de validação de certificados
+Formato: NLP-XXXXX-XXXXX-C (base32 Crockford, 50 bits aleatórios + dígito verificador)
+"""
+import secrets
+from typing import Optional
+
+PREFIXO = "NLP"
+ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford (sem I, L, O, U)
+TAMANHO = 10  # caracteres aleatórios
+
+# Caracteres ambíguos digitados pelo usuário
+_SUBSTITUICOES = str.maketrans({"I": "1", "L": "1", "O": "0"})
+
+def _digito_verificador(corpo: str) -> str:
+    """Dígito verificador Luhn mod 32 (detecta erros de um caractere e transposições)"""
+    n = len(ALFABETO)
+    fator = 2
+    soma = 0
+    for caractere in reversed(corpo):
+        adendo = fator * ALFABETO.index(caractere)
+        fator = 1 if fator == 2 else 2
+        soma += adendo // n + adendo % n
+    return ALFABETO[(n - soma % n) % n]
+
+def _formatar(corpo: str) -> str:
+    return f"{PREFIXO}-{corpo[:5]}-{corpo[5:]}-{_digito_verificador(corpo)}"
+
+def gerar_codigo_certificado() -> str:
+    """Gera um novo código de validação"""
+    corpo = "".join(secrets.choice(ALFABETO) for _ in range(TAMANHO))
+    return _formatar(corpo)
+
+def normalizar_codigo_certificado(codigo: str) -> Optional[str]:
+    """
+    Normaliza um código digitado (caixa, hífens, caracteres ambíguos).
+    Retorna None se o formato ou o dígito verificador for inválido.
+    """
+    limpo = codigo.upper().replace("-", "").replace(" ", "")
+    if limpo.startswith(PREFIXO):
+        limpo = limpo[len(PREFIXO):]
+    limpo = limpo.translate(_SUBSTITUICOES)
+    
+    if len(limpo) != TAMANHO + 1 or any(c not in ALFABETO for c in limpo):
+        return None
+    
+    corpo, digito = limpo[:TAMANHO], limpo[TAMANHO]
+    if _digito_verificador(corpo) != digito:
+        return None
+    
+    return _formatar(corpo)
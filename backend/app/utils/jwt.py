@@ -3,6 +3,7 @@ Utilitários JWT para autenticação
 """
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import HTTPException, status, Depends
@@ -105,6 +106,29 @@ async def get_current_user(
     
     return user
 
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UUID:
+    """
+    Dependency leve: valida só o token, sem consultar o banco.
+    Para rotas muito frequentes que já filtram pelo usuário na própria query.
+    """
+    payload = decode_token(credentials.credentials)
+    
+    if payload.get("type") != "access" or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+        )
+    
+    try:
+        return UUID(payload["sub"])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+        )
+
 async def get_current_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -0,0 +1,46 @@
+"""
+Reordenação em lote
+Recebe a lista completa de IDs na nova ordem, valida com uma consulta e grava
+todas as posições num único UPDATE ... SET ordem = CASE id WHEN ... END.
+"""
+from typing import List
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+def reordenar(db: Session, modelo, ids: List[UUID], *filtros, inicio: int = 0) -> int:
+    """
+    Grava ordem = inicio, inicio + 1, ... na ordem de ids.
+    ids deve conter exatamente os itens que satisfazem os filtros (ex. os episódios
+    de uma temporada), senão 400. O commit fica com quem chama.
+    """
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A lista de ordem tem IDs repetidos"
+        )
+    
+    existentes = set(db.scalars(select(modelo.id).where(*filtros)).all())
+    faltando = existentes - set(ids)
+    estranhos = set(ids) - existentes
+    if faltando or estranhos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "mensagem": "A lista de ordem deve conter exatamente os itens atuais",
+                "faltando": sorted(str(i) for i in faltando),
+                "desconhecidos": sorted(str(i) for i in estranhos)
+            }
+        )
+    
+    if not ids:
+        return 0
+    
+    resultado = db.execute(
+        update(modelo)
+        .where(modelo.id.in_(ids))
+        .values(ordem=case({id_: inicio + i for i, id_ in enumerate(ids)}, value=modelo.id))
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount
@@ -0,0 +1,126 @@
+"""
+Paginação por cursor (keyset)
+O cursor é opaco para o cliente: base64 da chave de ordenação do último item,
+ex. (created_at, id) ou (ordem, id). A próxima página filtra por
+(colunas) > (chave) em vez de OFFSET, com custo constante em qualquer profundidade.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Response, status
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query
+
+HEADER_PROXIMO_CURSOR = "X-Next-Cursor"
+HEADER_TOTAL = "X-Total-Count"
+LIMITE_PADRAO = 50  # quando só o cursor é informado
+# Abaixo disso a estimativa do planner não compensa (e em tabela pequena ou nunca
+# analisada ela é um chute): conta exato
+LIMIAR_ESTIMATIVA = 10_000
+
+def _serializar(valor: Any):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    return valor
+
+def _desserializar(valor: Any, coluna):
+    if valor is None:
+        return None
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is UUID:
+        return UUID(valor)
+    return tipo(valor)
+
+def codificar_cursor(chave: Sequence[Any]) -> str:
+    """Chave de ordenação -> cursor opaco"""
+    dados = json.dumps([_serializar(v) for v in chave], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str, colunas: Sequence) -> Tuple:
+    """Cursor opaco -> chave de ordenação, convertida para os tipos das colunas"""
+    try:
+        dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(dados)
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError(cursor)
+        return tuple(_desserializar(v, c) for v, c in zip(valores, colunas))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+def paginar(
+    query: Query,
+    colunas: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    desc: bool = False,
+    offset: int = 0
+) -> Tuple[List, Optional[str]]:
+    """
+    Aplica ordenação estável e o filtro do cursor à query.
+    Retorna (itens, próximo cursor ou None na última página).
+    A última coluna deve ser única (o id) para desempatar.
+    offset só existe para clientes que ainda paginam por número de página.
+    """
+    chave = tuple_(*colunas)
+    if cursor:
+        valores = decodificar_cursor(cursor, colunas)
+        query = query.filter(chave < valores if desc else chave > valores)
+
+    ordem = [c.desc() for c in colunas] if desc else list(colunas)
+    itens = query.order_by(*ordem).offset(offset).limit(limit + 1).all()
+
+    if len(itens) <= limit:
+        return itens, None
+
+    itens = itens[:limit]
+    ultimo = itens[-1]
+    return itens, codificar_cursor([getattr(ultimo, c.key) for c in colunas])
+
+def contar_com_precisao(query: Query, modo: str = "exata") -> Tuple[Optional[int], str]:
+    """
+    Total da query e a precisão obtida: 'exata' (COUNT), 'aproximada' (estimativa do
+    planner no PostgreSQL, sem varrer a tabela) ou 'nenhuma'. A 'aproximada' só estima
+    a tabela inteira (sem WHERE: a seletividade de filtros é um palpite) e com pelo
+    menos LIMIAR_ESTIMATIVA linhas estimadas; nos demais casos, e fora do
+    PostgreSQL, cai no COUNT exato.
+    """
+    if modo == "nenhuma":
+        return None, "nenhuma"
+
+    bind = query.session.get_bind()
+    statement = query.order_by(None).statement
+    if modo == "aproximada" and bind.dialect.name == "postgresql" and statement.whereclause is None:
+        try:
+            compilado = statement.compile(bind, compile_kwargs={"literal_binds": True})
+            with query.session.begin_nested():
+                plano = query.session.execute(text(f"EXPLAIN (FORMAT JSON) {compilado}")).scalar()
+            estimativa = int(plano[0]["Plan"]["Plan Rows"])
+            if estimativa >= LIMIAR_ESTIMATIVA:
+                return estimativa, "aproximada"
+        except Exception:
+            pass  # Sem representação literal: usa o COUNT
+
+    return query.order_by(None).count(), "exata"
+
+def contar(query: Query, modo: str = "exata") -> Optional[int]:
+    """
+    Total da query: 'exata' (COUNT), 'aproximada' (estimativa do planner
+    no PostgreSQL, sem varrer a tabela) ou 'nenhuma'.
+    """
+    return contar_com_precisao(query, modo)[0]
+
+def definir_headers(response: Response, proximo_cursor: Optional[str], total: Optional[int] = None) -> None:
+    """Headers de paginação para rotas que devolvem listas"""
+    if proximo_cursor:
+        response.headers[HEADER_PROXIMO_CURSOR] = proximo_cursor
+    if total is not None:
+        response.headers[HEADER_TOTAL] = str(total)
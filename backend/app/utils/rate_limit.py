@@ -0,0 +1,71 @@
+"""
+Rate limiting em memória (token bucket por cliente)
+"""
+import os
+import time
+from threading import Lock
+from fastapi import HTTPException, Request, status
+
+# Proxies nossos na frente da API (Render: 1). Cada um acrescenta no fim do
+# X-Forwarded-For o IP de quem o chamou; as entradas anteriores vêm do cliente e
+# podem ser forjadas. 0 = sem proxy, usa o IP da conexão.
+PROXIES_CONFIAVEIS = int(os.getenv("PROXIES_CONFIAVEIS", "1"))
+
+
+def ip_cliente(request: Request) -> str:
+    """IP do cliente: a entrada do X-Forwarded-For gravada pelo proxy confiável mais externo"""
+    conexao = request.client.host if request.client else "desconhecido"
+    if PROXIES_CONFIAVEIS <= 0:
+        return conexao
+    encaminhado = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+    if len(encaminhado) < PROXIES_CONFIAVEIS:
+        return conexao
+    return encaminhado[-PROXIES_CONFIAVEIS]
+
+class RateLimiter:
+    """
+    Dependency que limita requisições por IP.
+    Uso: Depends(RateLimiter(requisicoes=30, por_segundos=60))
+    """
+    
+    def __init__(self, requisicoes: int, por_segundos: int, max_clientes: int = 10000):
+        self.capacidade = requisicoes
+        self.taxa = requisicoes / por_segundos  # tokens por segundo
+        self.max_clientes = max_clientes
+        self._buckets = {}  # ip -> (tokens, ultimo_acesso)
+        self._lock = Lock()
+    
+    def _limpar(self, agora: float) -> None:
+        """Remove clientes cujo bucket já está cheio de novo"""
+        tempo_cheio = self.capacidade / self.taxa
+        self._buckets = {
+            ip: (tokens, ultimo)
+            for ip, (tokens, ultimo) in self._buckets.items()
+            if agora - ultimo < tempo_cheio
+        }
+    
+    def consumir(self, cliente: str) -> float:
+        """Consome um token; retorna 0 se permitido ou os segundos até liberar"""
+        agora = time.monotonic()
+        with self._lock:
+            if len(self._buckets) >= self.max_clientes:
+                self._limpar(agora)
+            
+            tokens, ultimo = self._buckets.get(cliente, (self.capacidade, agora))
+            tokens = min(self.capacidade, tokens + (agora - ultimo) * self.taxa)
+            
+            if tokens < 1:
+                self._buckets[cliente] = (tokens, agora)
+                return (1 - tokens) / self.taxa
+            
+            self._buckets[cliente] = (tokens - 1, agora)
+            return 0
+    
+    async def __call__(self, request: Request) -> None:
+        espera = self.consumir(ip_cliente(request))
+        if espera:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas requisições. Tente novamente em instantes.",
+                headers={"Retry-After": str(int(espera) + 1)}
+            )
@@ -0,0 +1,18 @@
+"""
+Normalização de texto para busca
+"""
+import re
+import unicodedata
+from typing import Optional
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas, sem acentos e com espaços simples: "João  Souza" -> "joao souza" """
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sem_acentos.casefold()).strip()
+
+def escapar_like(termo: str) -> str:
+    """Escapa os curingas de LIKE (usar com escape="\\\\")"""
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
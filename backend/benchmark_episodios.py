@@ -0,0 +1,96 @@
+"""
+Script de benchmark das listagens de episódios (payload e latência)
+Cria uma temporada de 20 episódios com transcrição e texto de ~34 KB num banco
+SQLite temporário e mede GET /temporadas/{id} e GET /episodios?temporada_id=, que
+devolvem o resumo (EpisodioSummary), contra a soma dos GET /episodios/{id}, que
+devolvem o episódio completo (o que as listagens devolviam antes).
+Execute: python benchmark_episodios.py [--episodios 20] [--repeticoes 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Banco temporário: precisa estar definido antes de importar a aplicação
+_banco = os.path.join(tempfile.mkdtemp(prefix="benchmark-"), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_banco}"
+
+# Adicionar pasta raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import main
+from app.database.connection import SessionLocal, get_db
+from app.models.user import User
+from app.models.temporada import Temporada
+from app.models.episodio import Episodio
+from app.utils.jwt import get_current_user, get_current_admin
+
+TEXTO = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 50 + "\n\n") * 12  # ~34 KB
+
+
+def medir(client: TestClient, url: str, repeticoes: int):
+    """Retorna (bytes da resposta, latência média em ms)"""
+    resposta = client.get(url)
+    resposta.raise_for_status()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        client.get(url)
+    return len(resposta.content), (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Mede payload e latência das listagens de episódios")
+    parser.add_argument("--episodios", type=int, default=20, help="Episódios na temporada (padrão: 20)")
+    parser.add_argument("--repeticoes", type=int, default=50, help="Requisições por medição (padrão: 50)")
+    args = parser.parse_args()
+
+    with TestClient(main.app) as client:
+        db = SessionLocal()
+        try:
+            admin = User(
+                nome_completo="Benchmark", email="benchmark@aec.com.br", senha_hash="-",
+                perfil="admin", status="ativo"
+            )
+            temporada = Temporada(nome="Temporada benchmark", ordem=1, status="publicado")
+            db.add_all([admin, temporada])
+            db.commit()
+            for i in range(1, args.episodios + 1):
+                db.add(Episodio(
+                    temporada_id=temporada.id, titulo=f"Episódio {i}", ordem=i, status="publicado",
+                    transcricao=TEXTO, conteudo_texto=TEXTO
+                ))
+            db.commit()
+            admin_id, temporada_id = admin.id, temporada.id
+            episodios = [e.id for e in db.query(Episodio.id).filter(Episodio.temporada_id == temporada_id)]
+        finally:
+            db.close()
+
+        # Autenticação fora da medição: toda requisição é do admin criado acima
+        def usuario_benchmark(db: Session = Depends(get_db)) -> User:
+            return db.get(User, admin_id)
+
+        main.app.dependency_overrides[get_current_user] = usuario_benchmark
+        main.app.dependency_overrides[get_current_admin] = usuario_benchmark
+
+        print(f"📊 Temporada com {args.episodios} episódios (~{len(TEXTO) // 1024} KB de transcrição cada)\n")
+        for nome, url in [
+            ("GET /temporadas/{id}", f"/temporadas/{temporada_id}"),
+            ("GET /episodios?temporada_id=", f"/episodios?temporada_id={temporada_id}"),
+        ]:
+            tamanho, latencia = medir(client, url, args.repeticoes)
+            print(f"  {nome:32} {tamanho:>10,} bytes  {latencia:7.2f} ms")
+
+        completos = [medir(client, f"/episodios/{episodio_id}", 1) for episodio_id in episodios]
+        print(f"  {'soma de GET /episodios/{id}':32} {sum(t for t, _ in completos):>10,} bytes"
+              f"  {sum(l for _, l in completos):7.2f} ms")
+
+        main.app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main_benchmark()
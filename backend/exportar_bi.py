@@ -0,0 +1,36 @@
+"""
+Script para exportar os dados de aprendizagem para BI (Parquet no storage)
+Grava só o que mudou desde a última exportação (marca d'água por tabela). A API já
+faz isso sozinha a cada BI_EXPORTACAO_HORAS; use este script no cron se preferir.
+Execute: python exportar_bi.py
+"""
+import sys
+import os
+
+# Adicionar pasta raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.connection import SessionLocal, engine, Base
+from app.services.exportacao_bi import exportar_bi
+
+def main():
+    # Criar tabelas se não existirem
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        linhas = exportar_bi(db)
+        if linhas is None:
+            print("[INFO] Outra exportação para BI em andamento; nada feito")
+            return
+        for tabela, total in linhas.items():
+            print(f"[OK] {tabela}: {total} linha(s) exportada(s)")
+    except Exception as e:
+        print(f"[ERRO] Falha na exportação: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Script para gravar os resumos diários dos relatórios (dias fechados ainda sem resumo)
+A API já faz isso sozinha logo após a meia-noite UTC; use este script no cron quando
+o agendador interno estiver desligado ou para preencher o histórico na hora.
+Execute: python gerar_resumos.py [--ate AAAA-MM-DD]
+"""
+import argparse
+import sys
+import os
+from datetime import date
+
+# Adicionar pasta raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.connection import SessionLocal, engine, Base
+from app.services.resumos import gerar_resumos
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava os resumos diários dos relatórios")
+    parser.add_argument("--ate", type=date.fromisoformat, help="Último dia a resumir (padrão: ontem)")
+    args = parser.parse_args()
+    
+    # Criar tabelas se não existirem
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        gravado = gerar_resumos(db, args.ate)
+        if gravado:
+            inicio, fim = gravado
+            print(f"[OK] Dias resumidos: {inicio or 'início do histórico'} a {fim}")
+        else:
+            print("[INFO] Resumos já em dia")
+    except Exception as e:
+        print(f"[ERRO] Falha ao gerar resumos: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
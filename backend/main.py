@@ -15,19 +15,36 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Importar rotas
-from app.routes import auth, users, temporadas, episodios, provas, progresso, storage, dashboard, anexos
+from app.routes import auth, users, temporadas, episodios, provas, progresso, storage, dashboard, anexos, certificados, busca
 
 # Importar configuração do banco
 from app.database.connection import engine, Base
+from app.services.certificados import encerrar_executor
+from app.services.idempotencia import IdempotenciaMiddleware
+from app.services.busca import preparar_busca
+from app.services.agendador import agendador
+from app.services.lancamentos import registrar_tarefa as registrar_lancamentos
+from app.services.estatisticas import registrar_tarefa as registrar_reconciliacao
+from app.services.resumos import registrar_tarefa as registrar_resumos
+from app.services.exportacao_bi import registrar_tarefa as registrar_exportacao_bi
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
     # Startup: Criar tabelas no banco
     Base.metadata.create_all(bind=engine)
+    preparar_busca(engine)
     print("[OK] Banco de dados inicializado!")
+    # Tarefas em segundo plano (lançamentos agendados, contadores de audiência, resumos diários, BI)
+    registrar_lancamentos()
+    registrar_reconciliacao()
+    registrar_resumos()
+    registrar_exportacao_bi()
+    agendador.iniciar()
     yield
     # Shutdown
+    agendador.parar()
+    encerrar_executor()
     print("[BYE] Servidor encerrado!")
 
 # Criar aplicação FastAPI
@@ -38,6 +55,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Idempotency-Key nos POSTs caros (registrado antes do CORS para ficar por dentro dele)
+app.add_middleware(IdempotenciaMiddleware)
+
 # Configurar CORS
 origins = [
     "http://localhost:5173",      # Vite dev server
@@ -52,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],  # paginação por cursor
 )
 
 # Registrar rotas
@@ -64,6 +85,8 @@ app.include_router(progresso.router, prefix="/usuario", tags=["Progresso"])
 app.include_router(storage.router, prefix="/storage", tags=["Storage"])
 app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard Admin"])
 app.include_router(anexos.router, prefix="/episodios", tags=["Anexos"])
+app.include_router(certificados.router, prefix="/certificados", tags=["Certificados"])
+app.include_router(busca.router, prefix="/busca", tags=["Busca"])
 
 @app.get("/", tags=["Health"])
 async def root():
@@ -0,0 +1,68 @@
+"""
+Migração v10 - Lançamentos agendados (flag liberado)
+Execute: python -m migrations.v10_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === TEMPORADAS E EPISÓDIOS: LIBERADO PARA ALUNOS ===
+        """
+        ALTER TABLE temporadas ADD COLUMN IF NOT EXISTS liberado BOOLEAN NOT NULL DEFAULT FALSE;
+        """,
+        """
+        ALTER TABLE episodios ADD COLUMN IF NOT EXISTS liberado BOOLEAN NOT NULL DEFAULT FALSE;
+        """,
+        # visivel nulo (linhas antigas) vale como visível, o default da coluna
+        "UPDATE temporadas SET visivel = TRUE WHERE visivel IS NULL;",
+        "UPDATE episodios SET visivel = TRUE WHERE visivel IS NULL;",
+        # Estado atual (daqui em diante o app mantém o flag)
+        """
+        UPDATE temporadas SET liberado = (
+            status = 'publicado' AND COALESCE(visivel, TRUE)
+            AND (data_lancamento IS NULL OR data_lancamento <= NOW())
+        );
+        """,
+        """
+        UPDATE episodios SET liberado = (
+            status = 'publicado' AND COALESCE(visivel, TRUE)
+            AND (data_lancamento IS NULL OR data_lancamento <= NOW())
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_temporadas_liberado ON temporadas(liberado);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_episodios_liberado ON episodios(liberado);
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v10...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v10 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
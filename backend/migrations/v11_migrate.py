@@ -0,0 +1,49 @@
+"""
+Migração v11 - Índice "continuar ouvindo"
+Execute: python -m migrations.v11_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === RETOMADA POR USUÁRIO (preenchida sob demanda) ===
+        """
+        CREATE TABLE IF NOT EXISTS retomadas_usuario (
+            usuario_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            episodio_id UUID REFERENCES episodios(id) ON DELETE SET NULL,
+            tempo_atual INTEGER DEFAULT 0,
+            proximo_episodio_id UUID REFERENCES episodios(id) ON DELETE SET NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v11...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v11 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,61 @@
+"""
+Migração v12 - Contadores de audiência
+Execute: python -m migrations.v12_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === CONTADORES DE AUDIÊNCIA (preenchidos pela reconciliação ao iniciar) ===
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_episodio (
+            episodio_id UUID PRIMARY KEY REFERENCES episodios(id) ON DELETE CASCADE,
+            visualizacoes INTEGER NOT NULL DEFAULT 0,
+            concluidos INTEGER NOT NULL DEFAULT 0,
+            segundos_ouvidos BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_temporada (
+            temporada_id UUID PRIMARY KEY REFERENCES temporadas(id) ON DELETE CASCADE,
+            visualizacoes INTEGER NOT NULL DEFAULT 0,
+            concluidos INTEGER NOT NULL DEFAULT 0,
+            segundos_ouvidos BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+        # Ranking top-N: ORDER BY visualizacoes DESC LIMIT n lê só o índice
+        "CREATE INDEX IF NOT EXISTS ix_estatisticas_episodio_visualizacoes ON estatisticas_episodio (visualizacoes DESC);",
+        "CREATE INDEX IF NOT EXISTS ix_estatisticas_temporada_visualizacoes ON estatisticas_temporada (visualizacoes DESC);",
+    ]
+    
+    print("🚀 Iniciando migração v12...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v12 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,50 @@
+"""
+Migração v13 - Ranking de usuários
+Execute: python -m migrations.v13_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === RANKING DE USUÁRIOS ===
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS episodios_concluidos INTEGER NOT NULL DEFAULT 0;",
+        """
+        UPDATE users SET episodios_concluidos = (
+            SELECT COUNT(*) FROM usuario_episodios
+            WHERE usuario_episodios.usuario_id = users.id AND usuario_episodios.assistido = TRUE
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_users_ranking ON users (status, episodios_concluidos, id);",
+        "CREATE INDEX IF NOT EXISTS ix_users_ranking_area ON users (area, status, episodios_concluidos);",
+        "CREATE INDEX IF NOT EXISTS ix_users_ranking_cargo ON users (cargo, status, episodios_concluidos);",
+    ]
+    
+    print("🚀 Iniciando migração v13...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v13 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,41 @@
+"""
+Migração v14 - Cubo de análise
+Execute: python -m migrations.v14_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === CUBO DE ANÁLISE (área × cargo × temporada) ===
+        "CREATE INDEX IF NOT EXISTS ix_users_area_cargo ON users (area, cargo);",
+    ]
+    
+    print("🚀 Iniciando migração v14...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v14 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,66 @@
+"""
+Migração v15 - Resumos diários
+Execute: python -m migrations.v15_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === RESUMOS DIÁRIOS (preenchidos pela tarefa do agendador ou por gerar_resumos.py) ===
+        """
+        CREATE TABLE IF NOT EXISTS resumos_diarios (
+            data DATE PRIMARY KEY,
+            novos_usuarios INTEGER NOT NULL DEFAULT 0,
+            conclusoes INTEGER NOT NULL DEFAULT 0,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            aprovadas INTEGER NOT NULL DEFAULT 0,
+            soma_pontuacao NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            segundos_ouvidos_total BIGINT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS resumos_diarios_temporada (
+            data DATE NOT NULL,
+            temporada_id UUID NOT NULL REFERENCES temporadas(id) ON DELETE CASCADE,
+            conclusoes INTEGER NOT NULL DEFAULT 0,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            aprovadas INTEGER NOT NULL DEFAULT 0,
+            soma_pontuacao NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            segundos_ouvidos_total BIGINT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            PRIMARY KEY (data, temporada_id)
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_resumos_diarios_temporada_temporada_id ON resumos_diarios_temporada (temporada_id);",
+    ]
+    
+    print("🚀 Iniciando migração v15...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v15 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
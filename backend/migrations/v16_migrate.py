@@ -0,0 +1,52 @@
+"""
+Migração v16 - Exportação para BI
+Execute: python -m migrations.v16_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === MARCAS D'ÁGUA DA EXPORTAÇÃO PARA BI ===
+        """
+        CREATE TABLE IF NOT EXISTS marcas_exportacao (
+            tabela VARCHAR(50) PRIMARY KEY,
+            marca TIMESTAMP WITH TIME ZONE NOT NULL,
+            linhas INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+        # Leitura incremental por marca d'água
+        "CREATE INDEX IF NOT EXISTS ix_usuario_episodios_updated_at ON usuario_episodios (updated_at);",
+        "CREATE INDEX IF NOT EXISTS ix_resultados_prova_data_realizacao ON resultados_prova (data_realizacao);",
+        "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);",
+    ]
+    
+    print("🚀 Iniciando migração v16...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v16 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
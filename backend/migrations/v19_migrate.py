@@ -0,0 +1,55 @@
+"""
+Migração v19 - Visibilidade nula nas temporadas e episódios
+Execute: python -m migrations.v19_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === VISIVEL NULO VALE COMO VISÍVEL ===
+        # Bancos que já rodaram a v10 liberaram essas linhas como ocultas
+        "UPDATE temporadas SET visivel = TRUE WHERE visivel IS NULL;",
+        "UPDATE episodios SET visivel = TRUE WHERE visivel IS NULL;",
+        """
+        UPDATE temporadas SET liberado = (
+            status = 'publicado' AND visivel
+            AND (data_lancamento IS NULL OR data_lancamento <= NOW())
+        );
+        """,
+        """
+        UPDATE episodios SET liberado = (
+            status = 'publicado' AND visivel
+            AND (data_lancamento IS NULL OR data_lancamento <= NOW())
+        );
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v19...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v19 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,49 @@
+"""
+Migração v20 - Totais de tentativas por prova
+Execute: python -m migrations.v20_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === TOTAIS POR PROVA (preenchidos pela reconciliação ao iniciar) ===
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_prova (
+            prova_id UUID PRIMARY KEY REFERENCES provas(id) ON DELETE CASCADE,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            aprovadas INTEGER NOT NULL DEFAULT 0,
+            soma_pontuacao NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v20...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v20 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
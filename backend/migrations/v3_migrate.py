@@ -0,0 +1,62 @@
+"""
+Migração v3 - Código de validação dos certificados
+Execute: python -m migrations.v3_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+from app.utils.codigo_certificado import gerar_codigo_certificado
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        """
+        ALTER TABLE resultados_prova 
+        ADD COLUMN IF NOT EXISTS codigo_certificado VARCHAR(20);
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_resultados_prova_codigo_certificado 
+        ON resultados_prova(codigo_certificado);
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v3...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+        
+        # Códigos para aprovados antigos; PDFs já salvos tinham o código antigo
+        # (NLP-timestamp) e são gerados novamente no próximo download
+        ids = conn.execute(text("""
+            SELECT id FROM resultados_prova 
+            WHERE aprovado = true AND codigo_certificado IS NULL
+        """)).scalars().all()
+        
+        for resultado_id in ids:
+            conn.execute(text("""
+                UPDATE resultados_prova 
+                SET codigo_certificado = :codigo, certificado_url = NULL 
+                WHERE id = :id
+            """), {"codigo": gerar_codigo_certificado(), "id": resultado_id})
+        conn.commit()
+        print(f"  ✓ {len(ids)} certificado(s) receberam código de validação")
+    
+    print("✅ Migração v3 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
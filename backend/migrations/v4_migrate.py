@@ -0,0 +1,74 @@
+"""
+Migração v4 - Admissão atômica de tentativas de prova
+Execute: python -m migrations.v4_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === NOVA TABELA: CONTADOR DE TENTATIVAS ===
+        """
+        CREATE TABLE IF NOT EXISTS tentativas_prova (
+            usuario_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            prova_id UUID NOT NULL REFERENCES provas(id) ON DELETE CASCADE,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (usuario_id, prova_id)
+        );
+        """,
+        
+        # === RESULTADOS: renumerar duplicatas geradas pela corrida antiga ===
+        """
+        UPDATE resultados_prova r
+        SET tentativa_numero = n.numero
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY usuario_id, prova_id ORDER BY data_realizacao, id
+            ) AS numero
+            FROM resultados_prova
+        ) n
+        WHERE r.id = n.id AND r.tentativa_numero IS DISTINCT FROM n.numero;
+        """,
+        """
+        ALTER TABLE resultados_prova 
+        ADD CONSTRAINT uq_resultado_tentativa UNIQUE (usuario_id, prova_id, tentativa_numero);
+        """,
+        
+        # === CONTADORES A PARTIR DO HISTÓRICO ===
+        """
+        INSERT INTO tentativas_prova (usuario_id, prova_id, tentativas)
+        SELECT usuario_id, prova_id, COUNT(*)
+        FROM resultados_prova
+        GROUP BY usuario_id, prova_id
+        ON CONFLICT (usuario_id, prova_id) DO NOTHING;
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v4...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v4 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,60 @@
+"""
+Migração v5 - Sessões de prova (tempo no servidor e autosave)
+Execute: python -m migrations.v5_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === NOVA TABELA: SESSÕES DE PROVA ===
+        """
+        CREATE TABLE IF NOT EXISTS sessoes_prova (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            usuario_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            prova_id UUID NOT NULL REFERENCES provas(id) ON DELETE CASCADE,
+            respostas JSONB,
+            status VARCHAR(20) NOT NULL DEFAULT 'em_andamento',
+            prazo TIMESTAMP WITH TIME ZONE,
+            resultado_id UUID REFERENCES resultados_prova(id) ON DELETE SET NULL,
+            iniciada_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+            atualizada_em TIMESTAMP WITH TIME ZONE
+        );
+        """,
+        
+        # === NO MÁXIMO UMA SESSÃO EM ANDAMENTO POR USUÁRIO/PROVA ===
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_sessao_prova_ativa
+        ON sessoes_prova (usuario_id, prova_id)
+        WHERE status = 'em_andamento';
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v5...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v5 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
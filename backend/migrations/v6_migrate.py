@@ -0,0 +1,71 @@
+"""
+Migração v6 - Transcrição paginada e conteúdo pré-renderizado
+Execute: python -m migrations.v6_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine, SessionLocal
+from app.models import Episodio
+from app.services.conteudo_episodio import atualizar_conteudo_derivado
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === EPISÓDIOS: HTML DO CONTEÚDO ===
+        """
+        ALTER TABLE episodios 
+        ADD COLUMN IF NOT EXISTS conteudo_html TEXT;
+        """,
+        
+        # === NOVA TABELA: TRECHOS DA TRANSCRIÇÃO ===
+        """
+        CREATE TABLE IF NOT EXISTS trechos_transcricao (
+            episodio_id UUID NOT NULL REFERENCES episodios(id) ON DELETE CASCADE,
+            indice INTEGER NOT NULL,
+            inicio INTEGER,
+            texto TEXT NOT NULL,
+            PRIMARY KEY (episodio_id, indice)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_trechos_transcricao_inicio 
+        ON trechos_transcricao(episodio_id, inicio);
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v6...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    # Gerar trechos e HTML dos episódios existentes
+    db = SessionLocal()
+    try:
+        episodios = db.query(Episodio).all()
+        for episodio in episodios:
+            atualizar_conteudo_derivado(db, episodio)
+        db.commit()
+        print(f"  ✓ {len(episodios)} episódio(s) processados")
+    finally:
+        db.close()
+    
+    print("✅ Migração v6 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,44 @@
+"""
+Migração v7 - Índice para paginação por cursor
+Execute: python -m migrations.v7_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === USUÁRIOS: ORDEM ESTÁVEL (created_at, id) ===
+        """
+        CREATE INDEX IF NOT EXISTS ix_users_created_at_id 
+        ON users(created_at, id);
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v7...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+    
+    print("✅ Migração v7 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
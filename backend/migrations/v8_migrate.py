@@ -0,0 +1,25 @@
+"""
+Migração v8 - Busca textual (tsvector + GIN)
+Execute: python -m migrations.v8_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+from app.services.busca import preparar_busca
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    # Colunas tsvector geradas reescrevem as tabelas: rodar antes do deploy
+    # (o startup da API também chama preparar_busca, que então não faz nada)
+    print("🚀 Iniciando migração v8...")
+    preparar_busca(engine)
+    print("✅ Migração v8 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,66 @@
+"""
+Migração v9 - Busca de usuários (coluna normalizada + trigramas)
+Execute: python -m migrations.v9_migrate
+"""
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database.connection import engine
+from app.utils.texto import normalizar_texto
+
+def run_migration():
+    """Executa as migrações do banco de dados"""
+    
+    migrations = [
+        # === USUÁRIOS: BUSCA SEM ACENTOS ===
+        """
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS busca_normalizada TEXT;
+        """,
+        """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_users_busca_trgm 
+        ON users USING GIN (busca_normalizada gin_trgm_ops);
+        """,
+    ]
+    
+    print("🚀 Iniciando migração v9...")
+    
+    with engine.connect() as conn:
+        for i, migration in enumerate(migrations, 1):
+            try:
+                conn.execute(text(migration))
+                conn.commit()
+                print(f"  ✓ Migração {i}/{len(migrations)} executada com sucesso")
+            except Exception as e:
+                conn.rollback()
+                # Se já existe, apenas continua
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⏭️ Migração {i}/{len(migrations)} já aplicada, pulando...")
+                else:
+                    print(f"  ❌ Erro na migração {i}: {e}")
+        
+        # Preenche a coluna dos usuários existentes (mesma normalização do model)
+        usuarios = conn.execute(text(
+            "SELECT id, nome_completo, email, matricula_aec FROM users WHERE busca_normalizada IS NULL"
+        )).all()
+        for usuario in usuarios:
+            conn.execute(
+                text("UPDATE users SET busca_normalizada = :busca WHERE id = :id"),
+                {
+                    "id": usuario.id,
+                    "busca": normalizar_texto(" ".join(filter(None, [usuario.nome_completo, usuario.email, usuario.matricula_aec])))
+                }
+            )
+        conn.commit()
+        print(f"  ✓ {len(usuarios)} usuários indexados para busca")
+    
+    print("✅ Migração v9 concluída!")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,72 @@
+"""
+Configuração dos testes
+Usam um banco próprio: TEST_DATABASE_URL (ex. um PostgreSQL descartável) ou um
+SQLite temporário. Execute: python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+# O banco precisa estar definido antes de importar a aplicação
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='testes-'), 'testes.db')}"
+)
+
+# Adicionar pasta raiz (backend) ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.database.connection import SessionLocal, engine, Base
+import app.models  # noqa: F401 (registra as tabelas)
+from app.models.user import User
+from app.models.temporada import Temporada
+from app.models.prova import Prova, Pergunta, OpcaoResposta
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tabelas():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    sessao = SessionLocal()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+
+
+@pytest.fixture
+def prova(db):
+    """Prova de uma pergunta, com 3 tentativas permitidas"""
+    temporada = Temporada(nome="Temporada de teste", ordem=1, status="publicado")
+    db.add(temporada)
+    db.flush()
+    prova = Prova(temporada_id=temporada.id, titulo="Prova de teste", tentativas_permitidas=3, nota_minima_aprovacao=70)
+    db.add(prova)
+    db.flush()
+    pergunta = Pergunta(prova_id=prova.id, enunciado="2 + 2?", ordem=1, peso=1)
+    db.add(pergunta)
+    db.flush()
+    db.add_all([
+        OpcaoResposta(pergunta_id=pergunta.id, texto="4", ordem="A", correta=True),
+        OpcaoResposta(pergunta_id=pergunta.id, texto="5", ordem="B", correta=False)
+    ])
+    db.commit()
+    return prova
+
+
+@pytest.fixture
+def usuario(db):
+    usuario = User(
+        nome_completo="Aluno de Teste", email=f"aluno-{os.urandom(4).hex()}@aec.com.br",
+        senha_hash="-", perfil="usuario", status="ativo"
+    )
+    db.add(usuario)
+    db.commit()
+    return usuario
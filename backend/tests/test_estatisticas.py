@@ -0,0 +1,33 @@
+"""
+Totais por prova (estatisticas_prova): mantidos a cada tentativa, descontados ao
+apagar o usuário e iguais ao que a reconciliação recalcula
+"""
+from decimal import Decimal
+
+from app.models.prova import OpcaoResposta
+from app.models.estatistica import EstatisticaProva
+from app.services.estatisticas import descontar_tentativas_usuario, reconciliar_estatisticas
+from app.services.tentativas import registrar_tentativa
+
+
+def _totais(db, prova_id) -> tuple:
+    db.expire_all()
+    estatistica = db.get(EstatisticaProva, prova_id)
+    return (estatistica.tentativas, estatistica.aprovadas, Decimal(estatistica.soma_pontuacao))
+
+
+def test_tentativas_atualizam_os_totais_da_prova(db, prova, usuario):
+    pergunta = prova.perguntas[0]
+    correta = db.query(OpcaoResposta).filter_by(pergunta_id=pergunta.id, correta=True).one()
+
+    registrar_tentativa(db, prova, usuario.id, {str(pergunta.id): str(correta.id)})
+    registrar_tentativa(db, prova, usuario.id, {})
+    db.commit()
+    assert _totais(db, prova.id) == (2, 1, Decimal(100))
+
+    reconciliar_estatisticas(db)
+    assert _totais(db, prova.id) == (2, 1, Decimal(100))
+
+    descontar_tentativas_usuario(db, usuario.id)
+    db.commit()
+    assert _totais(db, prova.id) == (0, 0, Decimal(0))
@@ -0,0 +1,75 @@
+"""
+Envios simultâneos de prova: a reserva da tentativa (app/services/tentativas.py)
+não pode repetir números nem passar do limite
+"""
+import threading
+
+from app.database.connection import SessionLocal
+from app.models.prova import Prova, ResultadoProva
+from app.services.tentativas import admitir_tentativa, registrar_tentativa
+
+ENVIOS_SIMULTANEOS = 10
+
+
+def _em_paralelo(funcao, vezes: int = ENVIOS_SIMULTANEOS) -> list:
+    """Roda funcao(sessao) em threads liberadas juntas, cada uma com sua sessão; retorna os resultados"""
+    barreira = threading.Barrier(vezes)
+    resultados, erros = [], []
+
+    def executar():
+        sessao = SessionLocal()
+        try:
+            barreira.wait()
+            resultados.append(funcao(sessao))
+        except Exception as e:
+            erros.append(e)
+        finally:
+            sessao.close()
+
+    threads = [threading.Thread(target=executar) for _ in range(vezes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros, erros
+    return resultados
+
+
+def test_envios_simultaneos_respeitam_o_limite(db, prova, usuario):
+    prova_id, usuario_id, limite = prova.id, usuario.id, prova.tentativas_permitidas
+
+    def responder(sessao):
+        registro = registrar_tentativa(sessao, sessao.get(Prova, prova_id), usuario_id, {})
+        if registro is None:
+            return None
+        sessao.commit()
+        return registro[0].tentativa_numero
+
+    numeros = _em_paralelo(responder)
+    admitidos = sorted(n for n in numeros if n is not None)
+
+    assert admitidos == list(range(1, limite + 1))
+    assert numeros.count(None) == ENVIOS_SIMULTANEOS - limite
+
+    gravados = db.query(ResultadoProva.tentativa_numero)\
+        .filter(ResultadoProva.usuario_id == usuario_id, ResultadoProva.prova_id == prova_id)\
+        .order_by(ResultadoProva.tentativa_numero).all()
+    assert [n for n, in gravados] == list(range(1, limite + 1))
+
+
+def test_reservas_simultaneas_sao_unicas_e_consecutivas(db, prova, usuario):
+    prova.tentativas_permitidas = ENVIOS_SIMULTANEOS
+    db.commit()
+    prova_id, usuario_id = prova.id, usuario.id
+
+    def reservar(sessao):
+        numero = admitir_tentativa(sessao, usuario_id, sessao.get(Prova, prova_id))
+        sessao.commit()
+        return numero
+
+    numeros = _em_paralelo(reservar)
+
+    assert sorted(numeros) == list(range(1, ENVIOS_SIMULTANEOS + 1))
+    # Esgotadas: a próxima reserva é recusada
+    assert _em_paralelo(reservar, vezes=2) == [None, None]
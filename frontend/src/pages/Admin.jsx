@@ -775,16 +775,35 @@ function UsersTab({ users, pendingUsers, onApprove, onReject, onRefresh, onSave,
     const [selectedUser, setSelectedUser] = useState(null);
     const [currentPage, setCurrentPage] = useState(1);
     const [actionMenuOpen, setActionMenuOpen] = useState(null);
+    const [searchResults, setSearchResults] = useState(null);
     const itemsPerPage = 10;
 
+    // Busca no servidor (sem acentos, nome/email/matrícula), com debounce
+    useEffect(() => {
+        const termo = searchTerm.trim();
+        if (termo.length < 2) {
+            setSearchResults(null);
+            return;
+        }
+        const timer = setTimeout(async () => {
+            try {
+                const response = await api.get('/users', { params: { search: termo, limit: 100, contagem: 'nenhuma' } });
+                setSearchResults(response.data.users || []);
+            } catch (error) {
+                setSearchResults(null);
+            }
+        }, 250);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
     // Get unique areas and cargos for filters
     const areas = [...new Set(users.map(u => u.area).filter(Boolean))];
     const cargos = [...new Set(users.map(u => u.cargo).filter(Boolean))];
 
     // Filter users
-    const filteredUsers = users.filter(u => {
+    const filteredUsers = (searchResults ?? users).filter(u => {
         const matchesStatus = filter === 'all' || u.status === filter;
-        const matchesSearch = !searchTerm ||
+        const matchesSearch = !searchTerm || searchResults !== null ||
             u.nome_completo?.toLowerCase().includes(searchTerm.toLowerCase()) ||
             u.email?.toLowerCase().includes(searchTerm.toLowerCase());
         const matchesArea = areaFilter === 'all' || u.area === areaFilter;
@@ -891,7 +910,7 @@ function UsersTab({ users, pendingUsers, onApprove, onReject, onRefresh, onSave,
                             <span className="absolute left-3 top-1/2 -translate-y-1/2 text-slate-400">🔍</span>
                             <input
                                 type="text"
-                                placeholder="Buscar por nome ou email..."
+                                placeholder="Buscar por nome, email ou matrícula..."
                                 value={searchTerm}
                                 onChange={(e) => { setSearchTerm(e.target.value); setCurrentPage(1); }}
                                 className="w-full pl-10 pr-4 py-2.5 bg-slate-800 border border-slate-700 rounded-xl text-white placeholder-slate-500 focus:border-aec-pink focus:outline-none"
@@ -1913,7 +1932,17 @@ function EpisodiosTab({ temporadas, onCreate, onUpdate, onDelete }) {
         setShowModal(true);
     };
 
-    const openEditModal = (ep) => {
+    const openEditModal = async (ep) => {
+        // A listagem não traz transcrição/texto completo: buscar o detalhe
+        // (sem o detalhe o formulário salvaria transcrição e texto vazios)
+        try {
+            const response = await api.get(`/episodios/${ep.id}`);
+            ep = response.data;
+        } catch (error) {
+            console.error('Erro ao buscar episódio:', error);
+            alert(`Erro ao carregar episódio: ${error.response?.data?.detail || error.message}`);
+            return;
+        }
         setSelectedEpisode(ep);
         setFormData({
             titulo: ep.titulo,
@@ -2911,6 +2940,20 @@ function ProvasTab() {
     );
 }
 
+// Exportação completa gerada em streaming pelo servidor (sem limite de linhas e com
+// células escapadas contra fórmulas); relatorio: usuarios, progresso ou resultados
+async function baixarExportacao(relatorio) {
+    const response = await api.get(`/dashboard/export/${relatorio}`, {
+        params: { formato: 'csv' },
+        responseType: 'blob'
+    });
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(response.data);
+    link.download = `${relatorio}_${new Date().toISOString().split('T')[0]}.csv`;
+    link.click();
+    URL.revokeObjectURL(link.href);
+}
+
 // Relatorios Tab Component - Sprint 6
 function RelatoriosTab() {
     const [activeReport, setActiveReport] = useState(null);
@@ -2924,14 +2967,16 @@ function RelatoriosTab() {
 
     const relatorios = [
         { id: 'visao-geral', titulo: 'Visão Geral', descricao: 'KPIs e métricas principais', icon: '📈', endpoint: '/dashboard/stats' },
-        { id: 'usuarios-ativos', titulo: 'Usuários Ativos', descricao: 'Top usuários por progresso', icon: '👥', endpoint: '/dashboard/users-progress' },
-        { id: 'performance-provas', titulo: 'Performance Provas', descricao: 'Taxa de aprovação por prova', icon: '🎓', endpoint: '/dashboard/provas-performance' },
-        { id: 'episodios-populares', titulo: 'Episódios Populares', descricao: 'Ranking de visualizações', icon: '🎧', endpoint: '/dashboard/episodios-ranking' },
+        { id: 'usuarios-ativos', titulo: 'Usuários Ativos', descricao: 'Top usuários por progresso', icon: '👥', endpoint: '/dashboard/users-progress', exportacao: 'usuarios' },
+        { id: 'performance-provas', titulo: 'Performance Provas', descricao: 'Taxa de aprovação por prova', icon: '🎓', endpoint: '/dashboard/provas-performance', exportacao: 'resultados' },
+        { id: 'episodios-populares', titulo: 'Episódios Populares', descricao: 'Ranking de visualizações', icon: '🎧', endpoint: '/dashboard/episodios-ranking', exportacao: 'progresso' },
+        { id: 'distribuicao-area', titulo: 'Distribuição por Área', descricao: 'Conclusão e aprovação por área, cargo e temporada', icon: '🧭', endpoint: '/dashboard/cubo' },
         { id: 'crescimento', titulo: 'Crescimento', descricao: 'Novos usuários por período', icon: '📊', endpoint: '/dashboard/novos-usuarios' },
         { id: 'engajamento', titulo: 'Engajamento', descricao: 'Conclusão vs Visualização', icon: '🔥', endpoint: '/dashboard/stats' }
     ];
 
-    const fetchReportData = async (report) => {
+    // fresh: ignora o cache do dashboard no servidor (botão Atualizar)
+    const fetchReportData = async (report, fresh = false) => {
         setLoading(true);
         setActiveReport(report);
         try {
@@ -2939,7 +2984,7 @@ function RelatoriosTab() {
             if (report.id === 'crescimento') {
                 url = `${report.endpoint}?dias=${periodo}`;
             }
-            const res = await api.get(url);
+            const res = await api.get(url, fresh ? { params: { fresh: 1 } } : undefined);
             setReportData(res.data);
         } catch (error) {
             console.error('Erro ao carregar relatório:', error);
@@ -2949,47 +2994,12 @@ function RelatoriosTab() {
         }
     };
 
-    const exportToCSV = () => {
-        if (!reportData) return;
+    // Os relatórios com linhas por usuário exportam a base completa pelo servidor
+    const exportToCSV = async () => {
+        if (!activeReport?.exportacao) return;
         setExportLoading(true);
         try {
-            let csvContent = '';
-            let filename = `relatorio_${activeReport.id}_${new Date().toISOString().split('T')[0]}.csv`;
-
-            if (activeReport.id === 'visao-geral') {
-                csvContent = 'Categoria,Métrica,Valor\n';
-                Object.entries(reportData).forEach(([cat, values]) => {
-                    Object.entries(values).forEach(([key, val]) => {
-                        csvContent += `${cat},${key},${val}\n`;
-                    });
-                });
-            } else if (activeReport.id === 'usuarios-ativos' && reportData.users) {
-                csvContent = 'Nome,Email,Episódios Assistidos,Progresso %\n';
-                reportData.users.forEach(u => {
-                    csvContent += `"${u.nome}","${u.email}",${u.episodios_assistidos},${u.progresso}\n`;
-                });
-            } else if (activeReport.id === 'performance-provas' && reportData.provas) {
-                csvContent = 'Prova,Tentativas,Aprovadas,Taxa Aprovação %,Média Pontuação\n';
-                reportData.provas.forEach(p => {
-                    csvContent += `"${p.titulo}",${p.total_tentativas},${p.aprovadas},${p.taxa_aprovacao},${p.media_pontuacao}\n`;
-                });
-            } else if (activeReport.id === 'episodios-populares' && reportData.episodios) {
-                csvContent = 'Episódio,Visualizações,Concluídos,Taxa Conclusão %\n';
-                reportData.episodios.forEach(e => {
-                    csvContent += `"${e.titulo}",${e.visualizacoes},${e.concluidos},${e.taxa_conclusao}\n`;
-                });
-            } else if (activeReport.id === 'crescimento' && reportData.dados) {
-                csvContent = 'Data,Novos Usuários\n';
-                reportData.dados.forEach(d => {
-                    csvContent += `${d.data},${d.quantidade}\n`;
-                });
-            }
-
-            const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-            const link = document.createElement('a');
-            link.href = URL.createObjectURL(blob);
-            link.download = filename;
-            link.click();
+            await baixarExportacao(activeReport.exportacao);
         } catch (error) {
             console.error('Erro ao exportar CSV:', error);
             alert('Erro ao exportar CSV');
@@ -3206,6 +3216,65 @@ function RelatoriosTab() {
                     </div>
                 );
 
+            case 'distribuicao-area': {
+                // Pivot do cubo: nivel 3 = por área (cargo e temporada somados), 6 = por temporada
+                const col = Object.fromEntries((reportData.colunas || []).map((c, i) => [c, i]));
+                const linhasNivel = (nivel) => (reportData.linhas || [])
+                    .filter(l => l[col.nivel] === nivel)
+                    .map(l => Object.fromEntries(reportData.colunas.map((c, i) => [c, l[i]])));
+                const porArea = linhasNivel(3).map(l => ({ ...l, nome: l.area || 'Sem área' }));
+                const porTemporada = linhasNivel(6).map(l => ({ ...l, nome: reportData.temporadas?.[l.temporada_id] || 'Temporada' }));
+                return (
+                    <div className="space-y-6">
+                        <div className="bg-slate-800/30 p-4 rounded-xl border border-slate-700">
+                            <h4 className="text-white font-medium mb-4">Conclusão e Aprovação por Área</h4>
+                            <ResponsiveContainer width="100%" height={300}>
+                                <BarChart data={porArea}>
+                                    <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
+                                    <XAxis dataKey="nome" stroke="#94a3b8" tick={{ fontSize: 11 }} />
+                                    <YAxis domain={[0, 100]} stroke="#94a3b8" />
+                                    <Tooltip
+                                        contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                                        labelStyle={{ color: '#fff' }}
+                                    />
+                                    <Legend />
+                                    <Bar dataKey="taxa_conclusao" name="Conclusão %" fill="#0032A1" radius={[4, 4, 0, 0]} />
+                                    <Bar dataKey="taxa_aprovacao" name="Aprovação %" fill="#10b981" radius={[4, 4, 0, 0]} />
+                                </BarChart>
+                            </ResponsiveContainer>
+                        </div>
+                        {[['Área', porArea], ['Temporada', porTemporada]].map(([titulo, linhas]) => (
+                            <div key={titulo} className="overflow-x-auto">
+                                <table className="w-full text-left">
+                                    <thead>
+                                        <tr className="border-b border-slate-700">
+                                            <th className="p-3 text-slate-400 text-sm">{titulo}</th>
+                                            <th className="p-3 text-slate-400 text-sm text-right">Ouvintes</th>
+                                            <th className="p-3 text-slate-400 text-sm text-right">Conclusão</th>
+                                            <th className="p-3 text-slate-400 text-sm text-right">Tentativas</th>
+                                            <th className="p-3 text-slate-400 text-sm text-right">Aprovação</th>
+                                            <th className="p-3 text-slate-400 text-sm text-right">Média</th>
+                                        </tr>
+                                    </thead>
+                                    <tbody>
+                                        {linhas.map(l => (
+                                            <tr key={l.nome} className="border-b border-slate-800 hover:bg-slate-800/30">
+                                                <td className="p-3 text-white">{l.nome}</td>
+                                                <td className="p-3 text-right text-slate-300">{l.ouvintes}</td>
+                                                <td className="p-3 text-right text-slate-300">{l.taxa_conclusao}%</td>
+                                                <td className="p-3 text-right text-slate-300">{l.tentativas}</td>
+                                                <td className="p-3 text-right text-green-400">{l.taxa_aprovacao}%</td>
+                                                <td className="p-3 text-right text-aec-pink font-bold">{l.media_pontuacao ?? '-'}</td>
+                                            </tr>
+                                        ))}
+                                    </tbody>
+                                </table>
+                            </div>
+                        ))}
+                    </div>
+                );
+            }
+
             case 'crescimento':
                 return (
                     <div className="space-y-6">
@@ -3370,20 +3439,22 @@ function RelatoriosTab() {
                             </div>
                         </div>
                         <div className="flex gap-2">
+                            {activeReport.exportacao && (
+                                <button
+                                    onClick={exportToCSV}
+                                    disabled={exportLoading}
+                                    className="px-4 py-2 bg-green-600 hover:bg-green-500 disabled:bg-slate-700 disabled:text-slate-500 text-white rounded-xl transition-colors flex items-center gap-2"
+                                >
+                                    {exportLoading ? (
+                                        <div className="w-4 h-4 border-2 border-white border-t-transparent rounded-full animate-spin"></div>
+                                    ) : (
+                                        <span>📥</span>
+                                    )}
+                                    CSV
+                                </button>
+                            )}
                             <button
-                                onClick={exportToCSV}
-                                disabled={exportLoading || !reportData}
-                                className="px-4 py-2 bg-green-600 hover:bg-green-500 disabled:bg-slate-700 disabled:text-slate-500 text-white rounded-xl transition-colors flex items-center gap-2"
-                            >
-                                {exportLoading ? (
-                                    <div className="w-4 h-4 border-2 border-white border-t-transparent rounded-full animate-spin"></div>
-                                ) : (
-                                    <span>📥</span>
-                                )}
-                                CSV
-                            </button>
-                            <button
-                                onClick={() => fetchReportData(activeReport)}
+                                onClick={() => fetchReportData(activeReport, true)}
                                 className="px-4 py-2 bg-slate-700 hover:bg-slate-600 text-white rounded-xl transition-colors"
                             >
                                 🔄 Atualizar
@@ -3454,23 +3525,13 @@ function ConfiguracoesTab() {
         }, 1000);
     };
 
-    const exportToCSV = (type) => {
-        let csvContent = '';
-        let filename = '';
-
-        if (type === 'usuarios') {
-            csvContent = 'ID,Nome,Email,Status,Perfil\n1,Admin,admin@test.com,ativo,admin';
-            filename = 'usuarios_export.csv';
-        } else if (type === 'temporadas') {
-            csvContent = 'ID,Nome,Status,Episodios\n1,Temporada Zero,publicado,5';
-            filename = 'temporadas_export.csv';
+    const exportToCSV = async (type) => {
+        try {
+            await baixarExportacao(type);
+        } catch (error) {
+            console.error('Erro ao exportar CSV:', error);
+            alert('Erro ao exportar CSV');
         }
-
-        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-        const link = document.createElement('a');
-        link.href = URL.createObjectURL(blob);
-        link.download = filename;
-        link.click();
     };
 
     const renderModuleContent = () => {
@@ -3699,7 +3760,7 @@ function ConfiguracoesTab() {
                         </div>
                         <div className="space-y-3">
                             <h4 className="text-white font-medium">Exportar Dados</h4>
-                            <div className="grid grid-cols-2 gap-3">
+                            <div className="grid grid-cols-3 gap-3">
                                 <button
                                     onClick={() => exportToCSV('usuarios')}
                                     className="px-4 py-3 bg-green-600 hover:bg-green-500 text-white rounded-xl transition-colors flex items-center justify-center gap-2"
@@ -3707,10 +3768,16 @@ function ConfiguracoesTab() {
                                     📥 Exportar Usuários
                                 </button>
                                 <button
-                                    onClick={() => exportToCSV('temporadas')}
+                                    onClick={() => exportToCSV('progresso')}
                                     className="px-4 py-3 bg-blue-600 hover:bg-blue-500 text-white rounded-xl transition-colors flex items-center justify-center gap-2"
                                 >
-                                    📥 Exportar Temporadas
+                                    📥 Exportar Progresso
+                                </button>
+                                <button
+                                    onClick={() => exportToCSV('resultados')}
+                                    className="px-4 py-3 bg-purple-600 hover:bg-purple-500 text-white rounded-xl transition-colors flex items-center justify-center gap-2"
+                                >
+                                    📥 Exportar Resultados
                                 </button>
                             </div>
                         </div>
@@ -4055,7 +4122,17 @@ function EpisodiosTab({ temporadas, onCreate, onUpdate, onDelete }) {
         }
     };
 
-    const handleEdit = (episodio) => {
+    const handleEdit = async (episodio) => {
+        // A listagem não traz transcrição/texto completo: buscar o detalhe
+        // (sem o detalhe o formulário salvaria transcrição e texto vazios)
+        try {
+            const response = await api.get(`/episodios/${episodio.id}`);
+            episodio = response.data;
+        } catch (error) {
+            console.error('Erro ao buscar episódio:', error);
+            alert(`Erro ao carregar episódio: ${error.response?.data?.detail || error.message}`);
+            return;
+        }
         setEditingEpisode(episodio);
         setIsModalOpen(true);
     };
@@ -4153,7 +4230,7 @@ function EpisodiosTab({ temporadas, onCreate, onUpdate, onDelete }) {
                                 <p className="text-slate-400 text-sm line-clamp-2">{ep.descricao}</p>
                                 <div className="flex items-center gap-4 mt-3 text-xs text-slate-500">
                                     <span title="Data de Lançamento">📅 {ep.data_lancamento ? new Date(ep.data_lancamento).toLocaleDateString() : 'Imediato'}</span>
-                                    <span>📄 {ep.conteudo_texto ? 'Com Texto' : 'Sem Texto'}</span>
+                                    <span>📄 {ep.tem_conteudo_texto ? 'Com Texto' : 'Sem Texto'}</span>
                                 </div>
                             </div>
 
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import api from '../services/api';
@@ -15,23 +15,25 @@ export default function Prova() {
     const [resultado, setResultado] = useState(null);
     const [tempoRestante, setTempoRestante] = useState(null);
     const [perguntaAtual, setPerguntaAtual] = useState(0);
+    const [sessao, setSessao] = useState(null);
+    const [iniciando, setIniciando] = useState(false);
+    const enviarRef = useRef(null);
 
     useEffect(() => {
         fetchProva();
     }, [id]);
 
-    // Timer
+    // Timer (o prazo é do servidor; aqui só exibimos o tempo restante)
     useEffect(() => {
-        if (!prova?.tempo_limite || resultado) return;
+        if (sessao?.segundos_restantes == null || resultado) return;
 
-        const tempoInicial = prova.tempo_limite * 60; // Converter para segundos
-        setTempoRestante(tempoInicial);
+        setTempoRestante(sessao.segundos_restantes);
 
         const interval = setInterval(() => {
             setTempoRestante(prev => {
                 if (prev <= 1) {
                     clearInterval(interval);
-                    handleEnviar(); // Auto-submit quando acabar o tempo
+                    enviarRef.current(true); // Auto-submit quando acabar o tempo
                     return 0;
                 }
                 return prev - 1;
@@ -39,7 +41,7 @@ export default function Prova() {
         }, 1000);
 
         return () => clearInterval(interval);
-    }, [prova?.tempo_limite, resultado]);
+    }, [sessao, resultado]);
 
     const fetchProva = async () => {
         try {
@@ -61,21 +63,45 @@ export default function Prova() {
         }
     };
 
+    // A sessão só começa quando o aluno clica em "Iniciar": abrir a página não gasta tentativa
+    const handleIniciar = async () => {
+        if (iniciando) return;
+
+        setIniciando(true);
+        try {
+            // Inicia (ou retoma) a sessão: prazo e respostas salvas vêm do servidor
+            const sessaoResponse = await api.post(`/provas/${id}/sessao`);
+            setSessao(sessaoResponse.data);
+            setRespostas(sessaoResponse.data.respostas || {});
+        } catch (error) {
+            alert(error.response?.data?.detail || 'Erro ao iniciar a prova');
+        } finally {
+            setIniciando(false);
+        }
+    };
+
     const handleResposta = (perguntaId, opcaoId) => {
         setRespostas(prev => ({
             ...prev,
             [perguntaId]: opcaoId
         }));
+
+        // Autosave: só a resposta alterada
+        if (sessao) {
+            api.patch(`/provas/sessoes/${sessao.id}`, {
+                respostas: { [perguntaId]: opcaoId }
+            }).catch(error => console.error('Erro ao salvar resposta:', error));
+        }
     };
 
-    const handleEnviar = async () => {
+    const handleEnviar = async (automatico = false) => {
         if (enviando) return;
 
         // Verificar se todas foram respondidas
         const totalPerguntas = prova.perguntas?.length || 0;
         const totalRespondidas = Object.keys(respostas).length;
 
-        if (totalRespondidas < totalPerguntas) {
+        if (!automatico && totalRespondidas < totalPerguntas) {
             const confirmar = confirm(`Você respondeu ${totalRespondidas} de ${totalPerguntas} perguntas. Deseja enviar mesmo assim?`);
             if (!confirmar) return;
         }
@@ -83,7 +109,8 @@ export default function Prova() {
         setEnviando(true);
         try {
             const response = await api.post(`/provas/${id}/responder`, {
-                respostas: respostas
+                respostas: respostas,
+                sessao_id: sessao?.id
             });
             setResultado(response.data);
         } catch (error) {
@@ -93,6 +120,8 @@ export default function Prova() {
         }
     };
 
+    enviarRef.current = handleEnviar;
+
     const handleDownloadCertificado = async () => {
         if (!resultado?.aprovado) return;
 
@@ -239,6 +268,46 @@ export default function Prova() {
         );
     }
 
+    // Tela inicial: nada é contado até o aluno iniciar a prova
+    if (!sessao) {
+        return (
+            <div className="min-h-screen bg-slate-950 flex items-center justify-center p-4">
+                <div className="bg-slate-900/85 backdrop-blur-xl border border-slate-800 rounded-3xl p-8 max-w-lg w-full text-center">
+                    <div className="w-24 h-24 bg-aec-pink/20 rounded-full flex items-center justify-center mx-auto mb-6">
+                        <span className="text-5xl">📝</span>
+                    </div>
+                    <h1 className="text-2xl font-bold text-white mb-2">{prova?.titulo}</h1>
+                    {prova?.descricao && (
+                        <p className="text-slate-400 mb-4">{prova.descricao}</p>
+                    )}
+                    <div className="bg-slate-800/50 rounded-2xl p-4 mb-6 text-sm text-slate-300 space-y-1">
+                        <p>{prova?.total_perguntas} questões</p>
+                        {prova?.tempo_limite && <p>Tempo limite: {prova.tempo_limite} minutos</p>}
+                        <p>Tentativas restantes: {prova?.tentativas_restantes}</p>
+                    </div>
+                    <p className="text-xs text-slate-500 mb-6">
+                        Ao iniciar, o tempo começa a contar. Se o prazo acabar sem envio, as respostas salvas contam como uma tentativa.
+                    </p>
+                    <div className="flex flex-col gap-3">
+                        <button
+                            onClick={handleIniciar}
+                            disabled={iniciando || prova?.tentativas_restantes === 0}
+                            className="w-full py-4 bg-gradient-to-r from-aec-pink to-purple-600 text-white rounded-xl font-bold hover:opacity-90 transition-opacity disabled:opacity-50"
+                        >
+                            {iniciando ? 'Iniciando...' : 'Iniciar prova'}
+                        </button>
+                        <button
+                            onClick={() => navigate('/temporadas')}
+                            className="w-full py-3 bg-slate-800 text-slate-300 rounded-xl hover:bg-slate-700 transition-colors"
+                        >
+                            Voltar às Temporadas
+                        </button>
+                    </div>
+                </div>
+            </div>
+        );
+    }
+
     const pergunta = prova?.perguntas?.[perguntaAtual];
     const totalPerguntas = prova?.perguntas?.length || 0;
 
@@ -332,7 +401,7 @@ export default function Prova() {
                                 </button>
                             ) : (
                                 <button
-                                    onClick={handleEnviar}
+                                    onClick={() => handleEnviar()}
                                     disabled={enviando}
                                     className="flex-1 py-3 bg-gradient-to-r from-aec-pink to-purple-600 text-white rounded-xl font-bold hover:opacity-90 transition-opacity disabled:opacity-50"
                                 >
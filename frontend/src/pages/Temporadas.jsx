@@ -14,17 +14,16 @@ export default function Temporadas() {
     const navigate = useNavigate();
 
     useEffect(() => {
-        fetchTemporadas();
+        fetchFeed();
     }, []);
 
-    const fetchTemporadas = async () => {
+    // Temporadas, episódios, progresso e provas numa requisição só
+    const fetchFeed = async () => {
         try {
-            const response = await api.get('/temporadas');
-            setTemporadas(response.data);
-            if (response.data.length > 0) {
-                setSelectedTemporada(response.data[0]);
-                fetchEpisodios(response.data[0].id);
-                fetchProvaTemporada(response.data[0].id);
+            const response = await api.get('/usuario/feed');
+            setTemporadas(response.data.temporadas);
+            if (response.data.temporadas.length > 0) {
+                selecionarTemporada(response.data.temporadas[0]);
             }
         } catch (error) {
             console.error('Erro ao buscar temporadas:', error);
@@ -33,30 +32,14 @@ export default function Temporadas() {
         }
     };
 
-    const fetchEpisodios = async (temporadaId) => {
-        try {
-            const response = await api.get(`/episodios?temporada_id=${temporadaId}`);
-            setEpisodios(response.data);
-        } catch (error) {
-            console.error('Erro ao buscar episódios:', error);
-        }
-    };
-
-    const fetchProvaTemporada = async (temporadaId) => {
-        try {
-            const response = await api.get('/provas');
-            const prova = response.data.find(p => p.temporada_id === temporadaId);
-            setProvaTemporada(prova || null);
-        } catch (error) {
-            console.error('Erro ao buscar prova:', error);
-            setProvaTemporada(null);
-        }
+    const selecionarTemporada = (temporada) => {
+        setSelectedTemporada(temporada);
+        setEpisodios(temporada.episodios || []);
+        setProvaTemporada(temporada.prova || null);
     };
 
     const handleTemporadaClick = (temporada) => {
-        setSelectedTemporada(temporada);
-        fetchEpisodios(temporada.id);
-        fetchProvaTemporada(temporada.id);
+        selecionarTemporada(temporada);
     };
 
     const handleLogout = () => {
@@ -192,7 +175,7 @@ export default function Temporadas() {
                                             >
                                                 <div className="flex items-center gap-4">
                                                     <div className="w-12 h-12 bg-slate-900 border border-slate-700 rounded-full flex items-center justify-center group-hover:bg-aec-pink group-hover:border-aec-pink transition-colors">
-                                                        <span className="text-slate-300 group-hover:text-white">▶️</span>
+                                                        <span className="text-slate-300 group-hover:text-white">{episodio.assistido ? '✅' : '▶️'}</span>
                                                     </div>
                                                     <div className="flex-1">
                                                         <h3 className="font-medium text-slate-300 group-hover:text-white">